@@ -0,0 +1,53 @@
+"""add stock quants
+
+Revision ID: 4b7e1f9c2d30
+Revises: 1a072a9fa909
+Create Date: 2026-10-18 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e1f9c2d30'
+down_revision: Union[str, Sequence[str], None] = '1a072a9fa909'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stock_quants',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('on_hand', sa.Integer(), nullable=False),
+    sa.Column('reserved', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('product_id', 'location_id')
+    )
+
+    # Backfill from the existing ledger (same logic as utils.quant_service.ledger_balances_query)
+    op.execute("""
+        INSERT INTO stock_quants (product_id, location_id, on_hand, reserved)
+        SELECT product_id, location_id, SUM(on_hand), SUM(reserved)
+        FROM (
+            SELECT product_id, destination_location_id AS location_id, quantity AS on_hand, 0 AS reserved
+            FROM stock_moves WHERE status = 'DONE'
+            UNION ALL
+            SELECT product_id, source_location_id, -quantity, 0
+            FROM stock_moves WHERE status = 'DONE'
+            UNION ALL
+            SELECT product_id, source_location_id, 0, quantity
+            FROM stock_moves WHERE status = 'WAITING'
+        ) AS legs
+        GROUP BY product_id, location_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stock_quants')
@@ -0,0 +1,30 @@
+"""add move pagination index
+
+Revision ID: 5e8a3b0d7c12
+Revises: 9d2c6a1e5f47
+Create Date: 2026-10-18 11:20:05.117934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8a3b0d7c12'
+down_revision: Union[str, Sequence[str], None] = '9d2c6a1e5f47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Matches the keyset order of the move lists: ORDER BY created_at DESC, id DESC
+    op.create_index('ix_stock_moves_created_at_id', 'stock_moves',
+                    [sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stock_moves_created_at_id', table_name='stock_moves')
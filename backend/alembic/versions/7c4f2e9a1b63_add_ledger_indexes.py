@@ -0,0 +1,49 @@
+"""add ledger indexes
+
+Revision ID: 7c4f2e9a1b63
+Revises: 5e8a3b0d7c12
+Create Date: 2026-10-18 12:41:52.630177
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4f2e9a1b63'
+down_revision: Union[str, Sequence[str], None] = '5e8a3b0d7c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY so a large ledger keeps taking writes while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index('ix_stock_moves_product_done', 'stock_moves',
+                        ['product_id', 'created_at'], unique=False,
+                        postgresql_where=sa.text("status = 'DONE'"), postgresql_concurrently=True)
+        op.create_index('ix_stock_moves_waiting_source', 'stock_moves',
+                        ['source_location_id', 'product_id'], unique=False,
+                        postgresql_where=sa.text("status = 'WAITING'"), postgresql_concurrently=True)
+        op.create_index('ix_stock_moves_source_created', 'stock_moves',
+                        ['source_location_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_stock_moves_dest_created', 'stock_moves',
+                        ['destination_location_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False,
+                        postgresql_concurrently=True)
+
+        # The primary key already indexes `id`; this one only slowed down inserts
+        op.drop_index('ix_stock_moves_id', table_name='stock_moves', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_stock_moves_id', 'stock_moves', ['id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_stock_moves_dest_created', table_name='stock_moves', postgresql_concurrently=True)
+        op.drop_index('ix_stock_moves_source_created', table_name='stock_moves', postgresql_concurrently=True)
+        op.drop_index('ix_stock_moves_waiting_source', table_name='stock_moves', postgresql_concurrently=True)
+        op.drop_index('ix_stock_moves_product_done', table_name='stock_moves', postgresql_concurrently=True)
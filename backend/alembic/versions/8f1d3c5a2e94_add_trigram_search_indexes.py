@@ -0,0 +1,49 @@
+"""add trigram search indexes
+
+Revision ID: 8f1d3c5a2e94
+Revises: 7c4f2e9a1b63
+Create Date: 2026-10-18 13:58:10.442861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f1d3c5a2e94'
+down_revision: Union[str, Sequence[str], None] = '7c4f2e9a1b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ('ix_products_name_trgm', 'products', 'name'),
+    ('ix_products_sku_trgm', 'products', 'sku'),
+    ('ix_products_category_trgm', 'products', 'category'),
+    ('ix_locations_name_trgm', 'locations', 'name'),
+    ('ix_stock_moves_reference_trgm', 'stock_moves', 'reference'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm ships with Postgres (contrib) and is enabled by default on Supabase
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(name, table, [column], unique=False, postgresql_using='gin',
+                            postgresql_ops={column: 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+        op.create_index('ix_stock_moves_product_created', 'stock_moves',
+                        ['product_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_stock_moves_product_created', table_name='stock_moves', postgresql_concurrently=True)
+        for name, table, _ in reversed(TRIGRAM_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,58 @@
+"""add reference sequences
+
+Revision ID: 9d2c6a1e5f47
+Revises: 4b7e1f9c2d30
+Create Date: 2026-10-18 10:03:27.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2c6a1e5f47'
+down_revision: Union[str, Sequence[str], None] = '4b7e1f9c2d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reference_sequences',
+    sa.Column('warehouse_code', sa.String(), nullable=False),
+    sa.Column('op_code', sa.String(), nullable=False),
+    sa.Column('last_value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('warehouse_code', 'op_code')
+    )
+
+    # 1. Old COUNT(*)-based numbering could hand out the same reference twice.
+    #    Keep the oldest one and suffix the rest with their id so the constraint can be created.
+    op.execute("""
+        UPDATE stock_moves AS m
+        SET reference = m.reference || '-' || m.id
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY reference ORDER BY id) AS rn
+            FROM stock_moves
+            WHERE reference IS NOT NULL
+        ) AS d
+        WHERE d.id = m.id AND d.rn > 1
+    """)
+    op.create_unique_constraint('uq_stock_moves_reference', 'stock_moves', ['reference'])
+
+    # 2. Continue every existing sequence after its highest number
+    op.execute("""
+        INSERT INTO reference_sequences (warehouse_code, op_code, last_value)
+        SELECT split_part(reference, '/', 1), split_part(reference, '/', 2),
+               MAX(CAST(split_part(reference, '/', 3) AS INTEGER))
+        FROM stock_moves
+        WHERE reference ~ '^[^/]+/[^/]+/[0-9]+$'
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_stock_moves_reference', 'stock_moves', type_='unique')
+    op.drop_table('reference_sequences')
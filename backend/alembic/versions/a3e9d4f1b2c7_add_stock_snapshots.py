@@ -0,0 +1,47 @@
+"""add stock snapshots
+
+Revision ID: a3e9d4f1b2c7
+Revises: 8f1d3c5a2e94
+Create Date: 2026-10-18 15:02:37.491820
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e9d4f1b2c7'
+down_revision: Union[str, Sequence[str], None] = '8f1d3c5a2e94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stock_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('as_of', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('line_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('as_of')
+    )
+    op.create_table('stock_snapshot_lines',
+    sa.Column('snapshot_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('on_hand', sa.Integer(), nullable=False),
+    sa.Column('reserved', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['snapshot_id'], ['stock_snapshots.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('snapshot_id', 'product_id', 'location_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stock_snapshot_lines')
+    op.drop_table('stock_snapshots')
@@ -0,0 +1,50 @@
+"""add stock moves archive
+
+Revision ID: b6d2f8e0c4a9
+Revises: a3e9d4f1b2c7
+Create Date: 2026-10-18 16:20:11.083412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d2f8e0c4a9'
+down_revision: Union[str, Sequence[str], None] = 'a3e9d4f1b2c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A new enum value cannot be used inside the transaction that adds it
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE locationtype ADD VALUE IF NOT EXISTS 'OPENING'")
+
+    op.create_table('stock_moves_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('source_location_id', sa.Integer(), nullable=False),
+    sa.Column('destination_location_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='movestatus', create_type=False), nullable=False),
+    sa.Column('reference', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stock_moves_archive_created_at', 'stock_moves_archive', ['created_at'], unique=False)
+    op.create_index('ix_stock_moves_archive_product_created', 'stock_moves_archive', ['product_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Postgres cannot drop an enum value; 'OPENING' stays in locationtype
+    op.drop_index('ix_stock_moves_archive_product_created', table_name='stock_moves_archive')
+    op.drop_index('ix_stock_moves_archive_created_at', table_name='stock_moves_archive')
+    op.drop_table('stock_moves_archive')
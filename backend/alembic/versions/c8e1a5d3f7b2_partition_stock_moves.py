@@ -0,0 +1,142 @@
+"""partition stock_moves by created_at
+
+Revision ID: c8e1a5d3f7b2
+Revises: b6d2f8e0c4a9
+Create Date: 2026-10-18 17:05:44.219806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from database.partitions import next_month
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1a5d3f7b2'
+down_revision: Union[str, Sequence[str], None] = 'b6d2f8e0c4a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The existing table is NOT copied: it is renamed to stock_moves_history and attached as
+# the partition for everything before the end of the current month. New months get their
+# own partitions (database/partitions.py creates them ahead of time).
+#
+# UNIQUE(reference) cannot exist on a partitioned table (it would have to include
+# created_at, which makes it meaningless). References move to a non-partitioned registry,
+# move_references, that the application writes in the same transaction as each move.
+# Don't run a period close while this migrates: its opening rows are backdated.
+MONTHS_AHEAD = 3
+
+LEDGER_INDEXES = [
+    # name, columns, extra kwargs (same definitions as models.all_models.StockMove)
+    ('ix_stock_moves_created_at_id', [sa.text('created_at DESC'), sa.text('id DESC')], {}),
+    ('ix_stock_moves_product_done', ['product_id', 'created_at'],
+     {'postgresql_where': sa.text("status = 'DONE'")}),
+    ('ix_stock_moves_waiting_source', ['source_location_id', 'product_id'],
+     {'postgresql_where': sa.text("status = 'WAITING'")}),
+    ('ix_stock_moves_source_created', ['source_location_id', sa.text('created_at DESC'), sa.text('id DESC')], {}),
+    ('ix_stock_moves_dest_created', ['destination_location_id', sa.text('created_at DESC'), sa.text('id DESC')], {}),
+    ('ix_stock_moves_product_created', ['product_id', sa.text('created_at DESC'), sa.text('id DESC')], {}),
+    ('ix_stock_moves_reference_trgm', ['reference'],
+     {'postgresql_using': 'gin', 'postgresql_ops': {'reference': 'gin_trgm_ops'}}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    # Month bounds and partition names in UTC, like database/partitions.py, whatever the session TimeZone
+    cutover = next_month(conn.execute(sa.text("SELECT now()")).scalar())
+
+    # 1. Prepare the old table without blocking writes: the reference registry, the primary
+    #    key index the partitioned parent will need, and a validated CHECK that proves the
+    #    partition bound (so ATTACH and SET NOT NULL skip their full-table scans)
+    op.execute("UPDATE stock_moves SET created_at = COALESCE(updated_at, now()) WHERE created_at IS NULL")
+    op.create_table('move_references',
+    sa.Column('reference', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('reference')
+    )
+    # created_at defaults to the inserting transaction's start: rows committed after the
+    # backfill's snapshot are all newer than the oldest transaction running now (step 2 adds them)
+    backfill_since = conn.execute(sa.text(
+        "SELECT LEAST(now(), MIN(xact_start)) FROM pg_stat_activity WHERE xact_start IS NOT NULL"
+    )).scalar()
+    with op.get_context().autocommit_block():
+        op.execute("INSERT INTO move_references (reference) "
+                   "SELECT reference FROM stock_moves WHERE reference IS NOT NULL")
+        op.execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS stock_moves_history_id_created_key "
+                   "ON stock_moves (id, created_at)")
+        op.execute("ALTER TABLE stock_moves DROP CONSTRAINT IF EXISTS stock_moves_history_bound")
+        op.execute(f"ALTER TABLE stock_moves ADD CONSTRAINT stock_moves_history_bound "
+                   f"CHECK (created_at IS NOT NULL AND created_at < '{cutover.isoformat()}') NOT VALID")
+        op.execute("ALTER TABLE stock_moves VALIDATE CONSTRAINT stock_moves_history_bound")
+
+    # 2. Swap (one short transaction: renames and catalog-only changes)
+    op.rename_table('stock_moves', 'stock_moves_history')
+    conn.execute(sa.text(
+        "INSERT INTO move_references (reference) SELECT reference FROM stock_moves_history "
+        "WHERE reference IS NOT NULL AND created_at >= :since ON CONFLICT DO NOTHING"
+    ), {"since": backfill_since})
+    op.drop_constraint('uq_stock_moves_reference', 'stock_moves_history', type_='unique')
+    for name, _, _ in LEDGER_INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {name.replace('stock_moves', 'stock_moves_history', 1)}")
+    op.alter_column('stock_moves_history', 'created_at', nullable=False)
+    # The partition needs the parent's primary key; turning the prebuilt index into it is instant
+    op.execute("ALTER TABLE stock_moves_history DROP CONSTRAINT stock_moves_pkey, "
+               "ADD CONSTRAINT stock_moves_history_pkey PRIMARY KEY USING INDEX stock_moves_history_id_created_key")
+
+    op.create_table('stock_moves',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('stock_moves_id_seq'::regclass)"), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('source_location_id', sa.Integer(), nullable=False),
+    sa.Column('destination_location_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='movestatus', create_type=False), nullable=True),
+    sa.Column('reference', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['destination_location_id'], ['locations.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['source_location_id'], ['locations.id'], ),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.execute("ALTER SEQUENCE stock_moves_id_seq OWNED BY stock_moves.id")
+    # On an empty parent these are catalog entries; ATTACH adopts the matching indexes of the old table
+    for name, columns, kwargs in LEDGER_INDEXES:
+        op.create_index(name, 'stock_moves', columns, unique=False, **kwargs)
+
+    op.execute(f"ALTER TABLE stock_moves ATTACH PARTITION stock_moves_history "
+               f"FOR VALUES FROM (MINVALUE) TO ('{cutover.isoformat()}')")
+    op.drop_constraint('stock_moves_history_bound', 'stock_moves_history', type_='check')
+
+    # 3. The coming months + the catch-all
+    start = cutover
+    for _ in range(MONTHS_AHEAD):
+        end = next_month(start)
+        op.execute(f"CREATE TABLE stock_moves_p{start:%Y_%m} PARTITION OF stock_moves "
+                   f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+        start = end
+    op.execute("CREATE TABLE stock_moves_default PARTITION OF stock_moves DEFAULT")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Back to one plain table: the history partition becomes stock_moves again and the
+    # (recent) rows of every other partition are copied into it
+    op.execute("ALTER TABLE stock_moves DETACH PARTITION stock_moves_history")
+    op.execute("ALTER TABLE stock_moves_history DROP CONSTRAINT IF EXISTS stock_moves_history_bound")
+    op.execute("INSERT INTO stock_moves_history SELECT * FROM stock_moves")
+    op.execute("ALTER SEQUENCE stock_moves_id_seq OWNED BY stock_moves_history.id")
+    op.drop_table('stock_moves')  # the parent and its remaining partitions
+
+    op.rename_table('stock_moves_history', 'stock_moves')
+    for name, _, _ in LEDGER_INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS {name.replace('stock_moves', 'stock_moves_history', 1)} RENAME TO {name}")
+    op.execute("ALTER TABLE stock_moves DROP CONSTRAINT stock_moves_history_pkey, ADD CONSTRAINT stock_moves_pkey PRIMARY KEY (id)")
+    op.alter_column('stock_moves', 'created_at', nullable=True)
+    op.create_unique_constraint('uq_stock_moves_reference', 'stock_moves', ['reference'])
+    op.drop_table('move_references')
@@ -0,0 +1,100 @@
+"""add stock_moves op_type and warehouse_id
+
+Revision ID: d4f7b9a2c6e1
+Revises: c8e1a5d3f7b2
+Create Date: 2026-10-18 18:12:09.557301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f7b9a2c6e1'
+down_revision: Union[str, Sequence[str], None] = 'c8e1a5d3f7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 50_000
+
+# Same rules as utils/reference_service.classify_move
+BACKFILL_SQL = """
+    UPDATE {table} AS m SET
+        op_type = CAST(CASE
+            WHEN s.type = 'OPENING' THEN 'ADJUSTMENT'
+            WHEN s.type = 'VENDOR' THEN 'RECEIPT'
+            WHEN d.type = 'CUSTOMER' THEN 'DELIVERY'
+            WHEN s.type = 'INVENTORY_LOSS' OR d.type = 'INVENTORY_LOSS' THEN 'ADJUSTMENT'
+            ELSE 'INTERNAL'
+        END AS operationtype),
+        warehouse_id = CASE
+            WHEN s.type = 'OPENING' THEN d.warehouse_id
+            WHEN s.type = 'VENDOR' THEN d.warehouse_id
+            WHEN d.type = 'CUSTOMER' THEN s.warehouse_id
+            WHEN s.type = 'INTERNAL' THEN s.warehouse_id
+            ELSE d.warehouse_id
+        END
+    FROM locations AS s, locations AS d
+    WHERE s.id = m.source_location_id AND d.id = m.destination_location_id
+      AND m.id >= :low AND m.id < :high AND m.op_type IS NULL
+"""
+
+OP_INDEXES = [
+    ('ix_stock_moves_op_created', 'op_type, created_at DESC, id DESC'),
+    ('ix_stock_moves_warehouse_op_created', 'warehouse_id, op_type, created_at DESC, id DESC'),
+]
+
+
+def _backfill(conn, table: str) -> None:
+    """One short transaction per id range, so the ledger keeps taking writes."""
+    low, high = conn.execute(sa.text(f"SELECT min(id), max(id) FROM {table}")).one()
+    if low is None:
+        return
+    for start in range(low, high + 1, BACKFILL_BATCH):
+        conn.execute(sa.text(BACKFILL_SQL.format(table=table)), {"low": start, "high": start + BACKFILL_BATCH})
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    operation_type = postgresql.ENUM('RECEIPT', 'DELIVERY', 'INTERNAL', 'ADJUSTMENT', name='operationtype')
+    operation_type.create(op.get_bind(), checkfirst=True)
+
+    # Nullable columns without a default: catalog-only on every partition
+    for table in ('stock_moves', 'stock_moves_archive'):
+        op.add_column(table, sa.Column('op_type', postgresql.ENUM(name='operationtype', create_type=False), nullable=True))
+        op.add_column(table, sa.Column('warehouse_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('stock_moves_warehouse_id_fkey', 'stock_moves', 'warehouses', ['warehouse_id'], ['id'])
+
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        for table in ('stock_moves', 'stock_moves_archive'):
+            _backfill(conn, table)
+
+    # CREATE INDEX CONCURRENTLY does not work on a partitioned table: create the parent index
+    # ON ONLY (invalid, no rows), build each partition's index concurrently and attach it
+    partitions = op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'stock_moves'::regclass ORDER BY c.relname"
+    )).scalars().all()
+    for name, columns in OP_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY stock_moves ({columns})")
+    with op.get_context().autocommit_block():
+        for name, columns in OP_INDEXES:
+            for partition in partitions:
+                child = f"{partition}_{name[len('ix_stock_moves_'):]}"
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} ({columns})")
+                op.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in OP_INDEXES:
+        op.drop_index(name, table_name='stock_moves')   # drops the partitions' indexes with it
+    op.drop_constraint('stock_moves_warehouse_id_fkey', 'stock_moves', type_='foreignkey')
+    for table in ('stock_moves', 'stock_moves_archive'):
+        op.drop_column(table, 'warehouse_id')
+        op.drop_column(table, 'op_type')
+    postgresql.ENUM(name='operationtype').drop(op.get_bind(), checkfirst=True)
@@ -1,10 +1,114 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext # type: ignore
 
 pwd_cxt = CryptContext(schemes=["bcrypt"], deprecated = "auto")
 
+# bcrypt burns tens of ms of CPU per call. It runs on a small dedicated process pool so a
+# login burst can't hold every request thread (or the GIL) hostage.
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", "2"))   # 0 = hash inline (old behaviour)
+HASH_QUEUE_DEPTH = int(os.getenv("HASH_QUEUE_DEPTH", "16"))    # jobs allowed to wait for a worker
+
+def _hash(password: str) -> str:
+    return pwd_cxt.hash(password)
+
+def _verify(plain_pass: str, hashed_pass: str) -> bool:
+    return pwd_cxt.verify(plain_pass, hashed_pass)
+
+
+class HashPool:
+    """
+    Bounded process pool: at most `workers` jobs run and `queue_depth` wait.
+    Anything beyond that is rejected immediately with 503 instead of queueing forever.
+    """
+    def __init__(self, workers: int = HASH_POOL_WORKERS, queue_depth: int = HASH_QUEUE_DEPTH):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_depth)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 'spawn': forking a multi-threaded server process is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password operations in progress. Please retry.",
+                headers={"Retry-After": "1"},
+            )
+        self._track(+1)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            self.in_flight += delta
+
+    def _release(self) -> None:
+        self._track(-1)
+        self._slots.release()
+
+    def run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        """`run` for async routes: awaits the worker without blocking the event loop."""
+        if self.workers <= 0:
+            return await run_in_threadpool(fn, *args)
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "in_flight": self.in_flight,     # running + waiting for a worker
+                "rejected": self.rejected,       # 503s since start
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+hash_pool = HashPool()
+
+
 class Hash():
     def bcrypt(password : str):
-        return pwd_cxt.hash(password)
-    
+        return hash_pool.run(_hash, password)
+
     def verify (plain_pass: str, hashed_pass: str):
-        return pwd_cxt.verify(plain_pass, hashed_pass)
\ No newline at end of file
+        return hash_pool.run(_verify, plain_pass, hashed_pass)
+
+    async def abcrypt(password : str):
+        return await hash_pool.arun(_hash, password)
+
+    async def averify(plain_pass: str, hashed_pass: str):
+        return await hash_pool.arun(_verify, plain_pass, hashed_pass)
@@ -1,14 +1,16 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from database.postgresConn import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.postgresConn import get_async_db
 from models.all_models import User as UserModel
 from auth import token
+from auth.user_cache import user_cache, CachedUser
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 # ADD db dependency here
-def get_current_user(data: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(data: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -18,10 +20,17 @@ def get_current_user(data: str = Depends(oauth2_scheme), db: Session = Depends(g
     # 1. Verify token format
     token_data = token.verify_token(data, credentials_exception)
     
-    # 2. Fetch the actual user from DB
-    user = db.query(UserModel).filter(UserModel.email == token_data.username).first()
+    # 2. Serve the user from the cache (no DB round-trip; the session never connects)
+    user = user_cache.get(token_data.username)
+    if user is not None:
+        return user
+
+    # 3. Cache miss: fetch the actual user from DB
+    db_user = await db.scalar(select(UserModel).where(UserModel.email == token_data.username))
     
-    if user is None:
+    if db_user is None:
         raise credentials_exception
-        
-    return user # Now returns the full Database Object
\ No newline at end of file
+
+    user = CachedUser.from_model(db_user)
+    user_cache.put(token_data.username, user)
+    return user # Read-only snapshot of the DB user (see auth/user_cache.py)
\ No newline at end of file
@@ -35,4 +35,14 @@ def verify_token(token: str, credential_exception):
         print("JWT error:", e)
         raise credential_exception
     
-    return token_data
\ No newline at end of file
+    return token_data
+
+def token_subject(authorization: str | None) -> str | None:
+    """Subject (email) of an `Authorization: Bearer <jwt>` header; None if absent or invalid."""
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not credentials:
+        return None
+    try:
+        return jwt.decode(credentials, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
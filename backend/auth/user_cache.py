@@ -0,0 +1,138 @@
+# backend/auth/user_cache.py
+"""
+In-process TTL + LRU cache of authenticated users, keyed by the JWT subject (email).
+Saves the `SELECT ... FROM users` that `get_current_user` would otherwise run on every request.
+
+Entries are dropped after commit whenever a user's password, role, email or active flag
+changes through the ORM (e.g. /reset-password); the TTL bounds staleness for anything else
+(other worker processes, manual SQL).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from models.all_models import User as UserModel, UserRole
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+# Changing any of these must not be served from a stale entry
+SECURITY_FIELDS = ("email", "hashed_password", "role", "is_active")
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Read-only snapshot of a User (safe to share between requests / sessions)."""
+    id: int
+    email: str
+    full_name: Optional[str]
+    role: UserRole
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, user: UserModel) -> "CachedUser":
+        return cls(
+            id=user.id, email=user.email, full_name=user.full_name,
+            role=user.role, is_active=user.is_active, created_at=user.created_at,
+        )
+
+
+class UserCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key: str) -> Optional[CachedUser]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, user: CachedUser) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+user_cache = UserCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+
+# ===========================
+#       INVALIDATION
+# ===========================
+
+def _changed_emails(user: UserModel, deleted: bool = False) -> set:
+    state = sa_inspect(user)
+    if not deleted and not any(state.attrs[f].history.has_changes() for f in SECURITY_FIELDS):
+        return set()
+    # Old AND new email, in case the email itself changed
+    history = state.attrs["email"].history
+    return {e for e in (*history.deleted, *history.unchanged, *history.added) if e}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_users(session: Session, flush_context) -> None:
+    stale = session.info.setdefault("stale_user_emails", set())
+    for obj in session.dirty:
+        if isinstance(obj, UserModel):
+            stale |= _changed_emails(obj)
+    for obj in session.deleted:
+        if isinstance(obj, UserModel):
+            stale |= _changed_emails(obj, deleted=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_stale_users(session: Session) -> None:
+    # Only after COMMIT, so a concurrent request can't re-cache the old row in between
+    for email in session.info.pop("stale_user_emails", ()):
+        user_cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_users(session: Session) -> None:
+    session.info.pop("stale_user_emails", None)
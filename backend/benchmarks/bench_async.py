@@ -0,0 +1,120 @@
+# backend/benchmarks/bench_async.py
+"""
+Many slow queries at once: sync routes (psycopg2, Starlette threadpool) vs. async routes (asyncpg).
+
+Two minimal apps expose the same endpoint, a `SELECT pg_sleep(...)` standing in for a slow
+report query, one as `def` + `get_db`-style session and one as `async def` + AsyncSession.
+`--concurrency` requests are fired at each app at the same time (in-process, through httpx's
+ASGI transport) and we report the latency spread. Both engines get the same pool size, so
+the only difference is the threadpool the sync stack has to squeeze through.
+
+Needs Postgres (pg_sleep); keep --pool-size under the server's max_connections.
+
+    python -m benchmarks.bench_async --concurrency 300 --sleep 0.1
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.seed import BENCH_DATABASE_URL, make_engine
+from database.postgresConn import to_async_url
+
+SLOW_QUERY = text("SELECT pg_sleep(:seconds)")
+
+
+def build_sync_app(pool_size: int, seconds: float) -> FastAPI:
+    engine = make_engine(BENCH_DATABASE_URL, pool_size=pool_size, max_overflow=0)
+    SessionLocal = sessionmaker(bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.state.dispose = engine.dispose
+
+    @app.get("/slow")
+    def slow(db: Session = Depends(get_db)):
+        db.execute(SLOW_QUERY, {"seconds": seconds})
+        return {"ok": True}
+
+    return app
+
+
+def build_async_app(pool_size: int, seconds: float) -> FastAPI:
+    engine = create_async_engine(to_async_url(BENCH_DATABASE_URL), pool_size=pool_size, max_overflow=0)
+    AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.state.dispose = engine.dispose
+
+    @app.get("/slow")
+    async def slow(db=Depends(get_async_db)):
+        await db.execute(SLOW_QUERY, {"seconds": seconds})
+        return {"ok": True}
+
+    return app
+
+
+async def fire(app: FastAPI, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def one() -> float:
+            started = time.perf_counter()
+            response = await client.get("/slow")
+            response.raise_for_status()
+            return time.perf_counter() - started
+
+        await asyncio.gather(*(one() for _ in range(min(concurrency, 20))))  # warm the pool
+        started = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(one() for _ in range(concurrency))))
+        elapsed = time.perf_counter() - started
+
+    # Give the connections back before the other stack runs (max_connections)
+    disposed = app.state.dispose()
+    if asyncio.iscoroutine(disposed):
+        await disposed
+
+    return {
+        "seconds": elapsed,
+        "req_per_s": concurrency / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=300)
+    parser.add_argument("--sleep", type=float, default=0.1, help="seconds each query spends in pg_sleep")
+    parser.add_argument("--pool-size", type=int, default=80)
+    args = parser.parse_args()
+
+    if not BENCH_DATABASE_URL.startswith("postgresql"):
+        parser.error("bench_async needs a Postgres BENCH_DATABASE_URL (pg_sleep)")
+
+    print(f"{args.concurrency} concurrent requests, {args.sleep * 1000:.0f} ms query, pool {args.pool_size}")
+    print(f"{'stack':<6} | {'seconds':>7} | {'req/s':>7} | {'p50':>9} | {'p99':>9}")
+    print("-" * 50)
+    for name, build in (("sync", build_sync_app), ("async", build_async_app)):
+        r = asyncio.run(fire(build(args.pool_size, args.sleep), args.concurrency))
+        print(f"{name:<6} | {r['seconds']:>7.2f} | {r['req_per_s']:>7.1f} | {r['p50_ms']:>7.1f}ms | {r['p99_ms']:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
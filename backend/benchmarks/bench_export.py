@@ -0,0 +1,75 @@
+# backend/benchmarks/bench_export.py
+"""
+Move history export: building the whole file in memory vs. the streaming export.
+
+Seeds the ledger, then produces the same CSV twice and reports time-to-first-byte,
+total time and peak Python memory (tracemalloc). The buffered path is what paging
+everything into one JSON blob amounted to; the streamed path is /api/export/moves.
+
+    python -m benchmarks.bench_export --products 20000 --moves-per-product 10
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.seed import BENCH_DATABASE_URL, make_engine, reset_schema, seed
+from database.postgresConn import to_async_url
+from utils.export_service import _csv_chunk, moves_export_query, stream_export
+
+
+async def buffered(session_factory) -> tuple:
+    async with session_factory() as db:
+        result = await db.execute(moves_export_query())
+        columns, rows = list(result.keys()), result.all()
+    body = _csv_chunk(rows, header=columns)
+    return len(body), None
+
+
+async def streamed(session_factory) -> tuple:
+    size, first_byte = 0, None
+    started = time.perf_counter()
+    async for chunk in stream_export(session_factory, moves_export_query(), "csv"):
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk)
+    return size, first_byte
+
+
+async def run(fn) -> dict:
+    engine = create_async_engine(to_async_url(BENCH_DATABASE_URL))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    tracemalloc.start()
+    started = time.perf_counter()
+    size, first_byte = await fn(session_factory)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    await engine.dispose()
+    return {"bytes": size, "first_byte": first_byte if first_byte is not None else elapsed,
+            "seconds": elapsed, "peak_mb": peak / 1024 / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--moves-per-product", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = make_engine()
+    reset_schema(engine)
+    seed(engine, args.products, args.moves_per_product)
+
+    print(f"{args.products * args.moves_per_product:,} moves")
+    print(f"{'mode':<9} | {'MB out':>7} | {'1st byte':>9} | {'seconds':>7} | {'peak MB':>8}")
+    print("-" * 52)
+    for name, fn in (("buffered", buffered), ("streamed", streamed)):
+        r = asyncio.run(run(fn))
+        print(f"{name:<9} | {r['bytes'] / 1024 / 1024:>7.1f} | {r['first_byte'] * 1000:>7.0f}ms | "
+              f"{r['seconds']:>7.2f} | {r['peak_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
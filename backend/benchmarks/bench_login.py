@@ -0,0 +1,93 @@
+# backend/benchmarks/bench_login.py
+"""
+Login burst vs. everything else: bcrypt inline in the request threads (old) vs. the bounded process pool.
+
+A 40-thread executor stands in for Starlette's sync-endpoint threadpool. It receives a burst of
+logins (Hash.verify) mixed with light requests (a 5 ms I/O wait, like a cached list endpoint).
+We report login throughput/rejections and the latency the light requests see.
+
+    python -m benchmarks.bench_login --logins 400 --light 2000
+"""
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from auth import hashing
+
+REQUEST_THREADS = 40  # anyio's default thread limiter for sync endpoints
+
+
+def light_request():
+    time.sleep(0.005)
+
+
+def run(mode: str, hashed: str, logins: int, light: int, workers: int, queue_depth: int) -> dict:
+    hashing.hash_pool.shutdown()
+    hashing.hash_pool = hashing.HashPool(workers=0 if mode == "inline" else workers, queue_depth=queue_depth)
+    if mode == "pool":
+        hashing.Hash.verify("warm-up", hashed)  # start the worker processes outside the timing
+
+    jobs = ["login"] * logins + ["light"] * light
+    random.Random(1).shuffle(jobs)
+    light_latencies, ok, rejected = [], 0, 0
+
+    def handle(kind: str, queued: float):
+        # Latency counts from "request arrived" (submit time), so waiting for a free thread is included
+        if kind == "light":
+            light_request()
+            return kind, time.perf_counter() - queued
+        try:
+            hashing.Hash.verify("secret-password", hashed)
+            return kind, True
+        except HTTPException:
+            return kind, False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=REQUEST_THREADS) as threads:
+        futures = [threads.submit(handle, kind, time.perf_counter()) for kind in jobs]
+        for future in futures:
+            kind, result = future.result()
+            if kind == "light":
+                light_latencies.append(result)
+            elif result:
+                ok += 1
+            else:
+                rejected += 1
+    elapsed = time.perf_counter() - started
+
+    light_latencies.sort()
+    return {
+        "mode": mode,
+        "seconds": elapsed,
+        "logins_ok": ok,
+        "logins_rejected": rejected,
+        "logins_per_s": ok / elapsed,
+        "light_p50_ms": statistics.median(light_latencies) * 1000,
+        "light_p99_ms": light_latencies[int(len(light_latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--light", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=hashing.HASH_POOL_WORKERS)
+    parser.add_argument("--queue-depth", type=int, default=hashing.HASH_QUEUE_DEPTH)
+    args = parser.parse_args()
+
+    hashed = hashing.pwd_cxt.hash("secret-password")
+    print(f"{'mode':<7} | {'seconds':>7} | {'logins ok':>9} | {'rejected':>8} | {'logins/s':>8} | {'light p50':>9} | {'light p99':>9}")
+    print("-" * 80)
+    for mode in ("inline", "pool"):
+        r = run(mode, hashed, args.logins, args.light, args.workers, args.queue_depth)
+        print(f"{r['mode']:<7} | {r['seconds']:>7.2f} | {r['logins_ok']:>9} | {r['logins_rejected']:>8} | "
+              f"{r['logins_per_s']:>8.1f} | {r['light_p50_ms']:>7.1f}ms | {r['light_p99_ms']:>7.1f}ms")
+    hashing.hash_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
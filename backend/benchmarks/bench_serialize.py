@@ -0,0 +1,104 @@
+# backend/benchmarks/bench_serialize.py
+"""
+JSON serialization of large list responses: `response_model` on ORM objects vs. the
+fast path (column rows -> dicts -> orjson, utils/fast_json.py).
+
+Loads the product list and a page of the move history both ways, then times what turns
+them into the response body, normalized to 10k rows:
+- response_model: what FastAPI does with `response_model=List[...]`: from_attributes
+  validation of every object, dump to JSON-able Python, then json.dumps (JSONResponse)
+- fast path: build the dicts from the column tuples, orjson.dumps
+Both bodies are parsed back and compared, so the fast path can't drift from the schema.
+
+    python -m benchmarks.bench_serialize --products 10000 --moves 10000
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import String, cast, desc, select, update
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.seed import make_engine, reset_schema, seed
+from models.all_models import Product, StockMove
+from schemas.all_schema import ProductOut, StockMoveOut
+from utils.fast_json import dumps, move_row, move_rows_query, product_columns, product_row
+from utils.pagination import MOVE_LOAD_OPTIONS
+from utils.stock_service import attach_stock, get_stock_levels
+
+PRODUCTS_JSON = TypeAdapter(List[ProductOut])
+MOVES_JSON = TypeAdapter(List[StockMoveOut])
+
+
+def response_model_body(adapter: TypeAdapter, objects) -> bytes:
+    # fastapi.routing.serialize_response + starlette JSONResponse.render
+    content = adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def best_of(repeat: int, fn) -> tuple:
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def bench(name: str, n_rows: int, repeat: int, load_orm, load_rows, adapter, build) -> None:
+    load_orm_s, objects = best_of(1, load_orm)
+    load_rows_s, rows = best_of(1, load_rows)
+    slow_s, slow_body = best_of(repeat, lambda: response_model_body(adapter, objects))
+    fast_s, fast_body = best_of(repeat, lambda: dumps(build(rows)))
+    if json.loads(slow_body) != json.loads(fast_body):
+        raise SystemExit(f"❌ {name}: the fast path's JSON differs from the response_model's")
+
+    per_10k = 10_000 / max(n_rows, 1) * 1000
+    print(f"{name:<9} | {n_rows:>7,} | {'response_model':<14} | {load_orm_s * per_10k:>8.0f} | {slow_s * per_10k:>9.0f} | {len(slow_body) / 1024 / 1024:>6.1f}")
+    print(f"{'':<9} | {'':>7} | {'fast path':<14} | {load_rows_s * per_10k:>8.0f} | {fast_s * per_10k:>9.0f} | {len(fast_body) / 1024 / 1024:>6.1f}"
+          f"   ({slow_s / fast_s:.1f}x faster serialization)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--moves", type=int, default=10_000, help="Moves serialized (one big page)")
+    parser.add_argument("--repeat", type=int, default=5, help="Serializations timed per path (best is kept)")
+    args = parser.parse_args()
+
+    engine = make_engine()
+    reset_schema(engine)
+    seed(engine, args.products, moves_per_product=max(1, -(-args.moves // args.products)))
+    with engine.begin() as conn:   # StockMoveOut.reference is required; seed() leaves it empty
+        conn.execute(update(StockMove).values(reference="BENCH/" + cast(StockMove.id, String)))
+    Session = sessionmaker(bind=engine)
+
+    print(f"{'list':<9} | {'rows':>7} | {'path':<14} | {'load ms':>8} | {'encode ms':>9} | {'MB':>6}   (ms per 10k rows)")
+    print("-" * 72)
+    with Session() as db:
+        products = select(Product).order_by(Product.id)
+        ids = products.with_only_columns(Product.id).order_by(None)
+        bench(
+            "products", args.products, args.repeat,
+            load_orm=lambda: attach_stock(db, db.scalars(products).all(), ids),
+            load_rows=lambda: (db.execute(products.with_only_columns(*product_columns())).all(),
+                               get_stock_levels(db, ids)),
+            adapter=PRODUCTS_JSON,
+            build=lambda loaded: [product_row(row, loaded[1].get(row.id)) for row in loaded[0]],
+        )
+
+    with Session() as db:
+        moves = select(StockMove).order_by(desc(StockMove.created_at), desc(StockMove.id)).limit(args.moves)
+        bench(
+            "moves", args.moves, args.repeat,
+            load_orm=lambda: db.scalars(moves.options(*MOVE_LOAD_OPTIONS)).all(),
+            load_rows=lambda: db.execute(move_rows_query(moves)).all(),
+            adapter=MOVES_JSON,
+            build=lambda rows: [move_row(row) for row in rows],
+        )
+
+
+if __name__ == "__main__":
+    main()
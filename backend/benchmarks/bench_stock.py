@@ -0,0 +1,80 @@
+# backend/benchmarks/bench_stock.py
+"""
+Product list stock figures: old per-product ledger sums vs. one grouped query over stock_quants.
+
+    python -m benchmarks.bench_stock --sizes 1000 10000 100000
+"""
+import argparse
+import time
+
+from benchmarks.seed import make_engine, reset_schema, seed, QueryCounter
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.all_models import Product, StockMove, Location, LocationType, MoveStatus
+from utils.stock_service import attach_stock
+
+
+def legacy_product_list(db: Session):
+    """The old `get_all_products` loop: 3 SUM queries per product."""
+    products = db.query(Product).all()
+    for p in products:
+        incoming_qty = db.query(func.sum(StockMove.quantity)).join(StockMove.dest_location)\
+            .filter(StockMove.product_id == p.id)\
+            .filter(StockMove.status == MoveStatus.DONE)\
+            .filter(Location.type == LocationType.INTERNAL).scalar() or 0
+        outgoing_qty = db.query(func.sum(StockMove.quantity)).join(StockMove.source_location)\
+            .filter(StockMove.product_id == p.id)\
+            .filter(StockMove.status == MoveStatus.DONE)\
+            .filter(Location.type == LocationType.INTERNAL).scalar() or 0
+        reserved_qty = db.query(func.sum(StockMove.quantity)).join(StockMove.source_location)\
+            .filter(StockMove.product_id == p.id)\
+            .filter(StockMove.status == MoveStatus.WAITING)\
+            .filter(Location.type == LocationType.INTERNAL).scalar() or 0
+        p.on_hand = incoming_qty - outgoing_qty
+        p.free_to_use = p.on_hand - reserved_qty
+    return products
+
+
+def grouped_product_list(db: Session):
+    """The current `get_all_products` path."""
+    query = db.query(Product)
+    return attach_stock(db, query.all(), query.with_entities(Product.id).statement)
+
+
+def measure(engine, fn):
+    with Session(engine) as db, QueryCounter(engine) as counter:
+        started = time.perf_counter()
+        products = fn(db)
+        elapsed = time.perf_counter() - started
+    return counter.count, elapsed, {p.id: (p.on_hand, p.free_to_use) for p in products}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--moves-per-product", type=int, default=5)
+    parser.add_argument("--legacy-limit", type=int, default=10_000,
+                        help="Skip the old per-product path above this many products (it takes minutes)")
+    args = parser.parse_args()
+
+    engine = make_engine()
+    print(f"{'products':>10} | {'path':<8} | {'queries':>8} | {'seconds':>8}")
+    print("-" * 45)
+
+    for size in args.sizes:
+        reset_schema(engine)
+        seed(engine, size, moves_per_product=args.moves_per_product)
+
+        queries, seconds, grouped = measure(engine, grouped_product_list)
+        print(f"{size:>10} | {'grouped':<8} | {queries:>8} | {seconds:>8.3f}")
+
+        if size <= args.legacy_limit:
+            queries, seconds, legacy = measure(engine, legacy_product_list)
+            print(f"{size:>10} | {'legacy':<8} | {queries:>8} | {seconds:>8.3f}")
+            assert legacy == grouped, "grouped stock figures differ from the per-product sums"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# backend/benchmarks/generate_dataset.py
+"""
+Synthetic dataset for load tests: warehouses, locations, users, products and a ledger of
+stock moves with production-like shapes (the default is the full-size catalogue; scale
+--products / --moves down for a quick run).
+
+- Product popularity is Zipf-distributed (--zipf): a few hundred SKUs get most of the
+  moves, the long tail gets a handful each. Popular ids are shuffled, not the lowest ones.
+- Moves are spread over the last --days days in id order, with the op mix of a
+  distribution warehouse: receipts (Vendor -> rack), deliveries (rack -> Customer),
+  transfers between racks and inventory adjustments, through the product's home rack. Old moves are DONE (a few
+  CANCELLED); the last two days still have DRAFT / WAITING ones.
+- References, op_type and warehouse_id follow utils/reference_service, and the reference
+  sequences continue after the generated numbers, so the API keeps numbering correctly.
+- Users: user0@bench.example.com is a manager, the others staff; every password is
+  BENCH_USER_PASSWORD (hashed once).
+
+On Postgres, products and moves are loaded with COPY and the monthly stock_moves partitions
+are created for the whole period first. The references are registered (move_references) and
+the quants rebuilt from the ledger at the end.
+
+    python -m benchmarks.generate_dataset --products 100000 --moves 10000000
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from bisect import bisect
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.seed import make_engine, reset_schema
+from auth.hashing import pwd_cxt
+from database.partitions import ensure_partitions
+from database.upsert import insert_for
+from models.all_models import (
+    Warehouse, Location, LocationType, Product, StockMove, MoveStatus, OperationType, User, UserRole,
+    MoveReference, ReferenceSequence,
+)
+from utils.quant_service import rebuild_quants
+from utils.reference_service import classify_move, format_reference
+
+BENCH_USER_PASSWORD = "bench-password"
+CATEGORIES = [f"{family} {i}" for family in ("Hardware", "Electrical", "Packaging", "Chemicals", "Textiles",
+                                              "Food", "Spare Parts", "Office") for i in range(1, 26)]
+UOMS = ["Units", "Units", "Units", "Boxes", "kg", "m", "L"]
+# Share of the moves per operation (the rest are adjustments)
+OP_MIX = ((OperationType.RECEIPT, 0.35), (OperationType.DELIVERY, 0.42), (OperationType.INTERNAL, 0.18))
+OP_CODES = {OperationType.RECEIPT: "IN", OperationType.DELIVERY: "OUT"}
+
+
+def zipf_cum_weights(n: int, exponent: float) -> list:
+    """Cumulative weights of ranks 1..n for random.choices / bisect (Zipf: weight = 1 / rank^s)."""
+    return list(accumulate(1.0 / rank ** exponent for rank in range(1, n + 1)))
+
+
+class ZipfSampler:
+    """Draws from `items` with Zipf popularity, the most popular items in random order."""
+
+    def __init__(self, items: list, exponent: float, rng: random.Random):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum_weights = zipf_cum_weights(len(self.items), exponent)
+        self.total = self.cum_weights[-1]
+        self.rng = rng
+
+    def __call__(self):
+        return self.items[bisect(self.cum_weights, self.rng.random() * self.total)]
+
+
+# ===========================
+#          LOADING
+# ===========================
+
+def _csv_value(value):
+    if value is None:
+        return ""                       # COPY csv: unquoted empty = NULL
+    if isinstance(value, (MoveStatus, OperationType)):
+        return value.name               # Postgres enums are stored by name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def load_rows(conn, model, columns: tuple, rows: list) -> None:
+    """COPY on psycopg2 (an order of magnitude faster for millions of rows), executemany otherwise."""
+    if not rows:
+        return
+    if conn.dialect.driver != "psycopg2":
+        conn.execute(insert(model), [dict(zip(columns, row)) for row in rows])
+        return
+    if not conn.in_transaction():
+        conn.begin()    # the raw cursor bypasses autobegin: without this, conn.commit() commits nothing
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_csv_value(v) for v in row] for row in rows)
+    buffer.seek(0)
+    cursor = conn.connection.cursor()
+    cursor.copy_expert(f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    cursor.close()
+
+
+# ===========================
+#        GENERATION
+# ===========================
+
+def create_master_data(db, args, rng: random.Random) -> dict:
+    """Warehouses, locations and users (ORM: a few hundred rows at most)."""
+    warehouses = [Warehouse(name=f"Warehouse {i}", short_code=f"WH{i}", address=f"{i} Bench Street")
+                  for i in range(1, args.warehouses + 1)]
+    db.add_all(warehouses)
+    db.flush()
+
+    racks = [Location(name=f"{wh.short_code} Rack {j}", short_code=f"{wh.short_code}-R{j}",
+                      type=LocationType.INTERNAL, warehouse_id=wh.id)
+             for wh in warehouses for j in range(1, args.locations_per_warehouse + 1)]
+    vendors = [Location(name=f"Vendor {i}", short_code=f"VEND{i}", type=LocationType.VENDOR)
+               for i in range(1, args.vendors + 1)]
+    customers = [Location(name=f"Customer {i}", short_code=f"CUST{i}", type=LocationType.CUSTOMER)
+                 for i in range(1, args.customers + 1)]
+    loss = Location(name="Inventory Loss", short_code="LOSS", type=LocationType.INVENTORY_LOSS)
+    db.add_all(racks + vendors + customers + [loss])
+
+    hashed = pwd_cxt.hash(BENCH_USER_PASSWORD)
+    db.add_all([User(email=f"user{i}@bench.example.com", hashed_password=hashed, full_name=f"Bench User {i}",
+                     role=UserRole.MANAGER if i == 0 else UserRole.STAFF) for i in range(args.users)])
+    db.flush()
+
+    return {
+        "warehouse_codes": {wh.id: wh.short_code for wh in warehouses},
+        "racks": [(loc.id, loc.warehouse_id) for loc in racks],
+        "vendors": [loc.id for loc in vendors],
+        "customers": [loc.id for loc in customers],
+        "loss": loss.id,
+    }
+
+
+def generate_products(conn, n: int, rng: random.Random, batch_size: int) -> None:
+    columns = ("name", "sku", "category", "uom", "cost", "min_reorder_level")
+    for start in range(0, n, batch_size):
+        rows = []
+        for i in range(start, min(start + batch_size, n)):
+            category = rng.choice(CATEGORIES)
+            rows.append((f"{category.rsplit(' ', 1)[0]} item {i}", f"SKU-{i:07d}", category, rng.choice(UOMS),
+                         int(rng.lognormvariate(6, 1.2)), rng.choice((0, 0, 5, 10, 20, 50))))
+        load_rows(conn, Product, columns, rows)
+
+
+def generate_moves(conn, args, master: dict, product_ids: list, rng: random.Random, on_batch=None) -> dict:
+    """Returns the last reference number per (warehouse code, op code)."""
+    popular_product = ZipfSampler(product_ids, args.zipf, rng)
+    # Stock arrives and leaves through the product's home rack (transfers move some of it elsewhere),
+    # so the balances stay mostly positive
+    home_rack = {pid: rng.choice(master["racks"]) for pid in product_ids}
+    codes = master["warehouse_codes"]
+    op_types, op_weights = zip(*OP_MIX)
+    op_cum = list(accumulate(op_weights))
+
+    end = datetime.now(timezone.utc).replace(microsecond=0)
+    start = end - timedelta(days=args.days)
+    span = (end - start).total_seconds()
+    open_since = end - timedelta(days=2)
+    counters = defaultdict(int)
+
+    columns = ("product_id", "quantity", "source_location_id", "destination_location_id", "status",
+               "reference", "op_type", "warehouse_id", "created_at")
+    rows = []
+    for i in range(args.moves):
+        roll = rng.random()
+        op = op_types[bisect(op_cum, roll)] if roll < op_cum[-1] else OperationType.ADJUSTMENT
+        product_id = popular_product()
+        rack, rack_wh = home_rack[product_id]
+        if op == OperationType.RECEIPT:
+            src, src_type, dst, dst_type = rng.choice(master["vendors"]), LocationType.VENDOR, rack, LocationType.INTERNAL
+            quantity = int(rng.lognormvariate(3, 0.9)) + 1
+        elif op == OperationType.DELIVERY:
+            src, src_type, dst, dst_type = rack, LocationType.INTERNAL, rng.choice(master["customers"]), LocationType.CUSTOMER
+            quantity = int(rng.lognormvariate(1.5, 0.8)) + 1
+        elif op == OperationType.INTERNAL:
+            other, _ = rng.choice(master["racks"])
+            src, src_type, dst, dst_type = rack, LocationType.INTERNAL, other, LocationType.INTERNAL
+            quantity = int(rng.lognormvariate(2, 0.8)) + 1
+        else:
+            src, src_type, dst, dst_type = rack, LocationType.INTERNAL, master["loss"], LocationType.INVENTORY_LOSS
+            quantity = rng.randint(1, 5)
+        op_type, warehouse_id = classify_move(src_type, dst_type, rack_wh if src_type == LocationType.INTERNAL else None,
+                                              rack_wh if dst_type == LocationType.INTERNAL else None)
+
+        # id order = time order, a few seconds of jitter
+        created_at = start + timedelta(seconds=span * i / args.moves + rng.random() * 5)
+        if created_at >= open_since:
+            status = rng.choices((MoveStatus.DONE, MoveStatus.WAITING, MoveStatus.DRAFT), (70, 20, 10))[0]
+        else:
+            status = MoveStatus.CANCELLED if rng.random() < 0.03 else MoveStatus.DONE
+
+        prefix = (codes[warehouse_id], OP_CODES[op_type]) if op_type in OP_CODES else ("GEN", "INT")
+        counters[prefix] += 1
+        rows.append((product_id, quantity, src, dst, status, format_reference(*prefix, counters[prefix]),
+                     op_type, warehouse_id, created_at))
+
+        if len(rows) >= args.batch_size:
+            load_rows(conn, StockMove, columns, rows)
+            rows = []
+            if on_batch:
+                on_batch(i + 1)
+    load_rows(conn, StockMove, columns, rows)
+    return counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--warehouses", type=int, default=5)
+    parser.add_argument("--locations-per-warehouse", type=int, default=40, help="Internal racks per warehouse")
+    parser.add_argument("--vendors", type=int, default=30)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--moves", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=730, help="Period the moves are spread over, ending now")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Product popularity exponent (0 = uniform)")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per COPY / INSERT")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engine = make_engine()
+    reset_schema(engine)
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        created = ensure_partitions(conn, since=datetime.now(timezone.utc) - timedelta(days=args.days))
+    if created:
+        print(f"🗓️ {len(created)} stock_moves partitions")
+
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        master = create_master_data(db, args, rng)
+        db.commit()
+
+    with engine.connect() as conn:
+        generate_products(conn, args.products, rng, args.batch_size)
+        conn.commit()
+        product_ids = list(conn.scalars(select(Product.id).order_by(Product.id)))
+        print(f"✅ {args.warehouses} warehouses, {len(master['racks'])} racks, {args.users} users, "
+              f"{len(product_ids):,} products ({time.perf_counter() - started:.0f}s)")
+
+        def progress(done: int):
+            conn.commit()   # one transaction per batch
+            print(f"   {done:,} / {args.moves:,} moves ({time.perf_counter() - started:.0f}s)", end="\r")
+
+        counters = generate_moves(conn, args, master, product_ids, rng, on_batch=progress)
+        conn.commit()
+
+    with Session() as db:
+        # The API's reference numbering continues after the generated ones
+        if counters:
+            stmt = insert_for(db.get_bind())(ReferenceSequence).values([
+                {"warehouse_code": wh, "op_code": op, "last_value": last} for (wh, op), last in counters.items()
+            ])
+            db.execute(stmt.on_conflict_do_update(index_elements=["warehouse_code", "op_code"],
+                                                  set_={"last_value": stmt.excluded.last_value}))
+        db.execute(insert(MoveReference).from_select(
+            ["reference"], select(StockMove.reference).where(StockMove.reference.is_not(None))))
+        quants = rebuild_quants(db)
+        db.commit()
+    print(f"\n✅ {args.moves:,} moves, {quants:,} quants ({time.perf_counter() - started:.0f}s)")
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE"))
+        print(f"✅ VACUUM ANALYZE ({time.perf_counter() - started:.0f}s)")
+    print(f"Log in as user0@bench.example.com / {BENCH_USER_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+# backend/benchmarks/load_suite.py
+"""
+Load test of the real app: throughput and p50 / p95 / p99 latency per endpoint, saved as JSON
+so runs can be compared across commits.
+
+Starts `uvicorn main:app` on BENCH_DATABASE_URL (fill it first with benchmarks.generate_dataset;
+this script does NOT reset anything), logs in as a generated user and hammers one endpoint at
+a time: --concurrency clients for --duration seconds each, after a short warm-up. Request
+parameters are drawn from the dataset (Zipf-popular product ids, existing categories,
+warehouses and references, random week-long date windows), so the caches see a realistic mix.
+
+The client runs in this process: with many uvicorn --workers, check it is not the client that
+saturates (its CPU near 100%) before reading the numbers. Pass --url to test a server you
+started yourself (it must use the same database).
+
+    python -m benchmarks.generate_dataset --products 100000 --moves 10000000
+    python -m benchmarks.load_suite --workers 4 --concurrency 32 --duration 20
+    python -m benchmarks.load_suite --compare benchmarks/results/load_<old>.json benchmarks/results/load_<new>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from sqlalchemy import func, select
+
+from benchmarks.seed import BENCH_DATABASE_URL, make_engine
+from benchmarks.generate_dataset import BENCH_USER_PASSWORD, ZipfSampler
+from models.all_models import Warehouse, Location, LocationType, Product, StockMove, User
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+# ===========================
+#         SCENARIOS
+# ===========================
+
+class Dataset:
+    """What the request parameters are drawn from, read once from the benchmark database."""
+
+    def __init__(self, engine, zipf: float, rng: random.Random):
+        with engine.connect() as conn:
+            self.counts = {model.__tablename__: conn.scalar(select(func.count()).select_from(model))
+                           for model in (Warehouse, Location, Product, StockMove, User)}
+            self.product_ids = list(conn.scalars(select(Product.id)))
+            self.categories = list(conn.scalars(select(Product.category).distinct().where(Product.category.isnot(None))))
+            self.warehouse_ids = list(conn.scalars(select(Warehouse.id)))
+            self.vendors = list(conn.scalars(select(Location.id).where(Location.type == LocationType.VENDOR)))
+            self.racks = list(conn.scalars(select(Location.id).where(Location.type == LocationType.INTERNAL)))
+            self.references = list(conn.scalars(select(StockMove.reference).where(StockMove.reference.isnot(None))
+                                                .order_by(StockMove.id.desc()).limit(1000)))
+            first, last = conn.execute(select(func.min(StockMove.created_at), func.max(StockMove.created_at))).one()
+        if not self.product_ids or not self.warehouse_ids:
+            raise SystemExit("❌ Empty benchmark database: run `python -m benchmarks.generate_dataset` first")
+        # SQLite hands back naive strings / datetimes
+        self.first, self.last = (_as_utc(value) for value in (first, last)) if first else (None, None)
+        self.popular_product = ZipfSampler(self.product_ids, zipf, rng)
+        self.rng = rng
+
+    def week(self) -> dict:
+        if self.first is None:
+            return {}
+        span = max((self.last - self.first).total_seconds() - 7 * 86400, 0)
+        start = self.first + timedelta(seconds=self.rng.random() * span)
+        return {"date_from": start.isoformat(), "date_to": (start + timedelta(days=7)).isoformat()}
+
+    def term(self) -> str:
+        # A fragment of a product name or of a reference, like someone typing in the search box
+        if self.references and self.rng.random() < 0.5:
+            return self.rng.choice(self.references).rsplit("/", 1)[0]
+        return f"item {self.rng.choice(self.product_ids) % 1000}"
+
+
+def _as_utc(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# name -> (method, request builder, Postgres only); a builder returns (path, params, json body)
+SCENARIOS = {
+    "products": ("GET", lambda d: ("/api/products/", {}, None), False),
+    "products: category": ("GET", lambda d: ("/api/products/", {"category": d.rng.choice(d.categories)}, None), False),
+    "products: search": ("GET", lambda d: ("/api/products/", {"search": d.term()}, None), True),     # pg_trgm ranking
+    "product": ("GET", lambda d: (f"/api/products/{d.popular_product()}", {}, None), False),
+    "moves": ("GET", lambda d: ("/api/moves", {}, None), False),
+    "moves: week": ("GET", lambda d: ("/api/moves", d.week(), None), False),
+    "moves: search": ("GET", lambda d: ("/api/moves", {"search": d.term()}, None), False),
+    "receipts": ("GET", lambda d: ("/api/operations/receipts", {"warehouse_id": d.rng.choice(d.warehouse_ids)}, None), False),
+    "deliveries": ("GET", lambda d: ("/api/operations/deliveries", {"warehouse_id": d.rng.choice(d.warehouse_ids)}, None), False),
+    "warehouses": ("GET", lambda d: ("/api/warehouses", {}, None), False),
+    "locations": ("GET", lambda d: ("/api/locations", {}, None), False),
+    "search": ("GET", lambda d: ("/api/search/", {"q": d.term()}, None), True),                        # similarity()
+}
+WRITE_SCENARIOS = {
+    "create move": ("POST", lambda d: ("/api/moves", {}, {
+        "product_id": d.popular_product(), "quantity": d.rng.randint(1, 50), "status": "draft",
+        "source_location_id": d.rng.choice(d.vendors), "destination_location_id": d.rng.choice(d.racks),
+    }), False),
+}
+
+
+# ===========================
+#           RUNNER
+# ===========================
+
+def percentile(sorted_values: list, q: int) -> float:
+    if len(sorted_values) < 2:
+        return sorted_values[0] if sorted_values else 0.0
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[q - 1]
+
+
+async def run_endpoint(client: httpx.AsyncClient, dataset: Dataset, scenario: tuple, concurrency: int,
+                       duration: float, warmup: float) -> dict:
+    method, build, _ = scenario
+    latencies, errors, statuses = [], 0, {}
+
+    async def worker(until: float, record: bool):
+        nonlocal errors
+        while time.perf_counter() < until:
+            path, params, body = build(dataset)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, params=params, json=body)
+                await response.aread()
+                status = response.status_code
+            except httpx.HTTPError:
+                status = "error"
+            if record:
+                latencies.append(time.perf_counter() - started)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                errors += status == "error" or status >= 400
+
+    if warmup > 0:
+        until = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(until, False) for _ in range(concurrency)))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(started + duration, True) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "mean_ms": ms(statistics.fmean(latencies)) if latencies else 0.0,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]) if latencies else 0.0,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int, response_cache: bool) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": BENCH_DATABASE_URL, "REQUEST_LOG": "0"}
+    if not response_cache:
+        env["RESPONSE_CACHE_SIZE"] = "0"
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=Path(__file__).parent.parent, env=env,
+    )
+
+
+async def wait_until_up(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server is not None and server.poll() is not None:
+            raise SystemExit(f"❌ The server exited with code {server.returncode}")
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise SystemExit("❌ The server did not come up")
+
+
+async def run_suite(args, dataset: Dataset, scenarios: dict, base_url: str, server) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        await wait_until_up(client, server)
+        login = await client.post("/api/auth/login", data={"username": args.user, "password": args.password})
+        if login.status_code != 200:
+            raise SystemExit(f"❌ Login as {args.user} failed ({login.status_code}): {login.text}")
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+        results = {}
+        for name, scenario in scenarios.items():
+            results[name] = await run_endpoint(client, dataset, scenario, args.concurrency, args.duration, args.warmup)
+            r = results[name]
+            print(f"{name:<20} | {r['req_per_s']:>8.1f} | {r['p50_ms']:>8.1f} | {r['p95_ms']:>8.1f} | {r['p99_ms']:>8.1f} | {r['errors']:>6}")
+    return results
+
+
+# ===========================
+#      RESULTS & COMPARE
+# ===========================
+
+def git_revision() -> dict:
+    def git(*argv):
+        return subprocess.run(["git", *argv], capture_output=True, text=True, cwd=Path(__file__).parent).stdout.strip()
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def compare(old_path: str, new_path: str) -> None:
+    old, new = (json.loads(Path(p).read_text()) for p in (old_path, new_path))
+    print(f"{(old['meta']['git']['commit'] or '?')[:10]} -> {(new['meta']['git']['commit'] or '?')[:10]}\n")
+    print(f"{'endpoint':<20} | {'req/s':>17} | {'p50 ms':>17} | {'p95 ms':>17} | {'p99 ms':>17}")
+    print("-" * 100)
+
+    def delta(before: float, after: float) -> str:
+        change = f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+        return f"{after:>8.1f} {change:>8}"
+
+    for name, after in new["endpoints"].items():
+        before = old["endpoints"].get(name)
+        if before is None:
+            print(f"{name:<20} | (new endpoint)")
+            continue
+        print(f"{name:<20} | " + " | ".join(delta(before[key], after[key])
+                                            for key in ("req_per_s", "p50_ms", "p95_ms", "p99_ms")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Test this running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clients in flight per endpoint")
+    parser.add_argument("--duration", type=float, default=15, help="Measured seconds per endpoint")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds per endpoint")
+    parser.add_argument("--timeout", type=float, default=60, help="Per request, seconds")
+    parser.add_argument("--only", nargs="+", metavar="ENDPOINT", help=f"Subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--writes", action="store_true", help="Also POST stock moves (changes the dataset)")
+    parser.add_argument("--no-response-cache", action="store_true", help="Start the server with RESPONSE_CACHE_SIZE=0")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Popularity of the product ids requested")
+    parser.add_argument("--user", default="user0@bench.example.com")
+    parser.add_argument("--password", default=BENCH_USER_PASSWORD)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="Result file (default: benchmarks/results/load_<time>_<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Print the change between two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    engine = make_engine()
+    dialect = engine.dialect.name
+    dataset = Dataset(engine, args.zipf, random.Random(args.seed))
+    engine.dispose()
+    scenarios = {**SCENARIOS, **(WRITE_SCENARIOS if args.writes else {})}
+    scenarios = {name: s for name, s in scenarios.items()
+                 if (not args.only or name in args.only) and (dialect == "postgresql" or not s[2])}
+
+    server, base_url = None, args.url
+    if base_url is None:
+        port = free_port()
+        server, base_url = start_server(port, args.workers, not args.no_response_cache), f"http://127.0.0.1:{port}"
+
+    print(f"{sum(dataset.counts.values()):,} rows ({dataset.counts['products']:,} products, "
+          f"{dataset.counts['stock_moves']:,} moves) on {dialect}, {args.concurrency} clients, {args.duration:g}s per endpoint\n")
+    print(f"{'endpoint':<20} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'errors':>6}")
+    print("-" * 75)
+    started_at = datetime.now(timezone.utc)
+    try:
+        endpoints = asyncio.run(run_suite(args, dataset, scenarios, base_url, server))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    git = git_revision()
+    result = {
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "git": git,
+            "python": platform.python_version(),
+            "host": platform.node(),
+            "cpus": os.cpu_count(),
+            "dialect": dialect,
+            "dataset": dataset.counts,
+            "server": {"url": args.url, "workers": None if args.url else args.workers,
+                       "response_cache": None if args.url else not args.no_response_cache},
+            "load": {"concurrency": args.concurrency, "duration_s": args.duration, "warmup_s": args.warmup,
+                     "zipf": args.zipf, "seed": args.seed, "writes": args.writes},
+        },
+        "endpoints": endpoints,
+    }
+    out = Path(args.out) if args.out else \
+        RESULTS_DIR / f"load_{started_at:%Y%m%dT%H%M%SZ}_{(git['commit'] or 'nogit')[:10]}{'-dirty' if git['dirty'] else ''}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2) + "\n")
+    print(f"\n💾 {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# backend/benchmarks/seed.py
+"""
+Shared helpers for the benchmark scripts: engine setup + a quick synthetic dataset.
+"""
+import os
+import random
+import sys
+
+# Benchmarks run against their own database (the models need DATABASE_URL at import time)
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL") or os.getenv("DATABASE_URL") or "sqlite:///./bench.db"
+os.environ.setdefault("DATABASE_URL", BENCH_DATABASE_URL)
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from database.postgresConn import Base
+from models.all_models import Warehouse, Location, LocationType, Product, StockMove, MoveStatus, OperationType
+from utils.quant_service import rebuild_quants
+
+
+def make_engine(url: str = BENCH_DATABASE_URL, **kwargs):
+    return create_engine(url, **kwargs)
+
+
+def reset_schema(engine):
+    """Drops and re-creates every table. ONLY for benchmark databases."""
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+class QueryCounter:
+    """Counts statements sent through an engine while the `with` block is open."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def seed(engine, n_products: int, moves_per_product: int = 5, n_warehouses: int = 2,
+         locations_per_warehouse: int = 4, batch_size: int = 10_000, rng_seed: int = 42):
+    """
+    Fills the tables with a small but realistic shape:
+    receipts (Vendor -> Internal), deliveries (Internal -> Customer) and internal transfers.
+    """
+    rng = random.Random(rng_seed)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        # 1. Warehouses + Locations
+        warehouses = [Warehouse(name=f"Warehouse {i}", short_code=f"WH{i}") for i in range(1, n_warehouses + 1)]
+        db.add_all(warehouses)
+        db.flush()
+
+        internal = []
+        for wh in warehouses:
+            for j in range(1, locations_per_warehouse + 1):
+                internal.append(Location(name=f"{wh.short_code} Rack {j}", short_code=f"{wh.short_code}-R{j}",
+                                         type=LocationType.INTERNAL, warehouse_id=wh.id))
+        vendor = Location(name="Vendor", short_code="VEND", type=LocationType.VENDOR)
+        customer = Location(name="Customer", short_code="CUST", type=LocationType.CUSTOMER)
+        db.add_all(internal + [vendor, customer])
+        db.flush()
+        internal_ids = [loc.id for loc in internal]
+        warehouse_of = {loc.id: loc.warehouse_id for loc in internal}
+
+        # 2. Products
+        for start in range(0, n_products, batch_size):
+            db.execute(insert(Product), [
+                {"name": f"Product {i}", "sku": f"SKU-{i:07d}", "category": f"Cat {i % 50}", "uom": "Units"}
+                for i in range(start, min(start + batch_size, n_products))
+            ])
+        db.flush()
+        product_ids = [pid for (pid,) in db.query(Product.id).order_by(Product.id)]
+
+        # 3. Stock Moves
+        rows = []
+        for pid in product_ids:
+            for _ in range(moves_per_product):
+                roll = rng.random()
+                if roll < 0.5:
+                    src, dst, status = vendor.id, rng.choice(internal_ids), MoveStatus.DONE
+                    op_type, warehouse_id = OperationType.RECEIPT, warehouse_of[dst]
+                elif roll < 0.8:
+                    src, dst = rng.choice(internal_ids), customer.id
+                    status = MoveStatus.DONE if rng.random() < 0.7 else MoveStatus.WAITING
+                    op_type, warehouse_id = OperationType.DELIVERY, warehouse_of[src]
+                else:
+                    src, dst, status = rng.choice(internal_ids), rng.choice(internal_ids), MoveStatus.DONE
+                    op_type, warehouse_id = OperationType.INTERNAL, warehouse_of[src]
+                rows.append({
+                    "product_id": pid, "quantity": rng.randint(1, 20),
+                    "source_location_id": src, "destination_location_id": dst,
+                    "status": status, "reference": None,
+                    "op_type": op_type, "warehouse_id": warehouse_id,
+                })
+            if len(rows) >= batch_size:
+                db.execute(insert(StockMove), rows)
+                rows = []
+        if rows:
+            db.execute(insert(StockMove), rows)
+
+        # 4. Core inserts skip the ORM flush hooks, so derive the quants in one pass
+        rebuild_quants(db)
+        db.commit()
@@ -0,0 +1,123 @@
+# backend/database/partitions.py
+"""
+Monthly range partitions of `stock_moves` on created_at (Postgres only).
+
+- One partition per calendar month (UTC), named stock_moves_pYYYY_MM. `ensure_partitions`
+  creates the missing ones up to PARTITION_MONTHS_AHEAD months from now. It runs at API
+  startup, right after `create_all`, and from `python manage.py partitions ensure` (cron it).
+- stock_moves_default catches rows outside every monthly partition and should stay empty:
+  Postgres refuses to create a month whose rows already sit in the default partition.
+- Queries bounded on created_at (move lists with date_from / date_to, snapshot replays)
+  only scan the partitions they can match.
+- Postgres wants the partition key in every unique constraint, so a partitioned table's
+  primary key is rendered with it (PRIMARY KEY (id, created_at)). The model's primary key
+  stays `id`, so the ORM still identifies a move by its id alone.
+"""
+import os
+import re
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import PrimaryKeyConstraint, text
+from sqlalchemy.ext.compiler import compiles
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+
+PARTITION_BOUNDS_SQL = text("""
+    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = CAST(:table AS regclass)
+""")
+UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+LOWER_BOUND = re.compile(r"FROM \('([^']+)'\)")
+
+
+@compiles(PrimaryKeyConstraint, "postgresql")
+def _primary_key_with_partition_key(constraint, compiler, **kw):
+    ddl = compiler.visit_primary_key_constraint(constraint, **kw)
+    table = constraint.table
+    extra = [name for name in table.info.get("partition_key", ()) if name not in constraint.columns.keys()]
+    if not ddl or not extra or not table.dialect_options["postgresql"].get("partition_by"):
+        return ddl
+    end = ddl.rindex(")")
+    return ddl[:end] + "".join(f", {compiler.preparer.quote(name)}" for name in extra) + ddl[end:]
+
+
+def month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def next_month(moment: datetime) -> datetime:
+    start = month_start(moment)
+    return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+
+def is_partitioned(conn, table: str) -> bool:
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar()
+    return relkind == "p"
+
+
+def _create_month(conn, table: str, start: datetime) -> str:
+    end = next_month(start)
+    name = f"{table}_p{start.astimezone(timezone.utc):%Y_%m}"
+    conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    return name
+
+
+def ensure_partitions(conn, table: str = "stock_moves", months_ahead: int = PARTITION_MONTHS_AHEAD,
+                      now: Optional[datetime] = None, since: Optional[datetime] = None) -> List[str]:
+    """
+    Creates the monthly partitions from the last existing one up to `months_ahead` months
+    from now, plus the default partition. With `since` (loading past moves, e.g. the
+    benchmark dataset), also the months from `since` up to the first existing one.
+    Runs in the caller's transaction; returns the names created (empty when nothing was
+    missing or the table is not partitioned).
+    """
+    if conn.dialect.name != "postgresql" or not is_partitioned(conn, table):
+        return []
+
+    bounds = conn.execute(PARTITION_BOUNDS_SQL, {"table": table}).all()
+    uppers = [UPPER_BOUND.search(bound) for _, bound in bounds if bound != "DEFAULT"]
+    if any(match is None for match in uppers):   # ... TO (MAXVALUE): nothing can come after it
+        return []
+    now = now or datetime.now(timezone.utc)
+    start = max((datetime.fromisoformat(m.group(1)) for m in uppers), default=month_start(now))
+    horizon = next_month(now)                    # the current month, plus `months_ahead` more
+    for _ in range(months_ahead):
+        horizon = next_month(horizon)
+
+    # Creating a partition locks the parent: give up rather than queue behind a long transaction
+    conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+    created = []
+    while start < horizon:
+        created.append(_create_month(conn, table, start))
+        start = next_month(start)
+
+    lowers = [LOWER_BOUND.search(bound) for _, bound in bounds if bound != "DEFAULT"]
+    if since is not None and all(lowers):          # ... FROM (MINVALUE): the past is covered
+        first = min((datetime.fromisoformat(m.group(1)) for m in lowers), default=month_start(now))
+        month = month_start(since)
+        while month < first:
+            created.append(_create_month(conn, table, month))
+            month = next_month(month)
+
+    if not any(bound == "DEFAULT" for _, bound in bounds):
+        conn.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+        created.append(f"{table}_default")
+    return created
+
+
+def create_partitions_after_create(target, connection, **kw) -> None:
+    """`after_create` hook: a partitioned table takes no rows until it has partitions."""
+    ensure_partitions(connection, target.name)
+
+
+async def ensure_partitions_async(engine) -> List[str]:
+    async with engine.begin() as conn:
+        return await conn.run_sync(ensure_partitions)
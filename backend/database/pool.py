@@ -0,0 +1,155 @@
+# backend/database/pool.py
+"""
+Connection pool settings (from the environment) + pools that record their own metrics.
+
+    DB_POOL_SIZE        connections kept open per engine (default 5)
+    DB_MAX_OVERFLOW     extra connections allowed under load (default 10)
+    DB_POOL_TIMEOUT     seconds a request waits for a free connection before failing (default 30)
+    DB_POOL_RECYCLE     seconds after which a connection is replaced (default 1800, -1 = never)
+    DB_POOL_PRE_PING    "always" (SELECT 1 on every checkout), "never", or a number of
+                        seconds: only ping connections that sat idle longer than that (default 30)
+
+Every worker process has its own sync AND async engine, so the worst case against
+Postgres/Supabase is `workers * 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW)` connections.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "30").strip().lower()
+
+
+class PoolMetrics:
+    """Counters for one pool. A wait is the time Pool.connect() took to hand out a connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = self.timeouts = self.connects = self.connect_failures = 0
+        self.pings = self.ping_failures = self.invalidations = 0
+        self.wait_total = self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "connect_failures": self.connect_failures,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+                "invalidations": self.invalidations,
+            }
+
+
+class InstrumentedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        # The whole public checkout: waiting for a slot, opening a connection if the pool
+        # has none idle, and the "checkout" listeners (the idle pre-ping below)
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.incr("timeouts")
+            raise
+        except Exception:
+            self.metrics.incr("connect_failures")
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(async_engine: bool = False) -> dict:
+    """Keyword arguments for create_engine / create_async_engine."""
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if async_engine else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING == "always",
+    }
+
+
+def install_pool_events(engine) -> None:
+    """Idle-based pre-ping + connect/invalidation counters. Pass `async_engine.sync_engine` for async engines."""
+
+    @event.listens_for(engine, "connect")
+    def _count_connect(dbapi_connection, connection_record):
+        engine.pool.metrics.incr("connects")
+
+    @event.listens_for(engine, "invalidate")
+    def _count_invalidation(dbapi_connection, connection_record, exception):
+        engine.pool.metrics.incr("invalidations")
+
+    if DB_POOL_PRE_PING in ("always", "never"):
+        return
+    idle_limit = float(DB_POOL_PRE_PING)
+
+    @event.listens_for(engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        idle_since = connection_record.info.get("checked_in_at")
+        if idle_since is None or time.monotonic() - idle_since < idle_limit:
+            return
+        engine.pool.metrics.incr("pings")
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception as e:
+            engine.pool.metrics.incr("ping_failures")
+            # The pool drops this connection and retries the checkout with a fresh one
+            raise exc.DisconnectionError(str(e)) from e
+
+
+def pool_stats(engine) -> dict:
+    """Live pool counters; the configured limits are the ones pool_options() passed in."""
+    pool = engine.pool
+    stats = {
+        "pool_size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "timeout_seconds": pool.timeout(),
+        "recycle_seconds": DB_POOL_RECYCLE,
+        "pre_ping": DB_POOL_PRE_PING,
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.as_dict())
+    return stats
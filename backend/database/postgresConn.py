@@ -1,19 +1,30 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+import threading
+import time
 from dotenv import load_dotenv
+from fastapi import Request
+
+from auth.token import token_subject
+from database.pool import pool_options, install_pool_events
+from database.query_stats import install_query_events
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-# pool_pre_ping=True checks if the connection is alive before using it
-# This is crucial for Supabase/Cloud DBs
+# Pool size / overflow / timeout / recycle / pre-ping policy come from DB_POOL_* (see database/pool.py)
+# Stale connections are still caught (crucial for Supabase/Cloud DBs), without a ping on every checkout
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    pool_pre_ping=True
+    SQLALCHEMY_DATABASE_URL,
+    **pool_options()
 )
+install_pool_events(engine)
+install_query_events(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -24,4 +35,124 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# ===========================
+#      ASYNC (asyncpg)
+# ===========================
+# The API routes use this stack: a request waiting on Postgres no longer holds one of
+# Starlette's worker threads. The sync engine above stays for manage.py, Alembic & scripts.
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def to_async_url(url: str) -> str:
+    """postgresql[+psycopg2]://... -> postgresql+asyncpg://... (same host, credentials & db)."""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername))\
+        .render_as_string(hide_password=False)
+
+# Set ASYNC_DATABASE_URL explicitly if DATABASE_URL carries libpq-only options (e.g. ?sslmode=)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(SQLALCHEMY_DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **pool_options(async_engine=True)
+)
+install_pool_events(async_engine.sync_engine)
+install_query_events(async_engine.sync_engine)
+
+# expire_on_commit=False: objects stay readable after commit (no lazy refresh outside the DB call)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# ===========================
+#    READ REPLICA (GETs)
+# ===========================
+# List/report routes read through `get_read_db`. With DATABASE_READ_URL unset it is simply
+# the primary. Replicas lag a little, so a client that just wrote keeps reading from the
+# primary for READ_PIN_SECONDS. The pin_writers_to_primary middleware (main.py) records a
+# successful write three ways, and any one of them pins the next reads:
+#   - per user, server-side: the JWT subject of the write. Bearer-token clients need nothing
+#     else, but the pin lives in this worker process only (like the user cache);
+#   - the X-Read-Primary-Until response header: clients behind several workers echo it back
+#     as a request header (cross-origin apps must list it in the CORS expose_headers);
+#   - the sm_read_primary_until cookie, for same-site browser sessions.
+# Client-supplied deadlines count only up to READ_PIN_SECONDS ahead.
+
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+READ_PIN_COOKIE = "sm_read_primary_until"
+READ_PIN_HEADER = "X-Read-Primary-Until"
+READ_PIN_SECONDS = int(os.getenv("READ_PIN_SECONDS", "5"))
+
+if DATABASE_READ_URL:
+    read_engine = create_async_engine(
+        os.getenv("ASYNC_DATABASE_READ_URL") or to_async_url(DATABASE_READ_URL),
+        **pool_options(async_engine=True)
+    )
+    install_pool_events(read_engine.sync_engine)
+    install_query_events(read_engine.sync_engine)
+else:
+    read_engine = async_engine
+
+AsyncReadSessionLocal = async_sessionmaker(read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+class ReadPins:
+    """JWT subject -> time until which that user reads from the primary (this process)."""
+
+    def __init__(self):
+        self._until: dict = {}
+        self._lock = threading.Lock()
+
+    def pin(self, subject: str, until: float) -> None:
+        with self._lock:
+            now = time.time()
+            # Expired pins are dropped as new ones come in
+            self._until = {s: t for s, t in self._until.items() if t > now}
+            self._until[subject] = until
+
+    def is_pinned(self, subject: str) -> bool:
+        return self._until.get(subject, 0) > time.time()
+
+    def __bool__(self) -> bool:
+        return bool(self._until)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
+
+
+read_pins = ReadPins()
+
+def pin_to_primary(request: Request) -> float:
+    """Records a successful write by this client; returns the pin deadline (epoch seconds)."""
+    until = time.time() + READ_PIN_SECONDS
+    subject = token_subject(request.headers.get("authorization"))
+    if subject:
+        read_pins.pin(subject, until)
+    return until
+
+def _valid_pin(value) -> bool:
+    try:
+        return time.time() < float(value or 0) <= time.time() + READ_PIN_SECONDS
+    except ValueError:
+        return False
+
+def is_pinned_to_primary(request: Request) -> bool:
+    if _valid_pin(request.headers.get(READ_PIN_HEADER)) or _valid_pin(request.cookies.get(READ_PIN_COOKIE)):
+        return True
+    # Only decode the token while someone is pinned at all
+    if read_pins:
+        subject = token_subject(request.headers.get("authorization"))
+        return subject is not None and read_pins.is_pinned(subject)
+    return False
+
+async def get_read_db(request: Request):
+    session_factory = AsyncSessionLocal if is_pinned_to_primary(request) else AsyncReadSessionLocal
+    async with session_factory() as db:
+        yield db
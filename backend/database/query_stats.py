@@ -0,0 +1,90 @@
+# backend/database/query_stats.py
+"""
+Per-request SQL accounting: statements sent, time spent in the database, rows returned.
+
+`install_query_events(engine)` (done for every engine in postgresConn.py) adds a pair of
+cursor hooks that add to the QueryStats of the current context, if there is one:
+
+    with track_queries() as stats:
+        ...
+    stats.statements, stats.db_seconds, stats.rows
+
+The request metrics middleware (utils/metrics.py) opens one per HTTP request. Blocks nest:
+an outer block also counts what its inner blocks saw. Outside of any block the hooks only
+do a ContextVar lookup.
+
+`query_budget(n)` is the same block, failing when more than n statements were sent (for
+tests; tests/test_query_budgets.py checks the routes' budgets with it).
+
+Rows are the driver's rowcount: rows returned by a SELECT (affected by INSERT / UPDATE /
+DELETE). Streamed (server-side cursor) results and SQLite SELECTs report none.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+    parent: Optional["QueryStats"] = field(default=None, repr=False)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+# Mutable object, shared with the tasks / threads the request spawns (they copy the context)
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries():
+    """Counts the statements of every engine issued inside the block (this context only)."""
+    stats = QueryStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def query_budget(max_statements: int, label: str = "block"):
+    """`track_queries()` that raises QueryBudgetExceeded if the block sent more than `max_statements`."""
+    with track_queries() as stats:
+        yield stats
+    if stats.statements > max_statements:
+        raise QueryBudgetExceeded(f"{label}: {stats.statements} SQL statements, budget is {max_statements}")
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def install_query_events(engine) -> None:
+    """Pass `async_engine.sync_engine` for async engines."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record_query(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        started = getattr(context, "_query_started", None)
+        if stats is None or started is None:
+            return
+        elapsed, rows = time.perf_counter() - started, max(cursor.rowcount, 0)
+        while stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+            stats.rows += rows
+            stats = stats.parent
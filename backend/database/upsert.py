@@ -0,0 +1,10 @@
+# backend/database/upsert.py
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def insert_for(bind):
+    """
+    Dialect-specific INSERT that supports `.on_conflict_do_update()`.
+    Production runs on Postgres; SQLite is only used by the benchmark scripts.
+    """
+    return sqlite.insert if bind.dialect.name == "sqlite" else postgresql.insert
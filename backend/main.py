@@ -1,7 +1,61 @@
-from fastapi import FastAPI
-from router import authRoutes, inventoryRoutes, productRoutes, operationsRoutes
+import hmac
+import os
+from contextlib import asynccontextmanager
 
-app = FastAPI()
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from router import authRoutes, inventoryRoutes, productRoutes, operationsRoutes, searchRoutes, adminRoutes, exportRoutes
+from auth.hashing import hash_pool
+from utils.email_service import outbox
+from database.postgresConn import READ_PIN_COOKIE, READ_PIN_HEADER, READ_PIN_SECONDS, async_engine, pin_to_primary
+from database.partitions import ensure_partitions_async
+from utils.metrics import RequestMetricsMiddleware, request_metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: background email dispatcher
+    outbox.start()
+    # ...and the stock_moves partitions for the coming months (no-op when they exist)
+    try:
+        created = await ensure_partitions_async(async_engine)
+        if created:
+            print(f"🗓️ Created stock_moves partitions: {', '.join(created)}")
+    except Exception as e:
+        print(f"⚠️ Could not check the stock_moves partitions (run `python manage.py partitions ensure`): {e}")
+    yield
+    # Shutdown: flush queued emails, stop the bcrypt worker processes
+    outbox.stop()
+    hash_pool.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+@app.middleware("http")
+async def pin_writers_to_primary(request: Request, call_next):
+    """
+    After a successful write, this client reads from the primary for READ_PIN_SECONDS (see
+    get_read_db): its user is pinned server-side, and the deadline goes out both as the
+    X-Read-Primary-Until header (to echo back on the next requests) and as a cookie.
+    """
+    response = await call_next(request)
+    if request.method in WRITE_METHODS and response.status_code < 400:
+        until = str(pin_to_primary(request))
+        response.headers[READ_PIN_HEADER] = until
+        response.set_cookie(READ_PIN_COOKIE, until, max_age=READ_PIN_SECONDS, httponly=True, samesite="lax")
+    return response
+
+# Outermost: per-route latency / SQL statements / DB time, structured request log (see utils/metrics.py)
+app.add_middleware(RequestMetricsMiddleware)
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint (this worker's figures). Set METRICS_TOKEN to require a bearer token."""
+    if METRICS_TOKEN and not hmac.compare_digest(request.headers.get("authorization", ""), f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def read_root():
@@ -10,4 +64,7 @@ def read_root():
 app.include_router(authRoutes.router)
 app.include_router(productRoutes.router)
 app.include_router(inventoryRoutes.router)
-app.include_router(operationsRoutes.router)
\ No newline at end of file
+app.include_router(operationsRoutes.router)
+app.include_router(searchRoutes.router)
+app.include_router(adminRoutes.router)
+app.include_router(exportRoutes.router)
\ No newline at end of file
@@ -0,0 +1,238 @@
+# backend/manage.py
+"""
+Maintenance commands. Run from the backend folder:
+
+    python manage.py quants verify     # replay the ledger and report drift
+    python manage.py quants rebuild    # recompute stock_quants from the ledger
+    python manage.py products import catalogue.csv [--rejects rejects.csv]
+    python manage.py snapshots build [--as-of 2026-10-01] [--replace]   # default: last month end
+    python manage.py snapshots backfill --since 2025-01-01               # every missing month end
+    python manage.py snapshots list
+    python manage.py ledger close --cutoff 2026-01-01   # archive older DONE/CANCELLED moves
+    python manage.py ledger verify                      # compacted ledger vs. the original moves
+    python manage.py partitions ensure [--months-ahead 3]  # stock_moves partitions (cron it monthly)
+"""
+import argparse
+import csv
+import sys
+import time
+from datetime import datetime, timezone
+
+from database.postgresConn import SessionLocal, engine
+from database.partitions import PARTITION_MONTHS_AHEAD, ensure_partitions, is_partitioned
+from utils import quant_service
+from utils.import_service import decode_lines, import_products
+from utils import snapshot_service
+from utils import archive_service
+from models.all_models import StockSnapshot
+
+
+def quants_verify(args) -> int:
+    with SessionLocal() as db:
+        drift = quant_service.find_drift(db)
+
+    if not drift:
+        print("✅ stock_quants match the ledger.")
+        return 0
+
+    print(f"❌ {len(drift)} product/location balance(s) drifted from the ledger:")
+    print(f"{'product':>8} {'location':>8} | {'on_hand (quant/ledger)':>24} | {'reserved (quant/ledger)':>24}")
+    for row in drift:
+        print(f"{row.product_id:>8} {row.location_id:>8} | "
+              f"{row.quant_on_hand:>11} / {row.ledger_on_hand:<10} | "
+              f"{row.quant_reserved:>11} / {row.ledger_reserved:<10}")
+    print("Run `python manage.py quants rebuild` to repair.")
+    return 1
+
+
+def quants_rebuild(args) -> int:
+    with SessionLocal() as db:
+        rows = quant_service.rebuild_quants(db)
+        db.commit()
+    print(f"✅ Rebuilt stock_quants from the ledger ({rows} rows).")
+    return 0
+
+
+def products_import(args) -> int:
+    started = time.perf_counter()
+    with open(args.path, "rb") as upload, SessionLocal() as db:
+        try:
+            report = import_products(db, decode_lines(upload), chunk_size=args.chunk_size)
+        except ValueError as e:
+            print(f"❌ {args.path}: {e}")
+            return 1
+        db.commit()
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ Imported {args.path} in {elapsed:.1f}s: {report.inserted} new, {report.updated} updated, "
+          f"{report.duplicates} duplicate line(s) overridden, {report.rejected} rejected.")
+    for error in report.errors[:20]:
+        print(f"   line {error['line']} ({error['sku'] or '-'}): {error['error']}")
+    if report.rejected > 20:
+        print(f"   ... and {report.rejected - 20} more")
+
+    if args.rejects and report.errors:
+        with open(args.rejects, "w", newline="") as out:
+            writer = csv.DictWriter(out, fieldnames=["line", "sku", "error"])
+            writer.writeheader()
+            writer.writerows(report.errors)
+        print(f"   Rejected lines written to {args.rejects}")
+    return 1 if report.rejected else 0
+
+
+def _month_start(now: datetime) -> datetime:
+    return datetime(now.year, now.month, 1, tzinfo=timezone.utc)
+
+
+def snapshots_build(args) -> int:
+    as_of = args.as_of or _month_start(datetime.now(timezone.utc))
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        try:
+            snapshot = snapshot_service.build_snapshot(db, as_of, replace=args.replace)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        db.commit()
+        print(f"✅ Snapshot as of {snapshot.as_of.isoformat()}: {snapshot.line_count} balances "
+              f"({time.perf_counter() - started:.1f}s).")
+    return 0
+
+
+def snapshots_backfill(args) -> int:
+    until = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        existing = {snapshot_service.as_utc(s.as_of) for s in db.query(StockSnapshot)}
+        # Oldest first: each build starts from the one before it and only replays one month
+        for as_of in snapshot_service.month_starts(args.since, until):
+            if as_of in existing:
+                continue
+            snapshot = snapshot_service.build_snapshot(db, as_of)
+            db.commit()
+            print(f"✅ Snapshot as of {as_of.date().isoformat()}: {snapshot.line_count} balances")
+    return 0
+
+
+def snapshots_list(args) -> int:
+    with SessionLocal() as db:
+        snapshots = db.query(StockSnapshot).order_by(StockSnapshot.as_of).all()
+    if not snapshots:
+        print("No snapshots yet. Run `python manage.py snapshots build`.")
+    for s in snapshots:
+        print(f"{s.as_of.isoformat():<32} {s.line_count:>8} balances   (built {s.created_at:%Y-%m-%d %H:%M})")
+    return 0
+
+
+def _print_close_drift(drift: dict) -> int:
+    if not drift["quants"] and not drift["ledger"]:
+        print("✅ Quants match the ledger, and the ledger matches the original moves.")
+        return 0
+    if drift["quants"]:
+        print(f"❌ {len(drift['quants'])} quant(s) drifted from the ledger (see `quants verify`).")
+    if drift["ledger"]:
+        print(f"❌ {len(drift['ledger'])} balance(s) differ between the live ledger and the original moves:")
+        print(f"{'product':>8} {'location':>8} | {'on_hand (live/original)':>24} | {'reserved (live/original)':>24}")
+        for row in drift["ledger"][:50]:
+            print(f"{row.product_id:>8} {row.location_id:>8} | "
+                  f"{row.live_on_hand:>11} / {row.original_on_hand:<10} | "
+                  f"{row.live_reserved:>11} / {row.original_reserved:<10}")
+    return 1
+
+
+def ledger_close(args) -> int:
+    try:
+        cutoff = archive_service.period_cutoff(args.cutoff)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    # A snapshot at the cutoff keeps "stock as of" queries after it from reading the archive
+    if not args.no_snapshot:
+        with SessionLocal() as db:
+            if db.query(StockSnapshot).filter(StockSnapshot.as_of == cutoff).first() is None:
+                snapshot = snapshot_service.build_snapshot(db, cutoff)
+                db.commit()
+                print(f"✅ Snapshot as of {cutoff.date().isoformat()}: {snapshot.line_count} balances")
+
+    started = time.perf_counter()
+    report = archive_service.close_period(
+        SessionLocal, cutoff, batch_size=args.batch_size,
+        on_batch=lambda r: print(f"   batch {r.batches}: {r.archived} moves archived", end="\r"),
+    )
+    print(f"✅ Closed before {cutoff.date().isoformat()} in {time.perf_counter() - started:.1f}s: "
+          f"{report.archived} moves archived, {report.opening_rows} opening-balance rows.")
+
+    with SessionLocal() as db:
+        return _print_close_drift(archive_service.verify_close(db))
+
+
+def ledger_verify(args) -> int:
+    with SessionLocal() as db:
+        return _print_close_drift(archive_service.verify_close(db))
+
+
+def partitions_ensure(args) -> int:
+    with engine.begin() as conn:
+        if conn.dialect.name != "postgresql" or not is_partitioned(conn, "stock_moves"):
+            print("stock_moves is not partitioned here (needs Postgres and the partitioning migration).")
+            return 0
+        created = ensure_partitions(conn, months_ahead=args.months_ahead)
+    if created:
+        print(f"✅ Created {len(created)} partition(s): {', '.join(created)}")
+    else:
+        print(f"✅ Partitions already cover the next {args.months_ahead} month(s).")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="StockMaster maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    quants = commands.add_parser("quants", help="Stock balance table (stock_quants)")
+    quants_actions = quants.add_subparsers(dest="action", required=True)
+    quants_actions.add_parser("verify", help="Replay the ledger and report drift").set_defaults(func=quants_verify)
+    quants_actions.add_parser("rebuild", help="Recompute every quant from the ledger").set_defaults(func=quants_rebuild)
+
+    products = commands.add_parser("products", help="Product catalogue")
+    products_actions = products.add_subparsers(dest="action", required=True)
+    products_import_cmd = products_actions.add_parser("import", help="Create/update products from a CSV (upsert on SKU)")
+    products_import_cmd.add_argument("path", help="CSV with columns name, sku[, category, uom, cost, min_reorder_level]")
+    products_import_cmd.add_argument("--rejects", help="Write rejected lines (line, sku, error) to this CSV")
+    products_import_cmd.add_argument("--chunk-size", type=int, default=5000, help="Rows validated & copied per chunk")
+    products_import_cmd.set_defaults(func=products_import)
+
+    snapshots = commands.add_parser("snapshots", help="Point-in-time stock snapshots (stock_snapshots)")
+    snapshots_actions = snapshots.add_subparsers(dest="action", required=True)
+    build = snapshots_actions.add_parser("build", help="Freeze the balances as of one instant")
+    build.add_argument("--as-of", type=datetime.fromisoformat,
+                       help="ISO date/time, exclusive, UTC if naive (default: start of the current month)")
+    build.add_argument("--replace", action="store_true", help="Rebuild if a snapshot for that instant exists")
+    build.set_defaults(func=snapshots_build)
+    backfill = snapshots_actions.add_parser("backfill", help="Build every missing month-end snapshot")
+    backfill.add_argument("--since", type=datetime.fromisoformat, required=True, help="ISO date of the first month")
+    backfill.set_defaults(func=snapshots_backfill)
+    snapshots_actions.add_parser("list", help="Show the existing snapshots").set_defaults(func=snapshots_list)
+
+    ledger = commands.add_parser("ledger", help="Period close: archive old moves into opening balances")
+    ledger_actions = ledger.add_subparsers(dest="action", required=True)
+    close = ledger_actions.add_parser("close", help="Archive DONE/CANCELLED moves created before the cutoff")
+    close.add_argument("--cutoff", type=datetime.fromisoformat, required=True, help="ISO date (midnight UTC)")
+    close.add_argument("--batch-size", type=int, default=archive_service.ARCHIVE_BATCH_ROWS,
+                       help="Moves archived per transaction")
+    close.add_argument("--no-snapshot", action="store_true", help="Do not build a snapshot at the cutoff")
+    close.set_defaults(func=ledger_close)
+    ledger_actions.add_parser("verify", help="Check quants and the compacted ledger against the original moves")\
+        .set_defaults(func=ledger_verify)
+
+    partitions = commands.add_parser("partitions", help="Monthly stock_moves partitions (Postgres)")
+    partitions_actions = partitions.add_subparsers(dest="action", required=True)
+    ensure = partitions_actions.add_parser("ensure", help="Create the missing partitions up to N months ahead")
+    ensure.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    ensure.set_defaults(func=partitions_ensure)
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    sys.exit(args.func(args))
@@ -1,17 +1,18 @@
 # backend/models/all_models.py
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Enum as PgEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Index, Enum as PgEnum, event
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import enum
 from database.postgresConn import Base
+from database.partitions import create_partitions_after_create
 
 class MoveStatus(str, enum.Enum):
     """Tracks the lifecycle of a stock movement [cite: 25]"""
     
     DRAFT = "draft"       # Planning phase
     WAITING = "waiting"   # Waiting for availability
-    READY = "ready"         # Validated & Stock moved
+    DONE = "done"         # Validated & Stock moved
     CANCELLED = "cancelled"
 
 
@@ -25,6 +26,14 @@ class LocationType(str, enum.Enum):
     CUSTOMER = "customer"         # Virtual
     VENDOR = "vendor"             # Virtual
     INVENTORY_LOSS = "inventory_loss" # Virtual
+    OPENING = "opening"           # Virtual: source of the opening-balance rows left by a period close
+
+class OperationType(str, enum.Enum):
+    """What a move is, from its locations (see utils/reference_service.classify_move)"""
+    RECEIPT = "receipt"           # Vendor -> Warehouse
+    DELIVERY = "delivery"         # Warehouse -> Customer
+    INTERNAL = "internal"         # Warehouse -> Warehouse
+    ADJUSTMENT = "adjustment"     # to / from Inventory Loss, opening balances
 
 
 # --- Database Tables ---
@@ -48,7 +57,7 @@ class Product(Base):
     """
     Master data for items. [cite: 46]
     Note: Current stock quantity is NOT stored here to avoid sync errors. 
-    It is calculated on-the-fly from StockMoves.
+    It lives in StockQuant (per location), which is updated together with every StockMove.
     """
     __tablename__ = "products"
 
@@ -64,6 +73,13 @@ class Product(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Substring search on name / SKU / category (ILIKE '%x%', see utils/search_service.py)
+        Index("ix_products_name_trgm", name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_products_sku_trgm", sku, postgresql_using="gin", postgresql_ops={"sku": "gin_trgm_ops"}),
+        Index("ix_products_category_trgm", category, postgresql_using="gin", postgresql_ops={"category": "gin_trgm_ops"}),
+    )
+
 # 1. NEW TABLE: Warehouse
 class Warehouse(Base):
     __tablename__ = "warehouses"
@@ -90,6 +106,10 @@ class Location(Base):
     
     warehouse = relationship("Warehouse", back_populates="locations")
 
+    __table_args__ = (
+        Index("ix_locations_name_trgm", name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
 
 class StockMove(Base):
     """
@@ -98,10 +118,11 @@ class StockMove(Base):
     - Delivery: Internal -> Customer
     - Internal Transfer: Internal -> Internal
     - Adjustment: Internal -> Inventory Loss
+    On Postgres the table is range-partitioned by month on created_at (see database/partitions.py).
     """
     __tablename__ = "stock_moves"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     
     # What is moving?
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -113,11 +134,144 @@ class StockMove(Base):
     
     # Metadata
     status = Column(PgEnum(MoveStatus), default=MoveStatus.DRAFT) # [cite: 25]
-    reference = Column(String) # Optional: Order #, Receipt #
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    reference = Column(String) # Optional: Order #, Receipt # (numbers: ReferenceSequence, uniqueness: MoveReference)
+    # Stored at creation so the Receipts / Deliveries lists never join `locations`
+    op_type = Column(PgEnum(OperationType))
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id")) # the warehouse the operation belongs to
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False) # partition key
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     product = relationship("Product")
     source_location = relationship("Location", foreign_keys=[source_location_id])
-    dest_location = relationship("Location", foreign_keys=[destination_location_id])
\ No newline at end of file
+    dest_location = relationship("Location", foreign_keys=[destination_location_id])
+
+    __table_args__ = (
+        # No UNIQUE(reference): on a partitioned table it would have to include created_at,
+        # which guarantees nothing. MoveReference keeps references unique instead.
+        # Keyset pagination of the move lists (newest first)
+        Index("ix_stock_moves_created_at_id", created_at.desc(), id.desc()),
+        # Per-product DONE moves (stock replays, product history)
+        Index("ix_stock_moves_product_done", product_id, created_at,
+              postgresql_where=text("status = 'DONE'")),
+        # Open reservations per location
+        Index("ix_stock_moves_waiting_source", source_location_id, product_id,
+              postgresql_where=text("status = 'WAITING'")),
+        # Time-ordered history per source / destination (receipts come from vendors, deliveries go to customers)
+        Index("ix_stock_moves_source_created", source_location_id, created_at.desc(), id.desc()),
+        Index("ix_stock_moves_dest_created", destination_location_id, created_at.desc(), id.desc()),
+        # Every move of a product, newest first (search by product name resolves to product ids)
+        Index("ix_stock_moves_product_created", product_id, created_at.desc(), id.desc()),
+        # Receipts / Deliveries lists, optionally for one warehouse
+        Index("ix_stock_moves_op_created", op_type, created_at.desc(), id.desc()),
+        Index("ix_stock_moves_warehouse_op_created", warehouse_id, op_type, created_at.desc(), id.desc()),
+        Index("ix_stock_moves_reference_trgm", reference, postgresql_using="gin",
+              postgresql_ops={"reference": "gin_trgm_ops"}),
+        {"postgresql_partition_by": "RANGE (created_at)", "info": {"partition_key": ("created_at",)}},
+    )
+
+
+# A partitioned table takes no rows until it has partitions (create_all, benchmarks)
+event.listen(StockMove.__table__, "after_create", create_partitions_after_create)
+
+
+class StockQuant(Base):
+    """
+    Running stock balance per Product x Location.
+    Updated in the same transaction as every StockMove insert/change (see utils/quant_service.py),
+    so stock reads never have to scan the ledger.
+    - on_hand:  DONE moves in - DONE moves out
+    - reserved: WAITING moves out of this location
+    """
+    __tablename__ = "stock_quants"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), primary_key=True)
+    on_hand = Column(Integer, nullable=False, default=0)
+    reserved = Column(Integer, nullable=False, default=0)
+
+    product = relationship("Product")
+    location = relationship("Location")
+
+
+
+class MoveReference(Base):
+    """
+    Every reference ever given to a StockMove, live or archived: the (non-partitioned)
+    primary key keeps references unique across all partitions. Written in the same
+    transaction as the move (see utils/reference_service.py).
+    """
+    __tablename__ = "move_references"
+
+    reference = Column(String, primary_key=True)
+
+
+class ReferenceSequence(Base):
+    """
+    Counter behind StockMove references like WH1/IN/0001, one row per (warehouse, operation).
+    Numbers are handed out with a single atomic upsert (see utils/reference_service.py).
+    """
+    __tablename__ = "reference_sequences"
+
+    warehouse_code = Column(String, primary_key=True) # e.g. "WH1" or "GEN"
+    op_code = Column(String, primary_key=True)        # IN / OUT / INT
+    last_value = Column(Integer, nullable=False, default=0)
+
+
+
+class StockSnapshot(Base):
+    """
+    Frozen Product x Location balances at a point in time (e.g. a month end), used to
+    answer "stock as of <date>" without replaying the whole ledger (see utils/snapshot_service.py).
+    Covers every move created strictly BEFORE `as_of`.
+    """
+    __tablename__ = "stock_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    as_of = Column(DateTime(timezone=True), nullable=False, unique=True)
+    line_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    lines = relationship("StockSnapshotLine", back_populates="snapshot", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class StockSnapshotLine(Base):
+    __tablename__ = "stock_snapshot_lines"
+
+    snapshot_id = Column(Integer, ForeignKey("stock_snapshots.id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), primary_key=True)
+    on_hand = Column(Integer, nullable=False, default=0)
+    reserved = Column(Integer, nullable=False, default=0)
+
+    snapshot = relationship("StockSnapshot", back_populates="lines")
+
+
+class StockMoveArchive(Base):
+    """
+    DONE / CANCELLED moves taken out of `stock_moves` by a period close (utils/archive_service.py).
+    Same columns as StockMove; in the live ledger they are replaced by one opening-balance
+    row per Product x Location. Kept so history and point-in-time queries stay exact.
+    """
+    __tablename__ = "stock_moves_archive"
+
+    id = Column(Integer, primary_key=True)  # the original stock_moves.id
+    product_id = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    source_location_id = Column(Integer, nullable=False)
+    destination_location_id = Column(Integer, nullable=False)
+    status = Column(PgEnum(MoveStatus), nullable=False)
+    reference = Column(String)
+    op_type = Column(PgEnum(OperationType))
+    warehouse_id = Column(Integer)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_stock_moves_archive_created_at", created_at),
+        Index("ix_stock_moves_archive_product_created", product_id, created_at),
+    )
+
+# Registers the StockMove -> StockQuant flush hooks (must come after the models above)
+import utils.quant_service  # noqa: E402,F401
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from auth.hashing import hash_pool
+from auth.oauth2 import get_current_user
+from auth.user_cache import user_cache
+from database.pool import pool_stats
+from database.postgresConn import engine, async_engine, read_engine
+from models.all_models import UserRole
+from utils.email_service import outbox
+from utils.response_cache import response_cache
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["Admin"]
+)
+
+async def require_manager(current_user = Depends(get_current_user)):
+    if current_user.role != UserRole.MANAGER:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Managers only")
+    return current_user
+
+@router.get("/cache/users")
+async def get_user_cache_stats(current_user = Depends(require_manager)):
+    """Hit/miss counters of the authenticated-user cache (for sizing USER_CACHE_SIZE / _TTL_SECONDS)."""
+    return user_cache.stats()
+
+@router.get("/cache/responses")
+async def get_response_cache_stats(current_user = Depends(require_manager)):
+    """Collection versions, hit/miss and 304 counters of the list-response cache (RESPONSE_CACHE_SIZE / _TTL_SECONDS)."""
+    return response_cache.stats()
+
+@router.get("/db-pool")
+async def get_db_pool_stats(current_user = Depends(require_manager)):
+    """
+    Connection pool usage per engine: checked-out connections, overflow in use,
+    checkout wait times, timeouts / connect failures and pre-ping results.
+    Compare `pool_size + max_overflow` (x2 engines x workers) with the server's connection limit.
+    """
+    stats = {"async": pool_stats(async_engine.sync_engine), "sync": pool_stats(engine)}
+    if read_engine is not async_engine:
+        stats["read_replica"] = pool_stats(read_engine.sync_engine)
+    return stats
+
+@router.get("/hash-pool")
+async def get_hash_pool_stats(current_user = Depends(require_manager)):
+    """Password-hashing pool: jobs in flight and logins/signups turned away with a 503 (HASH_POOL_WORKERS / HASH_QUEUE_DEPTH)."""
+    return hash_pool.stats()
+
+@router.get("/email-outbox")
+async def get_email_outbox_stats(current_user = Depends(require_manager)):
+    """Emails queued / waiting for a retry, and sent / retried / dropped since start (EMAIL_* settings)."""
+    return outbox.stats()
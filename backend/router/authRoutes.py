@@ -3,12 +3,13 @@ import os
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from fastapi.responses import HTMLResponse, RedirectResponse 
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 # from requests_html import HTMLResponse
 import uuid , random
 from datetime import datetime, timedelta
 
-from database.postgresConn import get_db
+from database.postgresConn import get_async_db
 # FIX: Import the specific model and schemas needed, with aliases
 from models.all_models import User as UserModel, UserRole
 from schemas.all_schema import (
@@ -19,7 +20,7 @@ from schemas.all_schema import (
     VerifyOtpRequest,        # <-- Added
     ResetPasswordRequest     # <-- Added
 )
-from utils.email_service import send_otp_email
+from utils.email_service import queue_otp_email
 from auth import hashing, token
 from auth.oauth2 import get_current_user
 
@@ -29,34 +30,34 @@ router = APIRouter(
 )
 
 @router.post("/signup", response_model=UserOut) # Assuming you have a schema for response
-def signup(user: UserCreate, db: Session = Depends(get_db)):
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # 1. Check if user exists
-    user_in_db = db.query(UserModel).filter(UserModel.email == user.email).first()
+    user_in_db = await db.scalar(select(UserModel).where(UserModel.email == user.email))
     if user_in_db:
         raise HTTPException(status_code=409, detail="Email already registered")
         
     # 2. Create new user
     new_user = UserModel(
         email=user.email,
-        hashed_password=hashing.Hash.bcrypt(user.password),
+        hashed_password=await hashing.Hash.abcrypt(user.password),
         full_name=user.full_name,
         role=UserRole.STAFF # Default role
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 @router.post("/login", response_model=TokenWithUser)
-def login(request: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(request: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     # Note: request.username will contain the email
-    user = db.query(UserModel).filter(UserModel.email == request.username).first()
+    user = await db.scalar(select(UserModel).where(UserModel.email == request.username))
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid Credentials")
 
-    if not hashing.Hash.verify(request.password, user.hashed_password):
+    if not await hashing.Hash.averify(request.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid Credentials")
 
     access_token = token.create_access_token(data={"sub": user.email})
@@ -71,9 +72,9 @@ def login(request: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(
 # 1. FORGOT PASSWORD (Generate OTP & Send Email)
 # -------------------------------------------------------
 @router.post("/forgot-password")
-def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db)):
+async def forgot_password(request: ForgotPasswordRequest, db: AsyncSession = Depends(get_async_db)):
     # A. Check if user exists
-    user = db.query(UserModel).filter(UserModel.email == request.email).first()
+    user = await db.scalar(select(UserModel).where(UserModel.email == request.email))
     
     if not user:
         # Security: Fake success message to prevent email enumeration
@@ -85,13 +86,11 @@ def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db
     # C. Save OTP to Database (Valid for 10 minutes)
     user.reset_token = otp
     user.reset_token_expiry = datetime.utcnow() + timedelta(minutes=10)
-    db.commit()
+    await db.commit()
 
-    # D. Send Email
-    email_status = send_otp_email(user.email, otp)
-    
-    if not email_status:
-        raise HTTPException(status_code=500, detail="Failed to send email. Check server logs.")
+    # D. Queue the Email (sent in the background by the outbox, with retries)
+    if not queue_otp_email(user.email, otp):
+        raise HTTPException(status_code=503, detail="Email service is busy. Please try again shortly.")
 
     return {"message": "OTP sent successfully to your email."}
 
@@ -100,8 +99,8 @@ def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db
 # 2. VERIFY OTP
 # -------------------------------------------------------
 @router.post("/verify-otp")
-def verify_otp(request: VerifyOtpRequest, db: Session = Depends(get_db)):
-    user = db.query(UserModel).filter(UserModel.email == request.email).first()
+async def verify_otp(request: VerifyOtpRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(UserModel).where(UserModel.email == request.email))
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -121,8 +120,8 @@ def verify_otp(request: VerifyOtpRequest, db: Session = Depends(get_db)):
 # 3. RESET PASSWORD
 # -------------------------------------------------------
 @router.post("/reset-password")
-def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db)):
-    user = db.query(UserModel).filter(UserModel.email == request.email).first()
+async def reset_password(request: ResetPasswordRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(UserModel).where(UserModel.email == request.email))
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -136,19 +135,19 @@ def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db))
         raise HTTPException(status_code=400, detail="OTP has expired. Please request a new one.")
 
     # B. Hash New Password & Update
-    user.hashed_password = hashing.Hash.bcrypt(request.new_password)
+    user.hashed_password = await hashing.Hash.abcrypt(request.new_password)
     
     # C. Clear OTP (One-time use only)
     user.reset_token = None
     user.reset_token_expiry = None
     
-    db.commit()
+    await db.commit()
     
     return {"message": "Password reset successfully. Please login with new password."}
 
 
 @router.get("/me", response_model=UserOut)
-def get_my_profile(current_user: UserModel = Depends(get_current_user)):
+async def get_my_profile(current_user: UserModel = Depends(get_current_user)):
     """
     This route requires a token. 
     Because of this dependency, the 'Authorize' button will appear.
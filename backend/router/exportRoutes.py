@@ -0,0 +1,99 @@
+from datetime import date, datetime
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import desc
+
+from database.postgresConn import AsyncSessionLocal, AsyncReadSessionLocal, is_pinned_to_primary
+from auth.oauth2 import get_current_user
+from models.all_models import Product, StockMove, OperationType
+from utils.export_service import MEDIA_TYPES, moves_export_query, products_export_query, stream_export
+from utils.pagination import created_between
+from utils.search_service import move_filter, product_filter, product_rank
+
+router = APIRouter(
+    prefix="/api/export",
+    tags=["Export"]
+)
+
+FORMAT = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson (one JSON object per line)")
+
+
+def export_response(request: Request, stmt, fmt: str, name: str) -> StreamingResponse:
+    # Exports are reads: replica unless this client just wrote (see get_read_db)
+    session_factory = AsyncSessionLocal if is_pinned_to_primary(request) else AsyncReadSessionLocal
+    filename = f"{name}-{date.today().isoformat()}.{fmt}"
+    return StreamingResponse(
+        stream_export(session_factory, stmt, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# ===========================
+#        STOCK MOVES
+# ===========================
+
+@router.get("/moves")
+async def export_moves(
+    request: Request,
+    format: str = FORMAT,
+    search: str = None,
+    date_from: datetime = None,
+    date_to: datetime = None,
+    current_user = Depends(get_current_user)
+):
+    """The whole move history (or the moves matching `search`), newest first."""
+    stmt = moves_export_query()
+    if search:
+        stmt = stmt.where(move_filter(search))
+    return export_response(request, created_between(stmt, date_from, date_to), format, "moves")
+
+@router.get("/receipts")
+async def export_receipts(
+    request: Request,
+    format: str = FORMAT,
+    search: str = None,
+    date_from: datetime = None,
+    date_to: datetime = None,
+    current_user = Depends(get_current_user)
+):
+    """Incoming Receipts only (Vendor -> Warehouse)."""
+    stmt = moves_export_query().where(StockMove.op_type == OperationType.RECEIPT)
+    if search:
+        stmt = stmt.where(move_filter(search, dest=False, product=False))
+    return export_response(request, created_between(stmt, date_from, date_to), format, "receipts")
+
+@router.get("/deliveries")
+async def export_deliveries(
+    request: Request,
+    format: str = FORMAT,
+    search: str = None,
+    date_from: datetime = None,
+    date_to: datetime = None,
+    current_user = Depends(get_current_user)
+):
+    """Outgoing Deliveries only (Warehouse -> Customer)."""
+    stmt = moves_export_query().where(StockMove.op_type == OperationType.DELIVERY)
+    if search:
+        stmt = stmt.where(move_filter(search, source=False, product=False))
+    return export_response(request, created_between(stmt, date_from, date_to), format, "deliveries")
+
+# ===========================
+#         PRODUCTS
+# ===========================
+
+@router.get("/products")
+async def export_products(
+    request: Request,
+    format: str = FORMAT,
+    search: str = None,
+    category: str = None,
+    current_user = Depends(get_current_user)
+):
+    """Every product with its current On Hand / Free To Use stock."""
+    stmt = products_export_query()
+    if category:
+        stmt = stmt.where(Product.category == category)
+    if search:
+        stmt = stmt.where(product_filter(search)).order_by(None).order_by(desc(product_rank(search)), Product.name)
+    return export_response(request, stmt, format, "products")
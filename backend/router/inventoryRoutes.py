@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List
 from datetime import datetime
-from sqlalchemy import desc
 
-from database.postgresConn import get_db
+from database.postgresConn import get_async_db, get_read_db
 from auth.oauth2 import get_current_user
 from models.all_models import StockMove, Warehouse, Location, LocationType, Product
-from schemas.all_schema import WarehouseCreate, WarehouseOut, LocationCreate, LocationOut, StockMoveCreate, StockMoveOut
+from schemas.all_schema import WarehouseCreate, WarehouseOut, LocationCreate, LocationOut, StockMoveCreate, StockMoveOut, StockMovePage, StockMoveBulkCreate, StockMoveBulkResult
+from utils.pagination import paginate_moves, created_between, MOVE_LOAD_OPTIONS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.reference_service import classify_move, next_reference, reference_prefix
+from utils.search_service import move_filter
+from utils.move_service import bulk_create_moves
+from utils.response_cache import cached_json
+from utils.fast_json import json_response
 
 router = APIRouter(
     prefix="/api",
@@ -18,20 +26,26 @@ router = APIRouter(
 #        WAREHOUSES
 # ===========================
 
+WAREHOUSES_JSON = TypeAdapter(List[WarehouseOut])
+LOCATIONS_JSON = TypeAdapter(List[LocationOut])
+
+# Polled on every screen load: ETag + cached body (see utils/response_cache.py)
 @router.get("/warehouses", response_model=List[WarehouseOut])
-def get_warehouses(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    return db.query(Warehouse).all()
+async def get_warehouses(request: Request, db: AsyncSession = Depends(get_read_db), current_user = Depends(get_current_user)):
+    async def load():
+        return (await db.scalars(select(Warehouse))).all()
+    return await cached_json(request, "warehouses", load, WAREHOUSES_JSON)
 
 @router.post("/warehouses", response_model=WarehouseOut)
-def create_warehouse(wh: WarehouseCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def create_warehouse(wh: WarehouseCreate, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
     new_wh = Warehouse(
         name=wh.name,
         short_code=wh.short_code,
         address=wh.address
     )
     db.add(new_wh)
-    db.commit()
-    db.refresh(new_wh)
+    await db.commit()
+    await db.refresh(new_wh)
     return new_wh
 
 # ===========================
@@ -39,18 +53,22 @@ def create_warehouse(wh: WarehouseCreate, db: Session = Depends(get_db), current
 # ===========================
 
 @router.get("/locations", response_model=List[LocationOut])
-def get_locations(
+async def get_locations(
+    request: Request,
     warehouse_id: int = None, # Optional filter: ?warehouse_id=1
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_read_db), 
     current_user = Depends(get_current_user)
 ):
-    query = db.query(Location)
+    query = select(Location)
     if warehouse_id:
-        query = query.filter(Location.warehouse_id == warehouse_id)
-    return query.all()
+        query = query.where(Location.warehouse_id == warehouse_id)
+
+    async def load():
+        return (await db.scalars(query)).all()
+    return await cached_json(request, "locations", load, LOCATIONS_JSON)
 
 @router.post("/locations", response_model=LocationOut)
-def create_location(loc: LocationCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def create_location(loc: LocationCreate, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
     
     # Validation: If it's an internal location, it SHOULD have a warehouse
     if loc.type == "internal" and not loc.warehouse_id:
@@ -63,8 +81,8 @@ def create_location(loc: LocationCreate, db: Session = Depends(get_db), current_
         warehouse_id=loc.warehouse_id
     )
     db.add(new_loc)
-    db.commit()
-    db.refresh(new_loc)
+    await db.commit()
+    await db.refresh(new_loc)
     return new_loc
 
 # ===========================
@@ -73,12 +91,14 @@ def create_location(loc: LocationCreate, db: Session = Depends(get_db), current_
 # Make sure HTTPException is imported at the top
 from fastapi import HTTPException 
 
-def generate_reference(db: Session, source_id: int, dest_id: int) -> str:
+async def generate_reference(db: AsyncSession, source_id: int, dest_id: int) -> dict:
     """
     Generates IDs like WH1/IN/0001 based on movement type.
+    Returns {"reference", "op_type", "warehouse_id"}: the classification is stored on the move too.
     """
-    source = db.query(Location).get(source_id)
-    dest = db.query(Location).get(dest_id)
+    # Warehouses are loaded up front: a lazy load can't run on an async session
+    source = await db.get(Location, source_id, options=[selectinload(Location.warehouse)])
+    dest = await db.get(Location, dest_id, options=[selectinload(Location.warehouse)])
     
     # --- VALIDATION FIX START ---
     if not source:
@@ -88,53 +108,49 @@ def generate_reference(db: Session, source_id: int, dest_id: int) -> str:
         raise HTTPException(status_code=404, detail=f"Destination Location with ID {dest_id} not found")
     # --- VALIDATION FIX END ---
     
-    # 1. Determine Operation Type
-    op_code = "INT" # Default Internal
-    warehouse_code = "GEN" # General
-    
-    # Safely check source type
-    if source.type == LocationType.VENDOR:
-        op_code = "IN"
-        if dest.warehouse: warehouse_code = dest.warehouse.short_code
-            
-    # Safely check dest type
-    elif dest.type == LocationType.CUSTOMER:
-        op_code = "OUT"
-        if source.warehouse: warehouse_code = source.warehouse.short_code
-
-    # 2. Find the next ID number
-    count = db.query(StockMove).filter(StockMove.reference.contains(f"{op_code}/")).count()
-    sequence = count + 1
-    
-    return f"{warehouse_code}/{op_code}/{sequence:04d}"
+    # 1. Determine Operation Type (IN / OUT / INT) and the warehouse it is numbered under
+    warehouse_code, op_code = reference_prefix(
+        source.type, dest.type,
+        source.warehouse.short_code if source.warehouse else None,
+        dest.warehouse.short_code if dest.warehouse else None,
+    )
+    op_type, warehouse_id = classify_move(source.type, dest.type, source.warehouse_id, dest.warehouse_id)
+
+    # 2. Take the next number from this warehouse/operation's counter (no ledger scan)
+    reference = await db.run_sync(next_reference, warehouse_code, op_code)
+    return {"reference": reference, "op_type": op_type, "warehouse_id": warehouse_id}
 
-@router.get("/moves", response_model=List[StockMoveOut])
-def get_move_history(
+@router.get("/moves", response_model=StockMovePage)
+async def get_move_history(
     search: str = None, # For the search bar in your wireframe
-    db: Session = Depends(get_db), 
+    cursor: str = None, # `next_cursor` from the previous page
+    date_from: datetime = None, # created on/after, UTC if no offset
+    date_to: datetime = None,   # created before
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db), 
     current_user = Depends(get_current_user)
 ):
     """
-    Fetch the Move History for the List View.
+    Fetch the Move History for the List View (newest first, one page at a time).
     Supports filtering by Reference or Contact Name (Location Name).
     """
-    query = db.query(StockMove)
+    query = select(StockMove)
     
     if search:
-        # Search in Reference OR Product Name OR Location Name
-        query = query.join(StockMove.product).join(StockMove.source_location).filter(
-            (StockMove.reference.contains(search)) |
-            (Product.name.contains(search)) |
-            (Location.name.contains(search))
-        )
+        # Search in Reference OR Product Name OR Location Name (trigram-indexed, see search_service)
+        query = query.where(move_filter(search))
         
-    return query.order_by(desc(StockMove.created_at)).all()
+    # Plain rows + orjson, no per-move validation (see utils/fast_json.py)
+    return json_response(await paginate_moves(db, created_between(query, date_from, date_to), cursor, limit))
 
 @router.post("/moves", response_model=StockMoveOut)
-def create_stock_move(move: StockMoveCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    
-    # 1. Generate the Reference ID (WH1/IN/001)
-    ref = generate_reference(db, move.source_location_id, move.destination_location_id)
+async def create_stock_move(move: StockMoveCreate, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
+    # Quantity and status are checked by StockMoveCreate, like every line of /moves/bulk
+    if await db.get(Product, move.product_id) is None:
+        raise HTTPException(status_code=404, detail=f"Product with ID {move.product_id} not found")
+
+    # 1. Generate the Reference ID (WH1/IN/001) + operation type / warehouse
+    classified = await generate_reference(db, move.source_location_id, move.destination_location_id)
     
     # 2. Create the Move Record
     new_move = StockMove(
@@ -143,10 +159,27 @@ def create_stock_move(move: StockMoveCreate, db: Session = Depends(get_db), curr
         source_location_id=move.source_location_id,
         destination_location_id=move.destination_location_id,
         status=move.status,
-        reference=ref
+        **classified
     )
     
     db.add(new_move)
-    db.commit()
-    db.refresh(new_move)
-    return new_move
\ No newline at end of file
+    await db.commit()
+
+    # 3. Re-read it with product & locations (StockMoveOut nests them) in one query
+    return await db.scalar(select(StockMove).options(*MOVE_LOAD_OPTIONS)\
+        .where(StockMove.id == new_move.id).execution_options(populate_existing=True))
+
+@router.post("/moves/bulk", response_model=StockMoveBulkResult)
+async def create_stock_moves_bulk(
+    payload: StockMoveBulkCreate,
+    atomic: bool = False, # ?atomic=true: create nothing if any line is invalid
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Creates many moves in ONE transaction (e.g. a whole vendor receipt).
+    Invalid lines are reported per line instead of failing the batch.
+    """
+    result = await db.run_sync(bulk_create_moves, payload.moves, atomic)
+    await db.commit()
+    return result
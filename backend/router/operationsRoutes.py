@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from sqlalchemy import desc
+from datetime import datetime
 
-from database.postgresConn import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.postgresConn import get_read_db
 from auth.oauth2 import get_current_user
-from models.all_models import StockMove, Location, LocationType
-from schemas.all_schema import StockMoveOut
+from models.all_models import StockMove, OperationType
+from schemas.all_schema import StockMovePage
+from utils.pagination import paginate_moves, created_between, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.search_service import move_filter
+from utils.fast_json import json_response
 
 router = APIRouter(
     prefix="/api/operations",
@@ -17,50 +21,58 @@ router = APIRouter(
 #        RECEIPTS (IN)
 # ==============================
 
-@router.get("/receipts", response_model=List[StockMoveOut])
-def get_receipts(
+@router.get("/receipts", response_model=StockMovePage)
+async def get_receipts(
     search: str = None,
-    db: Session = Depends(get_db), 
+    cursor: str = None,
+    date_from: datetime = None,
+    date_to: datetime = None,
+    warehouse_id: int = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db), 
     current_user = Depends(get_current_user)
 ):
     """
     Fetch ONLY Incoming Receipts (Vendor -> Warehouse).
     Matches the wireframe 'Receipts' view.
     """
-    # Logic: Source location MUST be a Vendor
-    query = db.query(StockMove).join(StockMove.source_location)\
-        .filter(Location.type == LocationType.VENDOR)
+    # Logic: Source location is a Vendor (op_type is stored on the move, no join needed)
+    query = select(StockMove).where(StockMove.op_type == OperationType.RECEIPT)
+    if warehouse_id is not None:
+        query = query.where(StockMove.warehouse_id == warehouse_id)
     
     if search:
         # Search by Reference or Vendor Name
-        query = query.filter(
-            (StockMove.reference.ilike(f"%{search}%")) |
-            (Location.name.ilike(f"%{search}%"))
-        )
+        query = query.where(move_filter(search, dest=False, product=False))
         
-    return query.order_by(desc(StockMove.created_at)).all()
+    # Plain rows + orjson, no per-move validation (see utils/fast_json.py)
+    return json_response(await paginate_moves(db, created_between(query, date_from, date_to), cursor, limit))
 
 # ==============================
 #      DELIVERIES (OUT)
 # ==============================
 
-@router.get("/deliveries", response_model=List[StockMoveOut])
-def get_deliveries(
+@router.get("/deliveries", response_model=StockMovePage)
+async def get_deliveries(
     search: str = None,
-    db: Session = Depends(get_db), 
+    cursor: str = None,
+    date_from: datetime = None,
+    date_to: datetime = None,
+    warehouse_id: int = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db), 
     current_user = Depends(get_current_user)
 ):
     """
     Fetch ONLY Outgoing Deliveries (Warehouse -> Customer).
     """
-    # Logic: Destination location MUST be a Customer
-    query = db.query(StockMove).join(StockMove.dest_location)\
-        .filter(Location.type == LocationType.CUSTOMER)
+    # Logic: Destination location is a Customer
+    query = select(StockMove).where(StockMove.op_type == OperationType.DELIVERY)
+    if warehouse_id is not None:
+        query = query.where(StockMove.warehouse_id == warehouse_id)
     
     if search:
-        query = query.filter(
-            (StockMove.reference.ilike(f"%{search}%")) |
-            (Location.name.ilike(f"%{search}%"))
-        )
+        # Search by Reference or Customer Name
+        query = query.where(move_filter(search, source=False, product=False))
         
-    return query.order_by(desc(StockMove.created_at)).all()
\ No newline at end of file
+    return json_response(await paginate_moves(db, created_between(query, date_from, date_to), cursor, limit))
\ No newline at end of file
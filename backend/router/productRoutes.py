@@ -1,135 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, select, update
 from typing import List
+from datetime import datetime
 
-from database.postgresConn import get_db
+from database.postgresConn import get_async_db, get_read_db, SessionLocal
 from auth.oauth2 import get_current_user
-from models.all_models import Product, StockMove, Location, LocationType, MoveStatus
-from sqlalchemy import func
-from schemas.all_schema import ProductCreate, ProductOut, ProductUpdate
+from models.all_models import Product
+from schemas.all_schema import ProductCreate, ProductOut, ProductUpdate, ProductImportResult
+from utils.stock_service import attach_stock, get_stock_levels
+from utils.fast_json import product_columns, product_row
+from utils.search_service import product_filter, product_rank
+from utils.import_service import decode_lines, import_products
+from utils.response_cache import etag_json
 
 router = APIRouter(
     prefix="/api/products",
     tags=["Products"]
 )
 
+PRODUCT_JSON = TypeAdapter(ProductOut)
+
 # 1. CREATE (Already established, but refined)
 @router.post("/", response_model=ProductOut, status_code=status.HTTP_201_CREATED)
-def create_product(
+async def create_product(
     product: ProductCreate, 
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_async_db), 
     current_user = Depends(get_current_user)
 ):
     # Check for duplicate SKU
-    if db.query(Product).filter(Product.sku == product.sku).first():
+    if await db.scalar(select(Product).where(Product.sku == product.sku)):
         raise HTTPException(status_code=400, detail=f"Product with SKU '{product.sku}' already exists")
 
     new_product = Product(**product.dict())
     db.add(new_product)
-    db.commit()
-    db.refresh(new_product)
+    await db.commit()
+    await db.refresh(new_product)
     return new_product
 
 # 2. READ ALL
 @router.get("/", response_model=List[ProductOut])
-def get_all_products(
+async def get_all_products(
+    request: Request,
     search: str = None, 
     category: str = None,
-    db: Session = Depends(get_db), 
+    as_of: datetime = None, # Historical stock: moves created before this instant only
+    db: AsyncSession = Depends(get_read_db), 
     current_user = Depends(get_current_user)
 ):
-# 1. Get all products
-    query = db.query(Product)
+    # 1. Get all products
+    query = select(Product)
     if category:
-        query = query.filter(Product.category == category)
+        query = query.where(Product.category == category)
     if search:
-        query = query.filter(Product.name.ilike(f"%{search}%"))
-    
-    products = query.all()
+        # Name / SKU / Category, best matches first (pg_trgm, see search_service)
+        query = query.where(product_filter(search)).order_by(desc(product_rank(search)), Product.name)
     
-    # 2. Calculate Stock for EACH product
-    results = []
-    for p in products:
-        # A. Calculate "On Hand" (Physical Stock in Warehouse)
-        # Logic: Incoming Moves (Done) - Outgoing Moves (Done)
-        
-        incoming_qty = db.query(func.sum(StockMove.quantity)).join(StockMove.dest_location)\
-            .filter(StockMove.product_id == p.id)\
-            .filter(StockMove.status == MoveStatus.DONE)\
-            .filter(Location.type == LocationType.INTERNAL).scalar() or 0
-            
-        outgoing_qty = db.query(func.sum(StockMove.quantity)).join(StockMove.source_location)\
-            .filter(StockMove.product_id == p.id)\
-            .filter(StockMove.status == MoveStatus.DONE)\
-            .filter(Location.type == LocationType.INTERNAL).scalar() or 0
-            
-        current_on_hand = incoming_qty - outgoing_qty
-
-        # B. Calculate "Reserved" (Items promised to customers but not shipped yet)
-        reserved_qty = db.query(func.sum(StockMove.quantity)).join(StockMove.source_location)\
-            .filter(StockMove.product_id == p.id)\
-            .filter(StockMove.status == MoveStatus.WAITING)\
-            .filter(Location.type == LocationType.INTERNAL).scalar() or 0
-
-        # C. Free to Use
-        free_qty = current_on_hand - reserved_qty
-
-        # D. Attach data to the product object
-        # (Pydantic will read these attributes)
-        p.on_hand = current_on_hand
-        p.free_to_use = free_qty
-        results.append(p)
-        
-    return results
+    async def load():
+        # Plain column rows, serialized without per-product validation (see utils/fast_json.py)
+        rows = (await db.execute(query.with_only_columns(*product_columns()))).all()
+
+        # 2. Calculate Stock for ALL products in one grouped query
+        # (Re-uses the same filters as a sub-select instead of a giant IN (...) list)
+        levels = await db.run_sync(get_stock_levels, query.with_only_columns(Product.id).order_by(None), as_of)
+        return [product_row(row, levels.get(row.id)) for row in rows]
+
+    # 3. ETag / 304; not body-cached, the stock figures move all the time (see utils/response_cache.py)
+    return await etag_json(request, load)
 
 # 3. READ ONE
 @router.get("/{id}", response_model=ProductOut)
-def get_product(
+async def get_product(
+    request: Request,
     id: int, 
-    db: Session = Depends(get_db), 
+    as_of: datetime = None,
+    db: AsyncSession = Depends(get_read_db), 
     current_user = Depends(get_current_user)
 ):
-    product = db.query(Product).filter(Product.id == id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    async def load():
+        product = await db.get(Product, id)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return (await db.run_sync(attach_stock, [product], None, as_of))[0]
+    return await etag_json(request, load, PRODUCT_JSON)
 
 # 4. UPDATE
 @router.put("/{id}", response_model=ProductOut)
-def update_product(
+async def update_product(
     id: int, 
     product_update: ProductUpdate, 
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_async_db), 
     current_user = Depends(get_current_user)
 ):
-    product_query = db.query(Product).filter(Product.id == id)
-    product = product_query.first()
+    product = await db.get(Product, id)
 
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
     # Check SKU uniqueness if SKU is being updated
     if product_update.sku and product_update.sku != product.sku:
-        existing_sku = db.query(Product).filter(Product.sku == product_update.sku).first()
+        existing_sku = await db.scalar(select(Product).where(Product.sku == product_update.sku))
         if existing_sku:
             raise HTTPException(status_code=400, detail=f"SKU '{product_update.sku}' is already taken")
 
     # Update only provided fields
     update_data = product_update.dict(exclude_unset=True)
-    product_query.update(update_data, synchronize_session=False)
+    if update_data:
+        await db.execute(update(Product).where(Product.id == id).values(**update_data))
     
-    db.commit()
-    db.refresh(product)
+    await db.commit()
+    await db.refresh(product)
     return product
 
 # 5. DELETE
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_product(
+async def delete_product(
     id: int, 
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_async_db), 
     current_user = Depends(get_current_user)
 ):
-    product = db.query(Product).filter(Product.id == id).first()
+    product = await db.get(Product, id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -137,6 +129,33 @@ def delete_product(
     # before deleting to prevent database integrity errors.
     # for now, standard delete is fine.
     
-    db.delete(product)
-    db.commit()
-    return None
\ No newline at end of file
+    await db.delete(product)
+    await db.commit()
+    return None
+
+# 6. BULK IMPORT (CSV catalogue)
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+def _import_upload(upload) -> dict:
+    # COPY runs on the sync psycopg2 engine (asyncpg has no copy_expert), in a worker thread
+    with SessionLocal() as db:
+        report = import_products(db, decode_lines(upload))
+        db.commit()
+    return {
+        "inserted": report.inserted, "updated": report.updated, "duplicates": report.duplicates,
+        "rejected": report.rejected, "errors": report.errors[:IMPORT_MAX_REPORTED_ERRORS],
+    }
+
+@router.post("/import", response_model=ProductImportResult)
+async def import_product_catalogue(
+    file: UploadFile = File(..., description="CSV with columns name, sku[, category, uom, cost, min_reorder_level]"),
+    current_user = Depends(get_current_user)
+):
+    """
+    Creates or updates (matched on SKU) every valid row of a supplier catalogue.
+    Invalid rows are skipped and reported with their line number.
+    """
+    try:
+        return await run_in_threadpool(_import_upload, file.file)
+    except ValueError as e:   # CsvFormatError (with the line number) or a missing header column
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {e}")
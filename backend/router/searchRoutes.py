@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.postgresConn import get_read_db
+from auth.oauth2 import get_current_user
+from schemas.all_schema import SearchResults
+from utils.search_service import TYPEAHEAD_MIN_LENGTH, typeahead
+
+router = APIRouter(
+    prefix="/api/search",
+    tags=["Search"]
+)
+
+@router.get("/", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=TYPEAHEAD_MIN_LENGTH, description="Part of a product name/SKU/category, location name or move reference"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db), 
+    current_user = Depends(get_current_user)
+):
+    """
+    Global typeahead over products, locations and moves.
+    Every branch is served by a pg_trgm GIN index (hence 3 characters at least);
+    moves are limited to the recent ones (TYPEAHEAD_MOVE_DAYS).
+    """
+    return await db.run_sync(typeahead, q, limit)
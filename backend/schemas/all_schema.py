@@ -111,7 +111,7 @@
 
 
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from enum import Enum
 from datetime import datetime
@@ -124,6 +124,19 @@ class LocationType(str, Enum):
     CUSTOMER = "customer"
     VENDOR = "vendor"
     INVENTORY_LOSS = "inventory_loss"
+    OPENING = "opening"
+
+class OperationType(str, Enum):
+    RECEIPT = "receipt"
+    DELIVERY = "delivery"
+    INTERNAL = "internal"
+    ADJUSTMENT = "adjustment"
+
+class MoveStatus(str, Enum):
+    DRAFT = "draft"
+    WAITING = "waiting"
+    DONE = "done"
+    CANCELLED = "cancelled"
 
 # ===========================
 #        2. AUTH SCHEMAS
@@ -190,7 +203,8 @@ class ProductUpdate(BaseModel):
     min_reorder_level: Optional[int] = None
 
 class ProductCreate(ProductBase):
-    pass
+    # Product.cost is an Integer column: the database would silently round 12.5
+    cost: Optional[float] = Field(0.0, multiple_of=1)
 
 class ProductOut(ProductBase):
     id: int
@@ -201,6 +215,18 @@ class ProductOut(ProductBase):
     class Config:
         from_attributes = True
 
+class ProductImportError(BaseModel):
+    line: int                  # line number in the uploaded CSV (header = line 1)
+    sku: Optional[str] = None
+    error: str
+
+class ProductImportResult(BaseModel):
+    inserted: int
+    updated: int
+    duplicates: int            # lines overridden by a later line with the same SKU
+    rejected: int
+    errors: List[ProductImportError]   # first IMPORT_MAX_REPORTED_ERRORS rejected lines
+
 # ===========================
 #    4. WAREHOUSE SCHEMAS
 # ===========================
@@ -249,12 +275,15 @@ class StockMoveBase(BaseModel):
     status: str = "draft" 
 
 class StockMoveCreate(StockMoveBase):
-    pass 
+    quantity: int = Field(..., gt=0)
+    status: MoveStatus = MoveStatus.DRAFT
 
 class StockMoveOut(StockMoveBase):
     id: int
     reference: str        
     created_at: datetime  
+    op_type: Optional[OperationType] = None
+    warehouse_id: Optional[int] = None
     
     # Now Python knows what these are because they were defined above
     product: ProductOut 
@@ -262,4 +291,35 @@ class StockMoveOut(StockMoveBase):
     dest_location: LocationOut
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class StockMoveBulkCreate(BaseModel):
+    # Lines are checked one by one (same rules as StockMoveCreate, see utils/move_service.py):
+    # a bad line is reported on its own instead of failing the whole request
+    moves: List[StockMoveBase] = Field(..., min_length=1, max_length=1000)
+
+class StockMoveBulkLine(BaseModel):
+    index: int                        # position in the request's `moves` list
+    id: Optional[int] = None
+    reference: Optional[str] = None
+    error: Optional[str] = None       # set when this line was not created
+
+class StockMoveBulkResult(BaseModel):
+    created: int
+    failed: int
+    lines: List[StockMoveBulkLine]
+
+class StockMovePage(BaseModel):
+    """One page of moves. Pass `next_cursor` back as ?cursor= to get the next page."""
+    items: List[StockMoveOut]
+    next_cursor: Optional[str] = None
+
+
+# ===========================
+#      7. SEARCH SCHEMAS
+# ===========================
+class SearchResults(BaseModel):
+    """Typeahead hits: products & locations ranked by similarity, moves by recency."""
+    products: List[ProductOut]
+    locations: List[LocationOut]
+    moves: List[StockMoveOut]
@@ -0,0 +1,171 @@
+# backend/tests/conftest.py
+"""
+The tests run the real app against a throw-away database whose tables they DROP and
+re-create: TEST_DATABASE_URL (a local Postgres, for the Postgres-only tests) or a SQLite
+file in the temp directory. DATABASE_URL is never used, so they can't reach a real database.
+
+    cd backend && pip install -r requirements-dev.txt && python -m pytest
+    TEST_DATABASE_URL=postgresql://localhost/stockmaster_test python -m pytest
+
+The read-replica tests also need a second throw-away database standing in for the replica:
+
+    TEST_DATABASE_READ_URL=postgresql://localhost/stockmaster_test_replica
+"""
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL") or \
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'stockmaster_test.db')}"
+# The models and engines read these at import time
+os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"] = TEST_DATABASE_URL
+TEST_DATABASE_READ_URL = os.getenv("TEST_DATABASE_READ_URL")
+if TEST_DATABASE_READ_URL:
+    os.environ["DATABASE_READ_URL"] = TEST_DATABASE_READ_URL
+else:
+    os.environ.pop("DATABASE_READ_URL", None)
+os.environ["REQUEST_LOG"] = "0"
+
+import httpx
+import pytest
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from benchmarks.seed import make_engine, reset_schema, seed
+from auth.oauth2 import get_current_user
+from auth.token import create_access_token
+from auth.user_cache import user_cache
+from database.postgresConn import async_engine, read_engine
+from database.query_stats import query_budget as _query_budget
+from models.all_models import StockMove, User, UserRole
+from utils.response_cache import response_cache
+from main import app
+
+IS_POSTGRES = TEST_DATABASE_URL.startswith("postgresql")
+LEDGER_DAYS = 90
+
+
+def pytest_collection_modifyitems(config, items):
+    skips = {
+        "postgres": not IS_POSTGRES and pytest.mark.skip(reason="needs TEST_DATABASE_URL=postgresql://..."),
+        "replica": not TEST_DATABASE_READ_URL and pytest.mark.skip(reason="needs TEST_DATABASE_READ_URL"),
+    }
+    for item in items:
+        for marker, skip in skips.items():
+            if skip and marker in item.keywords:
+                item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def engine():
+    engine = make_engine(TEST_DATABASE_URL)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def replica_engine():
+    """The stand-in read replica (TEST_DATABASE_READ_URL), or None."""
+    if not TEST_DATABASE_READ_URL:
+        yield None
+        return
+    engine = make_engine(TEST_DATABASE_READ_URL)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def seed_database(engine, replica_engine):
+    """
+    `seed_database(n_products, moves_per_product=5)`: empties the database and seeds it.
+    The replica, if any, gets the same seed (it is deterministic), as if it had caught up.
+    """
+    def _seed(n_products: int, moves_per_product: int = 5):
+        for target in filter(None, (engine, replica_engine)):
+            reset_schema(target)
+            seed(target, n_products, moves_per_product=moves_per_product)
+        response_cache.clear()
+    return _seed
+
+
+@pytest.fixture
+def dated_ledger(engine, replica_engine, seed_database):
+    """
+    `dated_ledger(n_products, moves_per_product=5)`: a seeded ledger whose moves are spread
+    over the last LEDGER_DAYS days in id order (the seed creates them all "now").
+    """
+    def _seed(n_products: int, moves_per_product: int = 5):
+        seed_database(n_products, moves_per_product=moves_per_product)
+        now = datetime.now(timezone.utc)
+        for target in filter(None, (engine, replica_engine)):
+            with Session(target) as db:
+                ids = db.scalars(select(StockMove.id).order_by(StockMove.id)).all()
+                db.execute(
+                    update(StockMove.__table__).where(StockMove.id == bindparam("move_id"))
+                    .values(created_at=bindparam("at")),
+                    [{"move_id": move_id, "at": now - timedelta(days=LEDGER_DAYS) * (1 - i / len(ids))}
+                     for i, move_id in enumerate(ids)],
+                )
+                db.commit()
+    return _seed
+
+
+class Api:
+    """
+    Calls the app in-process (httpx ASGI transport) on a fresh event loop per request. The
+    loop runs in the caller's context, so `track_queries()` around a call sees its SQL.
+    """
+
+    def __init__(self, headers: dict = None):
+        self.headers = headers or {}
+
+    def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        async def call():
+            transport = httpx.ASGITransport(app=app)
+            try:
+                async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=self.headers) as client:
+                    return await client.request(method, path, **kwargs)
+            finally:
+                # Pooled async connections belong to this loop
+                await async_engine.dispose()
+                if read_engine is not async_engine:
+                    await read_engine.dispose()
+        return asyncio.run(call())
+
+    def get(self, path: str, **kwargs) -> httpx.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> httpx.Response:
+        return self.request("POST", path, **kwargs)
+
+
+@pytest.fixture
+def api():
+    """Client of the app with authentication switched off."""
+    app.dependency_overrides[get_current_user] = lambda: None
+    yield Api()
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+def make_api():
+    """`make_api(headers)`: client of the app with authentication on (e.g. a Bearer token)."""
+    return Api
+
+
+@pytest.fixture
+def manager(engine, seed_database):
+    """Authorization header of a manager (for the /api/admin routes), on a freshly seeded database."""
+    seed_database(1, moves_per_product=0)
+    with Session(engine) as db:
+        db.add(User(email="manager@example.com", hashed_password="-", role=UserRole.MANAGER))
+        db.commit()
+    user_cache.clear()
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'manager@example.com'})}"}
+
+
+@pytest.fixture
+def query_budget():
+    """`with query_budget(n, label):` fails the test when the block sends more than n SQL statements."""
+    return _query_budget
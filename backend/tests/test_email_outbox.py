@@ -0,0 +1,82 @@
+# backend/tests/test_email_outbox.py
+"""
+Email outbox (utils/email_service.py): failed sends are retried with exponential backoff
+up to max_attempts, then dropped; stopping the outbox drops what still waits for a retry.
+"""
+import time
+
+import pytest
+
+from utils.email_service import EmailMessage, EmailOutbox
+
+BASE = 0.05   # retry_base_seconds: retries after 0.05, 0.1, 0.2 ... s
+
+
+class FlakyTransport:
+    """Fails its first `failures` batches, then sends everything; records when it was called."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = []
+
+    def send_batch(self, messages):
+        self.calls.append(time.monotonic())
+        return list(messages) if len(self.calls) <= self.failures else []
+
+
+@pytest.fixture
+def make_outbox():
+    """`make_outbox(failures, **options)`: a started outbox over a FlakyTransport, stopped afterwards."""
+    outboxes = []
+
+    def _make(failures: int, **options):
+        outbox = EmailOutbox(transport=FlakyTransport(failures), **{"retry_base_seconds": BASE, **options})
+        outboxes.append(outbox)
+        outbox.enqueue(EmailMessage(to_email="user@example.com", subject="OTP", html_content="123456"))
+        return outbox
+    yield _make
+    for outbox in outboxes:
+        outbox.stop()
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_failed_sends_are_retried_with_backoff(make_outbox):
+    outbox = make_outbox(failures=2, max_attempts=5)
+
+    wait_for(lambda: outbox.sent == 1)
+
+    calls = outbox.transport.calls
+    assert len(calls) == 3
+    assert calls[1] - calls[0] >= BASE and calls[2] - calls[1] >= 2 * BASE
+    assert outbox.stats() == {"queued": 0, "retrying": 0, "sent": 1, "retried": 2, "dropped": 0}
+
+
+def test_message_is_dropped_after_max_attempts(make_outbox):
+    outbox = make_outbox(failures=99, max_attempts=3)
+
+    wait_for(lambda: outbox.dropped == 1)
+
+    assert len(outbox.transport.calls) == 3
+    assert outbox.stats() == {"queued": 0, "retrying": 0, "sent": 0, "retried": 2, "dropped": 1}
+
+
+def test_stop_drops_pending_retries(make_outbox, capsys):
+    outbox = make_outbox(failures=99, retry_base_seconds=60)
+    wait_for(lambda: outbox.stats()["retrying"] == 1)
+
+    outbox.stop()
+
+    assert outbox.stats() == {"queued": 0, "retrying": 0, "sent": 0, "retried": 1, "dropped": 1}
+    assert "giving up on email to user@example.com after 1 attempt(s)" in capsys.readouterr().out
+
+
+def test_stats_are_served_to_managers(make_api, manager):
+    stats = make_api(manager).get("/api/admin/email-outbox").json()
+
+    assert set(stats) == {"queued", "retrying", "sent", "retried", "dropped"}
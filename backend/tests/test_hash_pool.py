@@ -0,0 +1,38 @@
+# backend/tests/test_hash_pool.py
+"""
+Password hashing pool (auth/hashing.py): once its workers and queue are full, signups and
+logins are turned away at once with a 503 + Retry-After, counted on /api/admin/hash-pool.
+"""
+import time
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from auth.hashing import HashPool
+from models.all_models import User
+
+
+@pytest.fixture
+def saturated_pool(monkeypatch):
+    """A pool with one worker and no queue, busy with a job for the whole test."""
+    pool = HashPool(workers=1, queue_depth=0)
+    monkeypatch.setattr("auth.hashing.hash_pool", pool)
+    monkeypatch.setattr("router.adminRoutes.hash_pool", pool)
+    busy = pool.submit(time.sleep, 1)
+    yield pool
+    busy.cancel()
+    pool.shutdown()
+
+
+def test_saturated_pool_is_a_503(make_api, engine, manager, saturated_pool):
+    signup = {"email": "new@example.com", "full_name": "New", "password": "secret"}
+
+    response = make_api().post("/api/auth/signup", json=signup)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    with Session(engine) as db:
+        assert db.scalar(select(User).where(User.email == signup["email"])) is None
+    stats = make_api(manager).get("/api/admin/hash-pool").json()
+    assert stats == {"workers": 1, "queue_depth": 0, "in_flight": 1, "rejected": 1}
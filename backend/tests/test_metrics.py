@@ -0,0 +1,82 @@
+# backend/tests/test_metrics.py
+"""
+Request metrics (utils/metrics.py): requests through the app feed the per-route histograms,
+and GET /metrics serves them in the Prometheus text format, behind METRICS_TOKEN when set.
+"""
+import re
+from collections import defaultdict
+
+import pytest
+
+from utils.metrics import request_metrics
+
+# name{label="value",...} value  (text exposition format 0.0.4)
+SAMPLE = re.compile(r'([a-zA-Z_:][a-zA-Z0-9_:]*)\{((?:[a-zA-Z_]\w*="(?:[^"\\]|\\.)*",?)*)\} (\S+)')
+LABEL = re.compile(r'([a-zA-Z_]\w*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse(text: str) -> dict:
+    """{metric name: {frozenset of (label, value): float}}; fails on any malformed line."""
+    samples, types = defaultdict(dict), {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+        elif line.startswith("# HELP "):
+            continue
+        else:
+            match = SAMPLE.fullmatch(line)
+            assert match, f"not a sample line: {line!r}"
+            name, labels, value = match.groups()
+            assert re.sub(r"_(bucket|sum|count)$", "", name) in types, f"{name} has no # TYPE"
+            samples[name][frozenset(LABEL.findall(labels))] = float(value)
+    return samples
+
+
+def series(samples: dict, name: str, **labels) -> dict:
+    """The samples of `name` carrying these labels, keyed by their remaining labels."""
+    wanted = set(labels.items())
+    return {frozenset(key - wanted): value for key, value in samples[name].items() if wanted <= key}
+
+
+@pytest.fixture
+def requests_made(api, seed_database):
+    """Two product reads and one miss since the metrics were cleared."""
+    seed_database(3)
+    request_metrics.clear()
+    for path in ("/api/products/1", "/api/products/2", "/api/products/999999"):
+        api.get(path)
+
+
+def test_requests_feed_the_histograms(api, requests_made):
+    response = api.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = parse(response.text)
+    route = {"method": "GET", "route": "/api/products/{id}"}
+    assert series(samples, "http_request_duration_seconds_count", **route) == {
+        frozenset({("status", "200")}): 2, frozenset({("status", "404")}): 1}
+
+    ok = {**route, "status": "200"}
+    for histogram in ("http_request_duration_seconds", "http_request_db_statements"):
+        buckets = sorted(series(samples, f"{histogram}_bucket", **ok).items(),
+                         key=lambda item: float(dict(item[0])["le"]))
+        counts = [count for _, count in buckets]
+        assert counts == sorted(counts) and dict(buckets[-1][0])["le"] == "+Inf"
+        assert counts[-1] == series(samples, f"{histogram}_count", **ok)[frozenset()] == 2
+    assert series(samples, "http_request_db_statements_sum", **ok)[frozenset()] >= 2
+    assert frozenset() in series(samples, "http_request_db_rows_total", **ok)   # SQLite reports no SELECT rowcount
+
+
+@pytest.mark.parametrize("headers, status", [
+    ({}, 401),
+    ({"Authorization": "Bearer wrong"}, 401),
+    ({"Authorization": "Bearer scrape-me"}, 200),
+])
+def test_metrics_token(api, monkeypatch, headers, status):
+    monkeypatch.setattr("main.METRICS_TOKEN", "scrape-me")
+
+    response = api.get("/metrics", headers=headers)
+
+    assert response.status_code == status
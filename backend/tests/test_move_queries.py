@@ -0,0 +1,169 @@
+# backend/tests/test_move_queries.py
+"""
+Writing and listing moves: single and bulk creation (validation, references, quants), the
+lists loading product and locations in the page query (no lazy load per move), and
+references staying unique across the partitions.
+"""
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database.query_stats import track_queries
+from models.all_models import StockMove, StockQuant, Product, Location, LocationType, ReferenceSequence
+from utils.pagination import MAX_PAGE_SIZE
+from utils.quant_service import find_drift
+
+MOVE_LISTS = ["/api/moves", "/api/operations/receipts", "/api/operations/deliveries"]
+
+
+def statements(api, path: str, **params) -> tuple:
+    with track_queries() as stats:
+        response = api.get(path, params=params)
+    response.raise_for_status()
+    return stats.statements, len(response.json()["items"])
+
+
+@pytest.mark.parametrize("path", MOVE_LISTS)
+def test_move_list_statement_count_does_not_grow_with_the_page(api, seed_database, path):
+    seed_database(5, moves_per_product=2)
+    small, small_rows = statements(api, path, limit=MAX_PAGE_SIZE)
+    seed_database(200, moves_per_product=5)
+    large, large_rows = statements(api, path, limit=MAX_PAGE_SIZE)
+
+    assert large_rows > small_rows
+    assert large == small == 1
+
+
+def test_move_history_pages_cost_the_same(api, seed_database):
+    seed_database(100, moves_per_product=5)
+    first = api.get("/api/moves", params={"limit": 50}).json()
+    with track_queries() as stats:
+        second = api.get("/api/moves", params={"limit": 50, "cursor": first["next_cursor"]}).json()
+
+    assert stats.statements == 1
+    assert len(second["items"]) == 50
+
+
+def test_a_reference_cannot_be_used_twice(engine, seed_database):
+    seed_database(2, moves_per_product=1)
+    with Session(engine) as db:
+        template = db.scalars(select(StockMove).limit(1)).one()
+        copy = lambda: StockMove(product_id=template.product_id, quantity=1, reference="WH1/IN/0001",
+                                 source_location_id=template.source_location_id,
+                                 destination_location_id=template.destination_location_id)
+        db.add(copy())
+        db.commit()
+
+        db.add(copy())   # another created_at, so another row as far as the partitioned table goes
+        with pytest.raises(IntegrityError):
+            db.commit()
+
+
+# ===========================
+#      CREATING MOVES
+# ===========================
+
+@pytest.fixture
+def places(engine, seed_database):
+    """A seeded ledger; returns a product and a WH1 rack, the vendor and the customer."""
+    seed_database(3, moves_per_product=2)
+    with Session(engine) as db:
+        of_type = lambda t: db.scalar(select(Location.id).where(Location.type == t).order_by(Location.id).limit(1))
+        return {
+            "product": db.scalar(select(Product.id).order_by(Product.id).limit(1)),
+            "rack": of_type(LocationType.INTERNAL),   # the seed's first rack is WH1's
+            "vendor": of_type(LocationType.VENDOR),
+            "customer": of_type(LocationType.CUSTOMER),
+        }
+
+
+def receipt(places, **changes) -> dict:
+    return {"product_id": places["product"], "quantity": 5, "source_location_id": places["vendor"],
+            "destination_location_id": places["rack"], "status": "done", **changes}
+
+
+def delivery(places, **changes) -> dict:
+    return receipt(places, source_location_id=places["rack"], destination_location_id=places["customer"], **changes)
+
+
+def ledger_state(engine) -> tuple:
+    """Everything a rejected batch must leave untouched."""
+    with Session(engine) as db:
+        return (
+            db.scalar(select(func.count()).select_from(StockMove)),
+            db.execute(select(StockQuant.product_id, StockQuant.location_id, StockQuant.on_hand, StockQuant.reserved)
+                       .order_by(StockQuant.product_id, StockQuant.location_id)).all(),
+            db.execute(select(ReferenceSequence.warehouse_code, ReferenceSequence.op_code,
+                              ReferenceSequence.last_value).order_by(ReferenceSequence.warehouse_code)).all(),
+        )
+
+
+@pytest.mark.parametrize("changes, status_code", [
+    ({"quantity": 0}, 422),
+    ({"quantity": -3}, 422),
+    ({"status": "shipped"}, 422),
+    ({"product_id": 999_999}, 404),
+])
+def test_single_create_rejects_what_bulk_rejects(api, engine, places, changes, status_code):
+    before = ledger_state(engine)
+    assert api.post("/api/moves", json=receipt(places, **changes)).status_code == status_code
+    assert api.post("/api/moves/bulk", json={"moves": [receipt(places, **changes)]}).json()["failed"] == 1
+    assert ledger_state(engine) == before
+
+
+def test_atomic_bulk_creates_nothing_when_a_line_is_bad(api, engine, places):
+    before = ledger_state(engine)
+    moves = [receipt(places), receipt(places, quantity=0), delivery(places)]
+
+    result = api.post("/api/moves/bulk", params={"atomic": "true"}, json={"moves": moves}).json()
+
+    assert (result["created"], result["failed"]) == (0, 3)
+    assert all(line["error"] and line["id"] is None for line in result["lines"])
+    assert ledger_state(engine) == before
+
+
+def test_bulk_reports_bad_lines_and_creates_the_good_ones(api, engine, places):
+    moves = [receipt(places), receipt(places, product_id=999_999), delivery(places),
+             delivery(places, quantity=0), receipt(places, status="shipped")]
+
+    result = api.post("/api/moves/bulk", json={"moves": moves}).json()
+
+    assert (result["created"], result["failed"]) == (2, 3)
+    assert [line["index"] for line in result["lines"]] == [0, 1, 2, 3, 4]
+    errors = {line["index"]: line["error"] for line in result["lines"] if line["error"]}
+    assert errors == {1: "Product with ID 999999 not found", 3: "Quantity must be positive",
+                      4: "Unknown status 'shipped'"}
+    created = {line["id"]: line["reference"] for line in result["lines"] if not line["error"]}
+    with Session(engine) as db:
+        stored = dict(db.execute(select(StockMove.id, StockMove.reference).where(StockMove.id.in_(created))).all())
+    assert stored == created
+
+
+def test_bulk_references_follow_the_single_creates(api, places):
+    first = api.post("/api/moves", json=receipt(places)).json()["reference"]
+    lines = api.post("/api/moves/bulk", json={"moves": [
+        receipt(places), delivery(places), receipt(places), receipt(places), delivery(places),
+    ]}).json()["lines"]
+    last = api.post("/api/moves", json=receipt(places)).json()["reference"]
+
+    references = [first] + [line["reference"] for line in lines] + [last]
+    assert references == ["WH1/IN/0001", "WH1/IN/0002", "WH1/OUT/0001", "WH1/IN/0003",
+                          "WH1/IN/0004", "WH1/OUT/0002", "WH1/IN/0005"]
+
+
+def test_bulk_updates_the_quants(api, engine, places):
+    def quant():
+        with Session(engine) as db:
+            row = db.get(StockQuant, (places["product"], places["rack"]))
+            return (row.on_hand, row.reserved) if row else (0, 0)
+
+    on_hand, reserved = quant()
+    result = api.post("/api/moves/bulk", json={"moves": [
+        receipt(places, quantity=7), delivery(places, quantity=2, status="waiting"), delivery(places, quantity=1),
+    ]}).json()
+
+    assert result["created"] == 3
+    assert quant() == (on_hand + 7 - 1, reserved + 2)
+    with Session(engine) as db:
+        assert find_drift(db) == []
@@ -0,0 +1,80 @@
+# backend/tests/test_period_close.py
+"""
+Period close (utils/archive_service.py): archiving the closed moves before a cutoff and
+folding them into opening-balance rows must leave every live balance as it was.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from models.all_models import StockMove, StockQuant
+from utils.archive_service import close_period, opening_location, verify_close
+from utils.stock_service import get_stock_levels
+
+CUTOFF = (datetime.now(timezone.utc) - timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
+CLEAN = {"quants": [], "ledger": []}
+
+
+@pytest.fixture
+def sessions(engine, dated_ledger):
+    """A sessionmaker on 20 products x 5 moves spread over the last 90 days."""
+    dated_ledger(20)
+    return sessionmaker(bind=engine)
+
+
+def quants(db) -> dict:
+    return {(q.product_id, q.location_id): (q.on_hand, q.reserved) for q in db.scalars(select(StockQuant))}
+
+
+def live_ledger(db) -> list:
+    moves = StockMove.__table__
+    return db.execute(select(moves).order_by(moves.c.id)).all()
+
+
+def test_close_leaves_live_balances_unchanged(sessions):
+    with sessions() as db:
+        quants_before, levels_before = quants(db), get_stock_levels(db)
+        moves_before = len(live_ledger(db))
+        assert verify_close(db) == CLEAN
+
+    report = close_period(sessions, CUTOFF, batch_size=25)
+
+    assert report.archived > 25 and report.batches > 1 and report.opening_rows > 0
+    with sessions() as db:
+        opening_id = opening_location(db).id
+        assert {key: value for key, value in quants(db).items() if key[1] != opening_id} == quants_before
+        assert get_stock_levels(db) == levels_before
+        assert verify_close(db) == CLEAN
+        assert len(live_ledger(db)) == moves_before - report.archived + report.opening_rows
+
+
+def test_closing_the_same_cutoff_again_changes_nothing(sessions):
+    first = close_period(sessions, CUTOFF, batch_size=25)
+    with sessions() as db:
+        ledger, balances = live_ledger(db), quants(db)
+
+    again = close_period(sessions, CUTOFF, batch_size=25)
+
+    assert (again.archived, again.opening_rows) == (0, first.opening_rows)
+    with sessions() as db:
+        assert live_ledger(db) == ledger
+        assert quants(db) == balances
+        assert verify_close(db) == CLEAN
+
+
+def test_interrupted_close_resumes(sessions):
+    with sessions() as db:
+        levels_before = get_stock_levels(db)
+
+    def crash(report):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        close_period(sessions, CUTOFF, batch_size=25, on_batch=crash)   # the first batch is committed
+    close_period(sessions, CUTOFF, batch_size=25)
+
+    with sessions() as db:
+        assert get_stock_levels(db) == levels_before
+        assert verify_close(db) == CLEAN
@@ -0,0 +1,77 @@
+# backend/tests/test_product_import.py
+"""
+CSV catalogue import (POST /api/products/import): COPY + merge on Postgres, chunked upserts
+on SQLite. Bad rows are reported with their line number; an unreadable file is a 400.
+"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.all_models import Product
+
+
+def upload(api, content):
+    content = content.encode() if isinstance(content, str) else content
+    return api.post("/api/products/import", files={"file": ("catalogue.csv", content, "text/csv")})
+
+
+def products(engine, *skus) -> dict:
+    with Session(engine) as db:
+        return {p.sku: p for p in db.scalars(select(Product).where(Product.sku.in_(skus)))}
+
+
+@pytest.fixture
+def catalogue(seed_database):
+    """A seeded catalogue: SKU-0000000 .. SKU-0000002."""
+    seed_database(3, moves_per_product=0)
+
+
+def test_rejected_rows_are_reported_with_their_line(api, engine, catalogue):
+    result = upload(api, "name,sku,cost\n"
+                         "Bolt,B-1,10\n"
+                         ",B-2,5\n"
+                         "Nut,N-1,12.5\n"
+                         "Washer,W-1,abc\n"
+                         "Screw,S-1,3\n").json()
+
+    assert (result["inserted"], result["rejected"]) == (2, 3)
+    assert [(e["line"], e["sku"]) for e in result["errors"]] == [(3, "B-2"), (4, "N-1"), (5, "W-1")]
+    assert result["errors"][0]["error"].startswith("name:")
+    assert "multiple of 1" in result["errors"][1]["error"]      # Product.cost is an integer: no rounding
+    assert result["errors"][2]["error"].startswith("cost:")
+    assert set(products(engine, "B-1", "B-2", "N-1", "W-1", "S-1")) == {"B-1", "S-1"}
+
+
+def test_last_line_wins_for_a_repeated_sku(api, engine, catalogue):
+    result = upload(api, "name,sku,cost\n"
+                         "First,D-1,1\n"
+                         "Other,D-2,2\n"
+                         "Second,D-1,3\n").json()
+
+    assert (result["inserted"], result["updated"], result["duplicates"]) == (2, 0, 1)
+    stored = products(engine, "D-1")["D-1"]
+    assert (stored.name, stored.cost) == ("Second", 3)
+
+
+def test_existing_skus_are_updated(api, engine, catalogue):
+    result = upload(api, "name,sku,category\n"
+                         "Renamed,SKU-0000001,Fasteners\n"
+                         "Brand new,NEW-1,\n").json()
+
+    assert (result["inserted"], result["updated"], result["rejected"]) == (1, 1, 0)
+    stored = products(engine, "SKU-0000001", "NEW-1")
+    assert (stored["SKU-0000001"].name, stored["SKU-0000001"].category) == ("Renamed", "Fasteners")
+    assert stored["NEW-1"].category == "General"     # empty cell: the schema default
+
+
+@pytest.mark.parametrize("content, detail", [
+    ('"name,sku\nBolt,B-1\n', "Invalid CSV: line 1: unexpected end of data"),      # the header never ends
+    ("name,category\nBolt,Fasteners\n", "Invalid CSV: CSV header is missing required column(s): sku"),
+    ("name,sku\nBolt,B-1\nW\xe4sher,W-1\n".encode("latin-1"), "Invalid CSV: line 3: not UTF-8 text (byte 2 of the line)"),
+])
+def test_unreadable_file_is_a_400(api, engine, catalogue, content, detail):
+    response = upload(api, content)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+    assert products(engine, "B-1", "W-1") == {}
@@ -0,0 +1,42 @@
+# backend/tests/test_query_budgets.py
+"""
+Query budget (N+1 guard) of the public list routes: every route is called on a small and
+on a large dataset and must stay within its statement budget on both. A per-product stock
+sum or a lazy relationship load shows up as a count that grows with the page.
+"""
+import pytest
+
+from utils.pagination import MAX_PAGE_SIZE
+from utils.response_cache import response_cache
+
+# name, path, query params, statement budget, Postgres only
+ROUTE_BUDGETS = [
+    ("products", "/api/products/", {}, 2, False),             # products + one grouped stock query
+    ("products: category", "/api/products/", {"category": "Cat 1"}, 2, False),
+    ("products: search", "/api/products/", {"search": "Product 1"}, 2, True),   # pg_trgm ranking
+    ("product", "/api/products/1", {}, 2, False),
+    ("moves", "/api/moves", {"limit": MAX_PAGE_SIZE}, 1, False),   # product & locations joined in
+    ("moves: search", "/api/moves", {"limit": MAX_PAGE_SIZE, "search": "Rack 1"}, 1, False),
+    ("receipts", "/api/operations/receipts", {"limit": MAX_PAGE_SIZE}, 1, False),
+    ("deliveries", "/api/operations/deliveries", {"limit": MAX_PAGE_SIZE, "warehouse_id": 1}, 1, False),
+    ("warehouses", "/api/warehouses", {}, 1, False),
+    ("locations", "/api/locations", {}, 1, False),
+]
+
+
+@pytest.fixture(scope="module", params=[20, 2000], ids=["small", "large"])
+def dataset(request, seed_database):
+    """Products in the database (module-scoped: pytest runs every route on one size, then the other)."""
+    seed_database(request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("path, params, budget", [
+    pytest.param(path, params, budget, id=name, marks=[pytest.mark.postgres] if postgres_only else [])
+    for name, path, params, budget, postgres_only in ROUTE_BUDGETS
+])
+def test_route_within_query_budget(api, dataset, query_budget, path, params, budget):
+    response_cache.clear()   # measure the database path, not a cached body
+    with query_budget(budget, path):
+        response = api.get(path, params=params)
+    response.raise_for_status()
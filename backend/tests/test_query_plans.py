@@ -0,0 +1,88 @@
+# backend/tests/test_query_plans.py
+"""
+Query-plan regression tests for the hot ledger queries (Postgres only): EXPLAIN every
+statement behind the list, stock and reservation endpoints on a seeded ledger and fail if
+one of them falls back to a sequential scan on stock_moves / stock_quants.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import String, cast, desc, func, select, text, tuple_, update
+
+from models.all_models import StockMove, Location, LocationType, MoveStatus, OperationType
+from utils.pagination import DEFAULT_PAGE_SIZE
+from utils.search_service import TYPEAHEAD_MOVE_DAYS, _ilike
+from utils.stock_service import stock_levels_query
+
+pytestmark = pytest.mark.postgres
+
+# Small lookup tables (locations, warehouses) may be seq-scanned; the ledger may not.
+GUARDED_TABLES = {"stock_moves", "stock_quants"}
+
+
+def _page(stmt):
+    return stmt.order_by(desc(StockMove.created_at), desc(StockMove.id)).limit(DEFAULT_PAGE_SIZE + 1)
+
+
+# name -> statement, built from the realistic parameters of the `ledger` fixture
+HOT_QUERIES = {
+    "move history: first page": lambda p: _page(select(StockMove)),
+    "move history: deep page": lambda p: _page(select(StockMove).where(
+        tuple_(StockMove.created_at, StockMove.id) < tuple_(p["middle"].created_at, p["middle"].id))),
+    "receipts: first page": lambda p: _page(select(StockMove).where(StockMove.op_type == OperationType.RECEIPT)),
+    "deliveries: first page": lambda p: _page(select(StockMove).where(StockMove.op_type == OperationType.DELIVERY)),
+    "location history: first page": lambda p: _page(select(StockMove)
+        .where(StockMove.destination_location_id == p["internal_id"])),
+    "product DONE moves": lambda p: select(func.sum(StockMove.quantity))
+        .where(StockMove.product_id == p["product_id"], StockMove.status == MoveStatus.DONE),
+    "open reservations at a location": lambda p: select(StockMove.product_id, func.sum(StockMove.quantity))
+        .where(StockMove.source_location_id == p["internal_id"], StockMove.status == MoveStatus.WAITING)
+        .group_by(StockMove.product_id),
+    "product stock (quants)": lambda p: stock_levels_query([p["product_id"]]),
+    "typeahead: recent moves by reference": lambda p: select(StockMove.id)
+        .where(_ilike(StockMove.reference, "MV/1234"),
+               StockMove.created_at >= datetime.now(timezone.utc) - timedelta(days=TYPEAHEAD_MOVE_DAYS))
+        .order_by(desc(StockMove.created_at), desc(StockMove.id)).limit(10),
+}
+
+
+def seq_scans(plan: dict) -> list:
+    """Every guarded relation that the plan reads with a Seq Scan."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in GUARDED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def explain(conn, stmt) -> dict:
+    # literal_binds runs the type processors too (enums are stored by NAME, e.g. 'VENDOR')
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    raw = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql.replace("%", "%%")).scalar()
+    return (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+
+@pytest.fixture(scope="module")
+def ledger(engine, seed_database):
+    """A connection to a seeded, ANALYZEd ledger and the parameters of the hot queries."""
+    seed_database(10_000, moves_per_product=10)
+    with engine.begin() as conn:    # the seed leaves the references empty
+        conn.execute(update(StockMove).values(reference="MV/" + cast(StockMove.id, String)))
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        middle_offset = conn.execute(select(func.count(StockMove.id))).scalar() // 2
+        params = {
+            "product_id": conn.execute(select(func.min(StockMove.product_id))).scalar(),
+            "internal_id": conn.execute(
+                select(func.min(Location.id)).where(Location.type == LocationType.INTERNAL)).scalar(),
+            "middle": conn.execute(_page(select(StockMove.created_at, StockMove.id)).offset(middle_offset)).first(),
+        }
+        yield conn, params
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_does_not_scan_the_ledger(ledger, name):
+    conn, params = ledger
+    assert seq_scans(explain(conn, HOT_QUERIES[name](params))) == []
@@ -0,0 +1,132 @@
+# backend/tests/test_read_replica.py
+"""
+Read routing of get_read_db: after a successful write a client reads from the primary for
+READ_PIN_SECONDS (its user server-side, the echoed X-Read-Primary-Until header or the
+cookie), everyone else from DATABASE_READ_URL.
+
+The end-to-end tests run the app against two databases: TEST_DATABASE_URL as the primary and
+TEST_DATABASE_READ_URL as the replica. Nothing replicates between them, so a row written
+through the API is only visible to reads that were routed to the primary.
+"""
+import time
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from auth.token import create_access_token
+from auth.user_cache import user_cache
+from database.postgresConn import (
+    READ_PIN_COOKIE, READ_PIN_HEADER, READ_PIN_SECONDS,
+    is_pinned_to_primary, pin_to_primary, read_pins,
+)
+from models.all_models import Location, LocationType, Product, User
+
+WRITER, READER = "writer@example.com", "reader@example.com"
+
+
+def bearer(email: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+
+def make_request(headers: dict = None) -> Request:
+    raw = [(k.lower().encode(), str(v).encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+@pytest.fixture(autouse=True)
+def no_pins():
+    read_pins.clear()
+    yield
+    read_pins.clear()
+
+
+# ===========================
+#     ROUTING (no replica)
+# ===========================
+
+def test_reads_go_to_the_replica_without_a_pin():
+    assert not is_pinned_to_primary(make_request())
+    assert not is_pinned_to_primary(make_request(bearer(READER)))
+
+
+@pytest.mark.parametrize("carrier", ["header", "cookie"])
+@pytest.mark.parametrize("offset, pinned", [
+    (READ_PIN_SECONDS / 2, True),
+    (-1, False),                       # expired
+    (READ_PIN_SECONDS + 3600, False),  # further ahead than the server ever hands out
+])
+def test_client_supplied_pin(carrier, offset, pinned):
+    until = str(time.time() + offset)
+    headers = {READ_PIN_HEADER: until} if carrier == "header" else {"Cookie": f"{READ_PIN_COOKIE}={until}"}
+    assert is_pinned_to_primary(make_request(headers)) is pinned
+
+
+def test_malformed_pin_is_ignored():
+    assert not is_pinned_to_primary(make_request({READ_PIN_HEADER: "soon"}))
+
+
+def test_pin_is_per_user():
+    pin_to_primary(make_request(bearer(WRITER)))
+
+    assert is_pinned_to_primary(make_request(bearer(WRITER)))
+    assert not is_pinned_to_primary(make_request(bearer(READER)))
+    assert not is_pinned_to_primary(make_request())
+    assert not is_pinned_to_primary(make_request({"Authorization": "Bearer not-a-jwt"}))
+
+
+# ===========================
+#   PRIMARY + REPLICA (e2e)
+# ===========================
+
+@pytest.fixture(scope="module")
+def replica_pair(engine, seed_database):
+    """The same seed on both databases, two users; returns the body of a valid new move."""
+    seed_database(20)
+    with Session(engine) as db:
+        db.add_all([User(email=email, hashed_password="-") for email in (WRITER, READER)])
+        db.commit()
+        move = {
+            "product_id": db.scalar(select(Product.id).limit(1)),
+            "source_location_id": db.scalar(select(Location.id).where(Location.type == LocationType.VENDOR).limit(1)),
+            "destination_location_id": db.scalar(
+                select(Location.id).where(Location.type == LocationType.INTERNAL).limit(1)),
+            "quantity": 3,
+        }
+    user_cache.clear()
+    return move
+
+
+def move_ids(api, **headers) -> set:
+    response = api.get("/api/moves", headers=headers)
+    assert response.status_code == 200
+    return {item["id"] for item in response.json()["items"]}
+
+
+@pytest.mark.replica
+def test_writer_reads_its_write_and_others_read_the_replica(replica_pair, make_api):
+    writer, reader = make_api(bearer(WRITER)), make_api(bearer(READER))
+
+    response = writer.post("/api/moves", json=replica_pair)
+    assert response.status_code == 200
+    new_id, until = response.json()["id"], response.headers[READ_PIN_HEADER]
+
+    # No cookie jar between these calls: the writer is pinned by its token alone
+    assert new_id in move_ids(writer)
+    assert new_id not in move_ids(reader)
+
+    # Another worker process knows nothing of the pin, unless the client echoes the header
+    read_pins.clear()
+    assert new_id not in move_ids(writer)
+    assert new_id in move_ids(writer, **{READ_PIN_HEADER: until})
+
+
+@pytest.mark.replica
+def test_failed_write_does_not_pin(replica_pair, make_api):
+    writer = make_api(bearer(WRITER))
+
+    response = writer.post("/api/moves", json={**replica_pair, "quantity": "lots"})
+    assert response.status_code == 422
+    assert READ_PIN_HEADER not in response.headers
+    assert not read_pins
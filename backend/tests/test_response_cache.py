@@ -0,0 +1,59 @@
+# backend/tests/test_response_cache.py
+"""
+Conditional GET of the list routes (utils/response_cache.py): a client that sends back the
+ETag it was given gets a 304, and a write through the API changes what the next read returns.
+"""
+import pytest
+
+from database.postgresConn import READ_PIN_HEADER
+from utils.response_cache import response_cache
+
+NEW_ROWS = {
+    "/api/warehouses": {"name": "Overflow", "short_code": "WH9"},
+    "/api/locations": {"name": "Overflow shelf", "short_code": "WH1/SHELF", "warehouse_id": 1},
+}
+
+
+@pytest.fixture
+def catalogue(seed_database):
+    seed_database(3)
+
+
+@pytest.mark.parametrize("path, cached", [
+    ("/api/warehouses", True),
+    ("/api/locations", True),
+    ("/api/products/", False),      # rendered on every request: the 304 saves the transfer only
+    ("/api/products/1", False),
+])
+def test_matching_etag_is_a_304(api, catalogue, query_budget, monkeypatch, path, cached):
+    # The seed has just bumped every collection: behind a replica nothing is cached for a while
+    monkeypatch.setattr("utils.response_cache.SETTLE_SECONDS", 0)
+    first = api.get(path)
+    etag = first.headers["ETag"]
+    not_modified = response_cache.stats()["not_modified"]
+
+    with query_budget(0 if cached else 2, path):
+        again = api.get(path, headers={"If-None-Match": etag})
+
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == etag
+    assert response_cache.stats()["not_modified"] == not_modified + 1
+
+    stale = api.get(path, headers={"If-None-Match": '"something-older"'})
+    assert stale.status_code == 200
+    assert (stale.headers["ETag"], stale.content) == (etag, first.content)
+
+
+@pytest.mark.parametrize("path", NEW_ROWS)
+def test_a_write_changes_the_list_body(api, catalogue, path):
+    before = api.get(path)
+
+    created = api.post(path, json=NEW_ROWS[path])
+    assert created.status_code == 200
+    # Echo the read pin, as a client behind a replica would: the new row is on the primary only
+    after = api.get(path, headers={"If-None-Match": before.headers["ETag"],
+                                   READ_PIN_HEADER: created.headers[READ_PIN_HEADER]})
+
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert created.json() in after.json() and created.json() not in before.json()
@@ -0,0 +1,234 @@
+# backend/utils/archive_service.py
+"""
+Period close: ledger archival and compaction.
+
+`close_period(cutoff)` moves every DONE / CANCELLED move created before `cutoff` into
+`stock_moves_archive` and folds what they did into ONE opening-balance row per
+Product x Location: a DONE move out of the virtual "Opening Balance" location, created at
+`cutoff`, reference OB/<yyyymmdd>/<product id>/<location id>. Opening rows left by an
+earlier close are older than the new cutoff, so they are archived and folded in too.
+
+- Live balances do not change: per location, the archived moves and the opening rows add
+  up to the same on_hand. The only quants that move are the Opening Balance location's.
+- Work happens in batches of `batch_size` moves, each in its own short transaction that
+  locks only those rows. The opening rows are upserted (quantity += batch total), so an
+  interrupted close is resumed by simply running it again. Their references are
+  registered in move_references like any other move's.
+- Opening quantities can be negative (vendor locations give stock away). DRAFT and WAITING
+  moves stay in the live ledger whatever their age.
+- `verify_close` checks the result: quants vs. live ledger, and live ledger vs. the
+  original moves (live + archive) replayed from scratch.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import bindparam, func, insert, select
+from sqlalchemy.orm import Session
+
+from models.all_models import MoveReference, StockMove, StockMoveArchive, Location, LocationType, MoveStatus
+from utils.quant_service import Deltas, apply_deltas, find_drift, ledger_balances_query, merge_deltas, move_deltas
+from utils.reference_service import classify_move, register_references
+from utils.snapshot_service import as_utc, moves_between
+
+ARCHIVE_BATCH_ROWS = 5000
+CLOSED_STATUSES = (MoveStatus.DONE, MoveStatus.CANCELLED)
+MOVE_COLUMNS = ("id", "product_id", "quantity", "source_location_id", "destination_location_id",
+                "status", "reference", "op_type", "warehouse_id", "created_at", "updated_at")
+
+
+@dataclass
+class CloseReport:
+    cutoff: datetime
+    archived: int = 0
+    batches: int = 0
+    opening_rows: int = 0
+
+
+def period_cutoff(cutoff: datetime) -> datetime:
+    """Periods close at midnight UTC (the opening references only carry the date)."""
+    cutoff = as_utc(cutoff).astimezone(timezone.utc)
+    if (cutoff.hour, cutoff.minute, cutoff.second, cutoff.microsecond) != (0, 0, 0, 0):
+        raise ValueError(f"The cutoff must be a midnight UTC, got {cutoff.isoformat()}")
+    return cutoff
+
+
+def opening_reference(cutoff: datetime, product_id: int, location_id: int) -> str:
+    return f"OB/{cutoff:%Y%m%d}/{product_id}/{location_id}"
+
+
+def opening_location(db: Session) -> Location:
+    """The virtual location opening-balance rows come from (created on first use)."""
+    location = db.scalars(
+        select(Location).where(Location.type == LocationType.OPENING).order_by(Location.id).limit(1)
+    ).first()
+    if location is None:
+        location = Location(name="Opening Balance", short_code="OPENING", type=LocationType.OPENING)
+        db.add(location)
+        db.flush()
+    return location
+
+
+# ===========================
+#          CLOSING
+# ===========================
+
+def _archive_batch(db: Session, cutoff: datetime, opening_id: int, batch_size: int, after_id: int) -> list:
+    """Archives up to `batch_size` closed moves with id > after_id; returns their ids."""
+    moves = StockMove.__table__
+    rows = db.execute(
+        select(moves.c.id, moves.c.product_id, moves.c.source_location_id,
+               moves.c.destination_location_id, moves.c.quantity, moves.c.status)
+        # Keyset on id: the rows deleted by earlier batches are dead index entries until VACUUM
+        .where(moves.c.id > after_id, moves.c.status.in_(CLOSED_STATUSES), moves.c.created_at < cutoff)
+        .order_by(moves.c.id)
+        .limit(batch_size)
+        .with_for_update()
+    ).all()
+    if not rows:
+        return []
+
+    # 1. Take the archived moves back out of the quants, and sum what they did per location
+    deltas: Deltas = defaultdict(lambda: [0, 0])
+    carried = defaultdict(int)
+    for r in rows:
+        merge_deltas(deltas, move_deltas(r.product_id, r.source_location_id, r.destination_location_id,
+                                         r.quantity, r.status, sign=-1))
+        if r.status == MoveStatus.DONE:
+            carried[(r.product_id, r.destination_location_id)] += r.quantity
+            carried[(r.product_id, r.source_location_id)] -= r.quantity
+
+    # 2. ...and put the same totals back in as opening rows (the Opening Balance location itself gets none)
+    carried = {key: quantity for key, quantity in carried.items() if quantity and key[1] != opening_id}
+    locations = {row.id: row for row in db.execute(
+        select(Location.id, Location.type, Location.warehouse_id)
+        .where(Location.id.in_({location_id for _, location_id in carried}))
+    )}
+    opening_rows = []
+    for (product_id, location_id), quantity in carried.items():
+        dest = locations[location_id]
+        op_type, warehouse_id = classify_move(LocationType.OPENING, dest.type, None, dest.warehouse_id)
+        opening_rows.append({
+            "product_id": product_id, "quantity": quantity,
+            "source_location_id": opening_id, "destination_location_id": location_id,
+            "status": MoveStatus.DONE, "reference": opening_reference(cutoff, product_id, location_id),
+            "op_type": op_type, "warehouse_id": warehouse_id, "created_at": cutoff,
+        })
+    for row in opening_rows:
+        merge_deltas(deltas, move_deltas(row["product_id"], opening_id, row["destination_location_id"],
+                                         row["quantity"], MoveStatus.DONE))
+
+    # 3. Copy, delete, upsert the opening rows, fix the quants: one transaction per batch
+    ids = [r.id for r in rows]
+    db.execute(insert(StockMoveArchive.__table__).from_select(
+        MOVE_COLUMNS, select(*(moves.c[c] for c in MOVE_COLUMNS)).where(moves.c.id.in_(ids))
+    ))
+    db.execute(moves.delete().where(moves.c.id.in_(ids)))
+    if opening_rows:
+        _upsert_opening_rows(db, cutoff, opening_id, opening_rows)
+    apply_deltas(db.connection(), deltas)
+    return ids
+
+
+def _upsert_opening_rows(db: Session, cutoff: datetime, opening_id: int, opening_rows: list) -> None:
+    """
+    Adds each quantity to the opening row an earlier batch of this close wrote for the same
+    reference, or inserts a new one. The references are the unique key: a new row's reference
+    is registered, so a concurrent close of the same cutoff fails instead of doubling it.
+    """
+    moves = StockMove.__table__
+    existing = dict(db.execute(
+        select(moves.c.reference, moves.c.id)
+        .where(moves.c.source_location_id == opening_id, moves.c.created_at == cutoff,
+               moves.c.reference.in_([row["reference"] for row in opening_rows]))
+        .with_for_update()
+    ).all())
+
+    updates = [{"move_id": existing[row["reference"]], "added": row["quantity"]}
+               for row in opening_rows if row["reference"] in existing]
+    if updates:
+        db.execute(
+            moves.update()
+            .where(moves.c.id == bindparam("move_id"), moves.c.created_at == cutoff)
+            .values(quantity=moves.c.quantity + bindparam("added")),
+            updates,
+        )
+    new_rows = [row for row in opening_rows if row["reference"] not in existing]
+    if new_rows:
+        db.execute(insert(moves).values(new_rows))
+        register_references(db.connection(), (row["reference"] for row in new_rows))
+
+
+def close_period(session_factory, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_ROWS,
+                 on_batch: Optional[Callable[[CloseReport], None]] = None) -> CloseReport:
+    """
+    Archives every closed move created before `cutoff`. Commits after each batch, so it takes
+    a session factory rather than a session.
+    """
+    report = CloseReport(cutoff=period_cutoff(cutoff))
+    with session_factory() as db:
+        opening_id = opening_location(db).id
+        db.commit()
+
+    after_id = 0
+    while True:
+        with session_factory() as db:
+            archived = _archive_batch(db, report.cutoff, opening_id, batch_size, after_id)
+            db.commit()
+        if not archived:
+            break
+        after_id = archived[-1]
+        report.archived += len(archived)
+        report.batches += 1
+        if on_batch:
+            on_batch(report)
+
+    # Locations whose moves cancelled out (quantity 0 moves nothing, so the quants are unaffected)
+    moves = StockMove.__table__
+    is_opening = (moves.c.source_location_id == opening_id) & (moves.c.created_at == report.cutoff)
+    with session_factory() as db:
+        dropped = db.scalars(moves.delete().where(is_opening, moves.c.quantity == 0).returning(moves.c.reference)).all()
+        if dropped:   # never real moves: a later close of the same cutoff may write them again
+            db.execute(MoveReference.__table__.delete().where(MoveReference.reference.in_(dropped)))
+        report.opening_rows = db.scalar(select(func.count()).select_from(moves).where(is_opening))
+        db.commit()
+    return report
+
+
+# ===========================
+#       VERIFICATION
+# ===========================
+
+def _balance_differences(db: Session, live, original) -> list:
+    live, original = live.subquery("live"), original.subquery("original")
+    joined = live.join(
+        original,
+        (live.c.product_id == original.c.product_id) & (live.c.location_id == original.c.location_id),
+        full=True,
+    )
+    live_on_hand, original_on_hand = func.coalesce(live.c.on_hand, 0), func.coalesce(original.c.on_hand, 0)
+    live_reserved, original_reserved = func.coalesce(live.c.reserved, 0), func.coalesce(original.c.reserved, 0)
+    stmt = select(
+        func.coalesce(live.c.product_id, original.c.product_id).label("product_id"),
+        func.coalesce(live.c.location_id, original.c.location_id).label("location_id"),
+        live_on_hand.label("live_on_hand"),
+        original_on_hand.label("original_on_hand"),
+        live_reserved.label("live_reserved"),
+        original_reserved.label("original_reserved"),
+    ).select_from(joined).where((live_on_hand != original_on_hand) | (live_reserved != original_reserved))
+    return db.execute(stmt.order_by("product_id", "location_id")).all()
+
+
+def verify_close(db: Session) -> dict:
+    """
+    Returns {"quants": find_drift rows, "ledger": rows where the compacted live ledger and the
+    original moves disagree}. Both empty means the close changed nothing but the row count.
+    """
+    opening = select(Location.id).where(Location.type == LocationType.OPENING)
+    live = ledger_balances_query().subquery("ledger")
+    live = select(live).where(live.c.location_id.not_in(opening))
+    return {
+        "quants": find_drift(db),
+        "ledger": _balance_differences(db, live, ledger_balances_query(moves_between(None, None))),
+    }
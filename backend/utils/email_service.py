@@ -1,25 +1,239 @@
 # backend/utils/email_service.py
+"""
+Outgoing email goes through an in-process outbox:
+- `queue_otp_email` only enqueues and returns immediately (no HTTP call in the request).
+- A background dispatcher thread sends in batches over ONE reused transport, retrying
+  failures with exponential backoff.
+- The transport is pluggable (EMAIL_TRANSPORT = sendgrid | smtp | console), so it can be
+  pointed at a local SMTP stand-in such as `python -m aiosmtpd -n` or MailHog.
+"""
+import heapq
+import itertools
 import os
+import queue
+import smtplib
+import threading
+import time
+from dataclasses import dataclass
+from email.mime.text import MIMEText
+from typing import List, Optional
+
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def send_otp_email(to_email: str, otp_code: str):
-    """
-    Sends a 6-digit OTP using Twilio SendGrid.
-    """
-    api_key = os.getenv("SENDGRID_API_KEY")
-    sender = os.getenv("SENDER_EMAIL")
+EMAIL_TRANSPORT = os.getenv("EMAIL_TRANSPORT", "sendgrid")
+EMAIL_QUEUE_SIZE = int(os.getenv("EMAIL_QUEUE_SIZE", "1000"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "2"))
+
+
+@dataclass
+class EmailMessage:
+    to_email: str
+    subject: str
+    html_content: str
+    attempts: int = 0
+
+
+# ===========================
+#        TRANSPORTS
+# ===========================
+
+class SendGridTransport:
+    """Twilio SendGrid. The API client is built once and reused for every message."""
+
+    def __init__(self, api_key: Optional[str] = None, sender: Optional[str] = None):
+        self.api_key = api_key or os.getenv("SENDGRID_API_KEY")
+        self.sender = sender or os.getenv("SENDER_EMAIL")
+        if not self.api_key or not self.sender:
+            print("❌ Error: Missing SendGrid Credentials in .env")
+        self.client = SendGridAPIClient(self.api_key) if self.api_key else None
+
+    def send_batch(self, messages: List[EmailMessage]) -> List[EmailMessage]:
+        if self.client is None or not self.sender:
+            return list(messages)
+
+        failed = []
+        for msg in messages:
+            try:
+                response = self.client.send(Mail(
+                    from_email=self.sender, to_emails=msg.to_email,
+                    subject=msg.subject, html_content=msg.html_content,
+                ))
+                print(f"✅ Email sent to {msg.to_email} | Status: {response.status_code}")
+            except Exception as e:
+                print(f"❌ Failed to send email to {msg.to_email}: {str(e)}")
+                failed.append(msg)
+        return failed
+
+
+class SMTPTransport:
+    """Plain SMTP; one connection per batch. Handy against a local stand-in server."""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, username: Optional[str] = None,
+                 password: Optional[str] = None, sender: Optional[str] = None, use_tls: Optional[bool] = None):
+        self.host = host or os.getenv("SMTP_HOST", "localhost")
+        self.port = port or int(os.getenv("SMTP_PORT", "1025"))
+        self.username = username or os.getenv("SMTP_USERNAME")
+        self.password = password or os.getenv("SMTP_PASSWORD")
+        self.sender = sender or os.getenv("SENDER_EMAIL", "stockmaster@localhost")
+        self.use_tls = use_tls if use_tls is not None else os.getenv("SMTP_USE_TLS", "false").lower() == "true"
+
+    def send_batch(self, messages: List[EmailMessage]) -> List[EmailMessage]:
+        try:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=10)
+        except OSError as e:
+            print(f"❌ SMTP connection to {self.host}:{self.port} failed: {e}")
+            return list(messages)
+
+        failed = []
+        with smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for msg in messages:
+                mime = MIMEText(msg.html_content, "html")
+                mime["Subject"], mime["From"], mime["To"] = msg.subject, self.sender, msg.to_email
+                try:
+                    smtp.sendmail(self.sender, [msg.to_email], mime.as_string())
+                except smtplib.SMTPException as e:
+                    print(f"❌ Failed to send email to {msg.to_email}: {e}")
+                    failed.append(msg)
+        return failed
+
+
+class ConsoleTransport:
+    """Prints instead of sending (local development)."""
+
+    def send_batch(self, messages: List[EmailMessage]) -> List[EmailMessage]:
+        for msg in messages:
+            print(f"📧 [console] To: {msg.to_email} | Subject: {msg.subject}")
+        return []
+
+
+TRANSPORTS = {"sendgrid": SendGridTransport, "smtp": SMTPTransport, "console": ConsoleTransport}
 
-    if not api_key or not sender:
-        print("❌ Error: Missing SendGrid Credentials in .env")
-        return False
 
-    message = Mail(
-        from_email=sender,
-        to_emails=to_email,
+# ===========================
+#          OUTBOX
+# ===========================
+
+class EmailOutbox:
+    def __init__(self, transport=None, max_size: int = EMAIL_QUEUE_SIZE, batch_size: int = EMAIL_BATCH_SIZE,
+                 max_attempts: int = EMAIL_MAX_ATTEMPTS, retry_base_seconds: float = EMAIL_RETRY_BASE_SECONDS):
+        self._transport = transport
+        self._queue: "queue.Queue[EmailMessage]" = queue.Queue(maxsize=max_size)
+        self._retries: list = []                 # heap of (due_time, seq, message)
+        self._seq = itertools.count()
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.sent = self.retried = self.dropped = 0
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = TRANSPORTS[EMAIL_TRANSPORT]()
+        return self._transport
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        """
+        Flushes what is queued (one attempt each) and stops the dispatcher. Messages still
+        waiting for a retry are given up on: they count as dropped.
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return
+            self._thread = None
+        while self._retries:
+            msg = heapq.heappop(self._retries)[2]
+            self.dropped += 1
+            print(f"❌ Shutting down: giving up on email to {msg.to_email} after {msg.attempts} attempt(s)")
+
+    def enqueue(self, message: EmailMessage) -> bool:
+        """False when the outbox is full (the caller decides how to report it)."""
+        self.start()
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except queue.Full:
+            return False
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "retrying": len(self._retries),
+                "sent": self.sent, "retried": self.retried, "dropped": self.dropped}
+
+    def _next_batch(self) -> List[EmailMessage]:
+        batch = []
+        now = time.monotonic()
+        while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+            batch.append(heapq.heappop(self._retries)[2])
+
+        if not batch:
+            # Wake up in time for the next retry (or poll for stop)
+            wait = min(0.5, self._retries[0][0] - now) if self._retries else 0.5
+            try:
+                batch.append(self._queue.get(timeout=max(wait, 0)))
+            except queue.Empty:
+                return batch
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                failed = self.transport.send_batch(batch)
+            except Exception as e:
+                print(f"❌ Email transport error: {str(e)}")
+                failed = batch
+
+            self.sent += len(batch) - len(failed)
+            for msg in failed:
+                msg.attempts += 1
+                if msg.attempts >= self.max_attempts or self._stopping.is_set():
+                    self.dropped += 1
+                    print(f"❌ Giving up on email to {msg.to_email} after {msg.attempts} attempt(s)")
+                    continue
+                self.retried += 1
+                due = time.monotonic() + self.retry_base_seconds * 2 ** (msg.attempts - 1)
+                heapq.heappush(self._retries, (due, next(self._seq), msg))
+
+
+outbox = EmailOutbox()
+
+
+# ===========================
+#         MESSAGES
+# ===========================
+
+def build_otp_message(to_email: str, otp_code: str) -> EmailMessage:
+    return EmailMessage(
+        to_email=to_email,
         subject='StockMaster: Password Reset OTP',
         html_content=f'''
             <div style="font-family: sans-serif; padding: 20px; border: 1px solid #ddd;">
@@ -30,12 +244,11 @@ def send_otp_email(to_email: str, otp_code: str):
             </div>
         '''
     )
-    
-    try:
-        sg = SendGridAPIClient(api_key)
-        response = sg.send(message)
-        print(f"✅ Email sent to {to_email} | Status: {response.status_code}")
-        return True
-    except Exception as e:
-        print(f"❌ Failed to send email: {str(e)}")
-        return False
\ No newline at end of file
+
+
+def queue_otp_email(to_email: str, otp_code: str) -> bool:
+    """
+    Queues a 6-digit OTP email (delivered in the background).
+    Returns False only when the outbox is full.
+    """
+    return outbox.enqueue(build_otp_message(to_email, otp_code))
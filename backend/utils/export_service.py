@@ -0,0 +1,114 @@
+# backend/utils/export_service.py
+"""
+Streaming CSV / NDJSON exports.
+
+Rows are pulled through a server-side cursor (`AsyncSession.stream` + yield_per), formatted
+one chunk at a time and handed to the client straight away, so memory stays flat whatever
+the size of the ledger and the first bytes leave before the query has finished.
+The export opens its OWN session: the response body is produced after the route returns.
+"""
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from typing import AsyncIterator, Callable, List
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+
+from models.all_models import StockMove, Product, Location
+from utils.stock_service import stock_levels_query
+
+EXPORT_CHUNK_ROWS = 1000
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+# ===========================
+#         QUERIES
+# ===========================
+
+SourceLocation = aliased(Location, name="source")
+DestLocation = aliased(Location, name="dest")
+
+
+def moves_export_query() -> Select:
+    """Flat move rows (product & location names joined in), newest first."""
+    return (
+        select(
+            StockMove.id,
+            StockMove.reference,
+            StockMove.created_at,
+            StockMove.status,
+            StockMove.op_type.label("operation"),
+            Product.sku.label("product_sku"),
+            Product.name.label("product_name"),
+            StockMove.quantity,
+            SourceLocation.name.label("source_location"),
+            DestLocation.name.label("destination_location"),
+        )
+        .join(Product, StockMove.product_id == Product.id)
+        .join(SourceLocation, StockMove.source_location_id == SourceLocation.id)
+        .join(DestLocation, StockMove.destination_location_id == DestLocation.id)
+        .order_by(desc(StockMove.created_at), desc(StockMove.id))
+    )
+
+
+def products_export_query() -> Select:
+    """Products with their on-hand / free-to-use stock (same figures as the product list)."""
+    levels = stock_levels_query().subquery()
+    on_hand = func.coalesce(levels.c.on_hand, 0)
+    return (
+        select(
+            Product.id,
+            Product.sku,
+            Product.name,
+            Product.category,
+            Product.uom,
+            Product.cost,
+            Product.min_reorder_level,
+            on_hand.label("on_hand"),
+            (on_hand - func.coalesce(levels.c.reserved, 0)).label("free_to_use"),
+        )
+        .outerjoin(levels, levels.c.product_id == Product.id)
+        .order_by(Product.id)
+    )
+
+
+# ===========================
+#        FORMATTING
+# ===========================
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunk(rows, header: List[str] = None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_plain(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(columns: List[str], rows) -> str:
+    return "".join(json.dumps(dict(zip(columns, map(_plain, row)))) + "\n" for row in rows)
+
+
+async def stream_export(session_factory: Callable, stmt: Select, fmt: str) -> AsyncIterator[str]:
+    """Yields the export chunk by chunk (CSV starts with a header row)."""
+    async with session_factory() as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        columns = list(result.keys())
+        if fmt == "csv":
+            yield _csv_chunk([], header=columns)
+
+        async for rows in result.partitions():
+            yield _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(columns, rows)
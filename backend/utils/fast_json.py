@@ -0,0 +1,115 @@
+# backend/utils/fast_json.py
+"""
+Fast path for large JSON list responses.
+
+Returning ORM objects through `response_model=List[...]` means a `from_attributes` validation
+of every object, then generic encoding of the validated models. Once the query is fast, that
+is most of the request's CPU. Routes opt in to this path instead:
+
+- select plain columns (no ORM identity map, no lazy-load bookkeeping),
+- build the rows as dicts in the response_model's shape (`product_row`, `move_row`),
+- encode them with orjson and return the bytes (`json_response`).
+
+Nothing is validated on the way out, so only feed it rows read from the database. The route
+keeps its `response_model` for the OpenAPI docs; benchmarks/bench_serialize.py checks that
+both paths produce the same JSON.
+"""
+from typing import Optional
+
+import orjson
+from fastapi import Response
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+
+from models.all_models import Location, Product, StockMove
+
+# Same output as Pydantic: "...T12:00:00Z" for UTC timestamps
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def dumps(payload) -> bytes:
+    return orjson.dumps(payload, option=ORJSON_OPTIONS)
+
+
+def json_response(payload, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    return Response(content=dumps(payload), status_code=status_code, media_type="application/json", headers=headers)
+
+
+# ===========================
+#         PRODUCTS
+# ===========================
+
+# ProductOut, in field order
+PRODUCT_FIELDS = ("name", "sku", "category", "uom", "cost", "min_reorder_level", "id", "created_at")
+
+
+def product_columns(product=Product) -> tuple:
+    return tuple(getattr(product, field) for field in PRODUCT_FIELDS)
+
+
+def product_row(row, level=None) -> dict:
+    """ProductOut from a `product_columns()` tuple and its StockLevel (None = no stock)."""
+    name, sku, category, uom, cost, min_reorder_level, product_id, created_at = row
+    return {
+        "name": name, "sku": sku, "category": category, "uom": uom,
+        "cost": float(cost) if cost is not None else None,   # ProductOut.cost is a float
+        "min_reorder_level": min_reorder_level, "id": product_id, "created_at": created_at,
+        "on_hand": level.on_hand if level else 0,
+        "free_to_use": level.free_to_use if level else 0,
+    }
+
+
+# ===========================
+#           MOVES
+# ===========================
+
+# Aliased, so the id sub-selects of the search filters (FROM products / locations) don't correlate to them
+MoveProduct = aliased(Product, name="move_product")
+SourceLocation = aliased(Location, name="source_location")
+DestLocation = aliased(Location, name="dest_location")
+
+# StockMoveOut, in field order: the move, then its product and both locations (LocationOut)
+MOVE_COLUMNS = (StockMove.product_id, StockMove.quantity, StockMove.source_location_id,
+                StockMove.destination_location_id, StockMove.status, StockMove.id, StockMove.reference,
+                StockMove.created_at, StockMove.op_type, StockMove.warehouse_id)
+LOCATION_FIELDS = ("name", "short_code", "type", "warehouse_id", "id")
+
+
+def _location_columns(location) -> tuple:
+    return tuple(getattr(location, field) for field in LOCATION_FIELDS)
+
+
+def move_rows_query(stmt: Select) -> Select:
+    """
+    The same moves as a `select(StockMove)...` (its WHERE / ORDER BY / LIMIT are kept), as flat
+    column tuples joined to the product and both locations: what `move_row` reads.
+    """
+    return stmt.with_only_columns(
+        *MOVE_COLUMNS, *product_columns(MoveProduct),
+        *_location_columns(SourceLocation), *_location_columns(DestLocation),
+        maintain_column_froms=False,
+    ).select_from(
+        StockMove.__table__
+        .join(MoveProduct, MoveProduct.id == StockMove.product_id)
+        .join(SourceLocation, SourceLocation.id == StockMove.source_location_id)
+        .join(DestLocation, DestLocation.id == StockMove.destination_location_id)
+    )
+
+
+_MOVE_END = len(MOVE_COLUMNS)
+_PRODUCT_END = _MOVE_END + len(PRODUCT_FIELDS)
+_SOURCE_END = _PRODUCT_END + len(LOCATION_FIELDS)
+
+
+def move_row(row) -> dict:
+    """StockMoveOut from a `move_rows_query` row (the nested product carries no stock figures)."""
+    product_id, quantity, source_id, dest_id, status, move_id, reference, created_at, op_type, warehouse_id = row[:_MOVE_END]
+    return {
+        "product_id": product_id, "quantity": quantity,
+        "source_location_id": source_id, "destination_location_id": dest_id,
+        "status": status, "id": move_id, "reference": reference, "created_at": created_at,
+        "op_type": op_type, "warehouse_id": warehouse_id,
+        "product": product_row(row[_MOVE_END:_PRODUCT_END]),
+        "source_location": dict(zip(LOCATION_FIELDS, row[_PRODUCT_END:_SOURCE_END])),
+        "dest_location": dict(zip(LOCATION_FIELDS, row[_SOURCE_END:])),
+    }
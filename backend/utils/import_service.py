@@ -0,0 +1,197 @@
+# backend/utils/import_service.py
+"""
+Bulk product catalogue import (CSV with the ProductCreate columns: name, sku, category, uom,
+cost, min_reorder_level).
+
+The file is read as a stream and validated against `ProductCreate` chunk by chunk. Good rows
+are COPY'd into a temporary staging table and merged into `products` with ONE
+`INSERT ... SELECT ... ON CONFLICT (sku) DO UPDATE`. Bad rows are reported with their line
+number and never touch the database. When the same SKU appears more than once in a file,
+the last line wins.
+
+COPY needs psycopg2. On other drivers (the SQLite benchmark database) the same merge
+runs as chunked multi-row upserts.
+"""
+import csv
+import io
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.upsert import insert_for
+from models.all_models import Product
+from schemas.all_schema import ProductCreate
+
+IMPORT_CHUNK_ROWS = 5000
+IMPORT_COLUMNS = ("name", "sku", "category", "uom", "cost", "min_reorder_level")
+
+
+@dataclass
+class ImportReport:
+    inserted: int = 0
+    updated: int = 0
+    duplicates: int = 0          # earlier lines overridden by a later line with the same SKU
+    errors: List[dict] = field(default_factory=list)  # {"line", "sku", "error"}
+
+    @property
+    def rejected(self) -> int:
+        return len(self.errors)
+
+
+class CsvFormatError(ValueError):
+    """The file itself can't be read (not UTF-8, broken quoting): the whole import is refused."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+def decode_lines(upload: BinaryIO) -> Iterator[str]:
+    """
+    The uploaded bytes as text lines for the csv module. Decoded one line at a time, so a
+    non-UTF-8 byte is reported with its line number (a BOM at the start is dropped).
+    """
+    for number, raw in enumerate(upload, start=1):
+        try:
+            yield raw.decode("utf-8-sig" if number == 1 else "utf-8")
+        except UnicodeDecodeError as e:
+            raise CsvFormatError(number, f"not UTF-8 text (byte {e.start + 1} of the line)") from None
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+def validated_chunks(stream: Iterable[str], report: ImportReport, chunk_size: int = IMPORT_CHUNK_ROWS) -> Iterator[List[Tuple[int, ProductCreate]]]:
+    """Yields lists of (line number, ProductCreate); invalid lines go to `report.errors`."""
+    reader = csv.DictReader(stream, strict=True)   # broken quoting is an error, not a guess
+    # csv.Error is raised before line_num counts the line being read
+    try:
+        fieldnames = reader.fieldnames
+    except csv.Error as e:
+        raise CsvFormatError(reader.line_num + 1, str(e)) from None
+    missing = {"name", "sku"} - set(fieldnames or ())
+    if missing:
+        raise ValueError(f"CSV header is missing required column(s): {', '.join(sorted(missing))}")
+
+    chunk = []
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as e:
+            raise CsvFormatError(reader.line_num + 1, str(e)) from None
+        # Empty cells fall back to the schema defaults (category "General", uom "Units", ...)
+        values = {k: v.strip() for k, v in row.items() if k in IMPORT_COLUMNS and v is not None and v.strip()}
+        try:
+            chunk.append((reader.line_num, ProductCreate(**values)))
+        except ValidationError as e:
+            report.errors.append({"line": reader.line_num, "sku": values.get("sku"), "error": _validation_message(e)})
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ===========================
+#   POSTGRES: COPY + MERGE
+# ===========================
+
+STAGING_DDL = """
+    CREATE TEMP TABLE products_import (
+        line integer NOT NULL,
+        name varchar NOT NULL,
+        sku varchar NOT NULL,
+        category varchar,
+        uom varchar,
+        cost numeric,
+        min_reorder_level integer
+    ) ON COMMIT DROP
+"""
+
+MERGE_SQL = """
+    INSERT INTO products (name, sku, category, uom, cost, min_reorder_level)
+    SELECT DISTINCT ON (sku) name, sku, category, uom, cost, min_reorder_level
+    FROM products_import
+    ORDER BY sku, line DESC
+    ON CONFLICT (sku) DO UPDATE SET
+        name = EXCLUDED.name,
+        category = EXCLUDED.category,
+        uom = EXCLUDED.uom,
+        cost = EXCLUDED.cost,
+        min_reorder_level = EXCLUDED.min_reorder_level
+    RETURNING (xmax = 0) AS inserted
+"""
+
+
+def _copy_import(db: Session, stream: Iterable[str], report: ImportReport, chunk_size: int) -> None:
+    cursor = db.connection().connection.dbapi_connection.cursor()
+    cursor.execute(STAGING_DDL)
+
+    staged = 0
+    for chunk in validated_chunks(stream, report, chunk_size):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(
+            (line, p.name, p.sku, p.category, p.uom, p.cost, p.min_reorder_level) for line, p in chunk
+        )
+        buffer.seek(0)
+        cursor.copy_expert(
+            "COPY products_import (line, name, sku, category, uom, cost, min_reorder_level) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        staged += len(chunk)
+
+    if staged:
+        cursor.execute(MERGE_SQL)
+        inserted = sum(1 for (is_new,) in cursor.fetchall() if is_new)
+        report.inserted += inserted
+        report.updated += cursor.rowcount - inserted
+        report.duplicates += staged - cursor.rowcount
+    cursor.close()
+
+
+# ===========================
+#    OTHER DRIVERS: UPSERT
+# ===========================
+
+def _upsert_import(db: Session, stream: Iterable[str], report: ImportReport, chunk_size: int) -> None:
+    latest = {}
+    for chunk in validated_chunks(stream, report, chunk_size):
+        for _, product in chunk:
+            if product.sku in latest:
+                report.duplicates += 1
+            latest[product.sku] = product
+
+    existing = set()
+    table = Product.__table__
+    rows = [p.model_dump(include=set(IMPORT_COLUMNS)) for p in latest.values()]
+    for start in range(0, len(rows), chunk_size):
+        batch = rows[start:start + chunk_size]
+        existing |= set(db.scalars(select(table.c.sku).where(table.c.sku.in_([r["sku"] for r in batch]))))
+        stmt = insert_for(db.get_bind())(table).values(batch)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["sku"],
+            set_={c: stmt.excluded[c] for c in IMPORT_COLUMNS if c != "sku"},
+        ))
+    report.updated += len(existing)
+    report.inserted += len(rows) - len(existing)
+
+
+def import_products(db: Session, stream: Iterable[str], chunk_size: int = IMPORT_CHUNK_ROWS) -> ImportReport:
+    """
+    Imports a product CSV in the caller's transaction (the caller commits). `stream` yields
+    text lines (`decode_lines(upload)` for raw bytes). Raises CsvFormatError on an unreadable
+    file, ValueError on a missing header column.
+    """
+    report = ImportReport()
+    if db.get_bind().dialect.driver == "psycopg2":
+        _copy_import(db, stream, report, chunk_size)
+    else:
+        _upsert_import(db, stream, report, chunk_size)
+    return report
@@ -0,0 +1,185 @@
+# backend/utils/metrics.py
+"""
+Per-route request metrics: latency, SQL statements, database time and rows.
+
+`RequestMetricsMiddleware` (plain ASGI, installed in main.py) times every HTTP request and
+opens a `track_queries()` block around it (database/query_stats.py), then:
+
+- adds the figures to in-process aggregates, keyed by the route TEMPLATE
+  (/api/products/{id}, not /api/products/42), exposed at GET /metrics in the Prometheus
+  text format:
+      http_request_duration_seconds     histogram  method, route, status
+      http_request_db_statements        histogram  method, route, status
+      http_request_db_seconds_total     counter    method, route, status
+      http_request_db_rows_total        counter    method, route, status
+- writes one JSON line per request to the "stockmaster.requests" logger (REQUEST_LOG=0 to
+  turn it off).
+
+A route whose statement histogram grows with the page size has an N+1. The cost per
+request is a couple of perf_counter calls, a lock and a dict lookup: cheap enough to stay on.
+Every worker process keeps its own aggregates (scrape each worker, or sum across them).
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Optional
+
+from database.query_stats import QueryStats, track_queries
+from utils.fast_json import dumps
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+REQUEST_LOG = os.getenv("REQUEST_LOG", "1").strip().lower() not in ("0", "false", "no", "off")
+
+request_log = logging.getLogger("stockmaster.requests")
+if REQUEST_LOG and not request_log.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))   # the message already is the JSON line
+    request_log.addHandler(_handler)
+    request_log.setLevel(logging.INFO)
+    request_log.propagate = False
+
+
+class Histogram:
+    """Prometheus-style histogram (counts per bucket, cumulated when rendered)."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._routes: dict = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: QueryStats) -> None:
+        key = (method, route, str(status))
+        with self._lock:
+            metrics = self._routes.get(key)
+            if metrics is None:
+                metrics = self._routes[key] = RouteMetrics()
+            metrics.latency.observe(seconds)
+            metrics.statements.observe(stats.statements)
+            metrics.db_seconds += stats.db_seconds
+            metrics.rows += stats.rows
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> str:
+        """The Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            routes = [(_labels(key), metrics) for key, metrics in sorted(self._routes.items())]
+            lines = _header("http_request_duration_seconds", "histogram", "Request latency, until the last body byte")
+            for labels, metrics in routes:
+                lines += _histogram_lines("http_request_duration_seconds", labels, metrics.latency)
+            lines += _header("http_request_db_statements", "histogram", "SQL statements sent per request")
+            for labels, metrics in routes:
+                lines += _histogram_lines("http_request_db_statements", labels, metrics.statements)
+            lines += _header("http_request_db_seconds_total", "counter", "Time spent executing SQL")
+            lines += [f"http_request_db_seconds_total{{{labels}}} {metrics.db_seconds:.6f}" for labels, metrics in routes]
+            lines += _header("http_request_db_rows_total", "counter", "Rows returned (or written) by SQL statements")
+            lines += [f"http_request_db_rows_total{{{labels}}} {metrics.rows}" for labels, metrics in routes]
+        return "\n".join(lines) + "\n"
+
+
+def _header(name: str, kind: str, help_text: str) -> list:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: tuple) -> str:
+    method, route, status = key
+    return f'method="{_escape(method)}",route="{_escape(route)}",status="{status}"'
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> list:
+    lines, cumulated = [], 0
+    for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+        cumulated += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulated}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+request_metrics = RequestMetrics()
+
+
+# ===========================
+#        MIDDLEWARE
+# ===========================
+
+def route_template(scope: dict) -> str:
+    # Set by the router once it matched; unmatched paths share one label (no cardinality blow-up)
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def log_request(scope: dict, route: str, status: int, seconds: float, stats: QueryStats) -> None:
+    request_log.info(dumps({
+        "ts": datetime.now(timezone.utc),
+        "method": scope["method"],
+        "route": route,
+        "path": scope["path"],
+        "status": status,
+        "duration_ms": round(seconds * 1000, 2),
+        "db_statements": stats.statements,
+        "db_ms": round(stats.db_seconds * 1000, 2),
+        "db_rows": stats.rows,
+    }).decode())
+
+
+class RequestMetricsMiddleware:
+    """Plain ASGI (no BaseHTTPMiddleware task per request); times streamed bodies to the end."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status: Optional[int] = None
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - started
+                route = route_template(scope)
+                request_metrics.record(scope["method"], route, status or 500, elapsed, stats)
+                if REQUEST_LOG:
+                    log_request(scope, route, status or 500, elapsed, stats)
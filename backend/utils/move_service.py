@@ -0,0 +1,118 @@
+# backend/utils/move_service.py
+"""
+Bulk creation of stock moves (e.g. a 500-line vendor receipt in one request).
+
+Instead of one INSERT + reference lookup + refresh per line, a batch costs a fixed
+handful of statements, whatever its size:
+  1 product lookup, 1 location lookup, 1 counter upsert per (warehouse, operation),
+  1 multi-row INSERT ... RETURNING, 1 reference registration and 1 quant upsert.
+Runs on a sync Session (call it through `AsyncSession.run_sync`); the caller commits.
+"""
+from collections import Counter, defaultdict
+from typing import List
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from models.all_models import StockMove, Product, Location, Warehouse, MoveStatus
+from schemas.all_schema import StockMoveBase
+from utils.quant_service import Deltas, apply_deltas, merge_deltas, move_deltas
+from utils.reference_service import (
+    classify_move, format_reference, reference_prefix, register_references, reserve_numbers,
+)
+
+
+def _line_error(move: StockMoveBase, product_ids: set, locations: dict):
+    if move.product_id not in product_ids:
+        return f"Product with ID {move.product_id} not found"
+    if move.source_location_id not in locations:
+        return f"Source Location with ID {move.source_location_id} not found"
+    if move.destination_location_id not in locations:
+        return f"Destination Location with ID {move.destination_location_id} not found"
+    if move.quantity <= 0:
+        return "Quantity must be positive"
+    try:
+        MoveStatus(move.status)
+    except ValueError:
+        return f"Unknown status '{move.status}'"
+    return None
+
+
+def bulk_create_moves(db: Session, moves: List[StockMoveBase], atomic: bool = False) -> dict:
+    """
+    Validates every line (the rules of a single create, reported per line), then inserts
+    the valid ones in ONE statement.
+    With `atomic=True` nothing is written if any line is invalid.
+    Returns {"created": n, "failed": n, "lines": [{"index", "id", "reference", "error"}, ...]}.
+    """
+    # 1. Resolve every referenced product / location in one query each
+    product_ids = set(db.scalars(
+        select(Product.id).where(Product.id.in_({m.product_id for m in moves}))
+    ))
+    location_ids = {m.source_location_id for m in moves} | {m.destination_location_id for m in moves}
+    locations = {
+        row.id: row for row in db.execute(
+            select(Location.id, Location.type, Location.warehouse_id, Warehouse.short_code)
+            .outerjoin(Warehouse, Location.warehouse_id == Warehouse.id)
+            .where(Location.id.in_(location_ids))
+        )
+    }
+
+    lines = [{"index": i, "id": None, "reference": None, "error": _line_error(m, product_ids, locations)}
+             for i, m in enumerate(moves)]
+    valid = [i for i, line in enumerate(lines) if line["error"] is None]
+    failed = len(moves) - len(valid)
+    if atomic and failed:
+        for i in valid:
+            lines[i]["error"] = "Not created: other lines in this batch are invalid"
+        valid, failed = [], len(moves)
+    if not valid:
+        return {"created": 0, "failed": failed, "lines": lines}
+
+    # 2. One counter upsert per (warehouse, operation): reserve the whole block at once
+    prefixes, operations = {}, {}
+    for i in valid:
+        source, dest = locations[moves[i].source_location_id], locations[moves[i].destination_location_id]
+        prefixes[i] = reference_prefix(source.type, dest.type, source.short_code, dest.short_code)
+        operations[i] = classify_move(source.type, dest.type, source.warehouse_id, dest.warehouse_id)
+
+    # Sorted: concurrent batches lock the sequence rows in the same order (no deadlock)
+    next_number = {
+        prefix: reserve_numbers(db, prefix[0], prefix[1], count)
+        for prefix, count in sorted(Counter(prefixes.values()).items())
+    }
+
+    rows = []
+    deltas: Deltas = defaultdict(lambda: [0, 0])
+    for i in valid:
+        move, prefix = moves[i], prefixes[i]
+        reference = format_reference(prefix[0], prefix[1], next_number[prefix])
+        next_number[prefix] += 1
+        status = MoveStatus(move.status)
+        op_type, warehouse_id = operations[i]
+        rows.append({
+            "product_id": move.product_id,
+            "quantity": move.quantity,
+            "source_location_id": move.source_location_id,
+            "destination_location_id": move.destination_location_id,
+            "status": status,
+            "reference": reference,
+            "op_type": op_type,
+            "warehouse_id": warehouse_id,
+        })
+        merge_deltas(deltas, move_deltas(move.product_id, move.source_location_id,
+                                         move.destination_location_id, move.quantity, status))
+
+    # 3. One multi-row INSERT; Core skips the ORM flush hooks, so the references and the
+    #    quants are updated here
+    inserted = db.execute(
+        insert(StockMove.__table__).values(rows).returning(StockMove.id, StockMove.reference)
+    ).all()
+    register_references(db.connection(), (row["reference"] for row in rows))
+    apply_deltas(db.connection(), deltas)
+
+    ids = {reference: move_id for move_id, reference in inserted}
+    for i, row in zip(valid, rows):
+        lines[i]["id"], lines[i]["reference"] = ids[row["reference"]], row["reference"]
+
+    return {"created": len(valid), "failed": failed, "lines": lines}
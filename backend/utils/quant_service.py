@@ -0,0 +1,197 @@
+# backend/utils/quant_service.py
+"""
+Keeps `stock_quants` (Product x Location balances) in sync with the `stock_moves` ledger.
+
+- Every ORM insert / update / delete of a StockMove is turned into quant deltas inside
+  the same flush (and therefore the same transaction).
+- Code that writes moves with Core statements (bulk inserts, archival) must call
+  `apply_deltas` itself.
+- `rebuild_quants` / `find_drift` replay the whole ledger for repairs and audits.
+"""
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, event, func, insert, literal, select, text, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy import inspect as sa_inspect
+
+from database.upsert import insert_for
+from models.all_models import StockMove, StockQuant, MoveStatus
+
+# (product_id, location_id) -> [on_hand delta, reserved delta]
+Deltas = Dict[Tuple[int, int], List[int]]
+
+TRACKED_FIELDS = ("product_id", "quantity", "source_location_id", "destination_location_id", "status")
+
+
+def move_deltas(product_id, source_id, dest_id, quantity, status, sign: int = 1) -> Deltas:
+    """What a single move contributes to the quants (use sign=-1 to take it back out)."""
+    deltas: Deltas = defaultdict(lambda: [0, 0])
+    if status == MoveStatus.DONE:
+        deltas[(product_id, source_id)][0] -= sign * quantity
+        deltas[(product_id, dest_id)][0] += sign * quantity
+    elif status == MoveStatus.WAITING:
+        deltas[(product_id, source_id)][1] += sign * quantity
+    return deltas
+
+
+def merge_deltas(target: Deltas, other: Deltas) -> Deltas:
+    for key, (on_hand, reserved) in other.items():
+        target[key][0] += on_hand
+        target[key][1] += reserved
+    return target
+
+
+def apply_deltas(conn, deltas: Deltas) -> None:
+    """
+    Upserts the deltas into stock_quants with one multi-row statement.
+    Rows are locked in (product_id, location_id) order, whatever the order of the deltas:
+    concurrent A -> B and B -> A moves would otherwise deadlock on the same two quants.
+    """
+    rows = [
+        {"product_id": product_id, "location_id": location_id, "on_hand": on_hand, "reserved": reserved}
+        for (product_id, location_id), (on_hand, reserved) in sorted(deltas.items())
+        if on_hand or reserved
+    ]
+    if not rows:
+        return
+
+    stmt = insert_for(conn)(StockQuant.__table__).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["product_id", "location_id"],
+        set_={
+            "on_hand": StockQuant.__table__.c.on_hand + stmt.excluded.on_hand,
+            "reserved": StockQuant.__table__.c.reserved + stmt.excluded.reserved,
+        },
+    )
+    conn.execute(stmt)
+
+
+# ===========================
+#     ORM FLUSH HOOKS
+# ===========================
+
+def _old_value(move: StockMove, field: str):
+    history = sa_inspect(move).attrs[field].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(move, field)
+
+
+def _contribution(move: StockMove, sign: int, old: bool = False) -> Deltas:
+    value = (lambda f: _old_value(move, f)) if old else (lambda f: getattr(move, f))
+    return move_deltas(
+        value("product_id"), value("source_location_id"), value("destination_location_id"),
+        value("quantity"), value("status"), sign=sign,
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_quants(session: Session, flush_context) -> None:
+    deltas: Deltas = defaultdict(lambda: [0, 0])
+
+    for obj in session.new:
+        if isinstance(obj, StockMove):
+            merge_deltas(deltas, _contribution(obj, +1))
+
+    for obj in session.dirty:
+        if isinstance(obj, StockMove) and session.is_modified(obj, include_collections=False):
+            merge_deltas(deltas, _contribution(obj, -1, old=True))
+            merge_deltas(deltas, _contribution(obj, +1))
+
+    for obj in session.deleted:
+        if isinstance(obj, StockMove):
+            merge_deltas(deltas, _contribution(obj, -1, old=True))
+
+    apply_deltas(session.connection(), deltas)
+
+
+def _track_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+# active_history=True makes SQLAlchemy load the previous value before it is overwritten,
+# otherwise an expired move (e.g. after a commit) would not know its old status.
+for _field in TRACKED_FIELDS:
+    event.listen(getattr(StockMove, _field), "set", _track_old_value, active_history=True)
+
+
+# ===========================
+#     LEDGER REPLAY
+# ===========================
+
+def ledger_balances_query(moves=None):
+    """
+    (product_id, location_id, on_hand, reserved) computed from the raw ledger.
+    `moves` defaults to the stock_moves table; any selectable with the same columns works.
+    """
+    moves = moves if moves is not None else StockMove.__table__
+    c = moves.c
+
+    done_in = select(c.product_id, c.destination_location_id.label("location_id"),
+                     c.quantity.label("on_hand"), literal(0).label("reserved"))\
+        .where(c.status == MoveStatus.DONE)
+    done_out = select(c.product_id, c.source_location_id.label("location_id"),
+                      (-c.quantity).label("on_hand"), literal(0).label("reserved"))\
+        .where(c.status == MoveStatus.DONE)
+    waiting = select(c.product_id, c.source_location_id.label("location_id"),
+                     literal(0).label("on_hand"), c.quantity.label("reserved"))\
+        .where(c.status == MoveStatus.WAITING)
+
+    legs = union_all(done_in, done_out, waiting).subquery("legs")
+    return select(
+        legs.c.product_id,
+        legs.c.location_id,
+        func.sum(legs.c.on_hand).label("on_hand"),
+        func.sum(legs.c.reserved).label("reserved"),
+    ).group_by(legs.c.product_id, legs.c.location_id)
+
+
+def rebuild_quants(db: Session) -> int:
+    """
+    Throws away every quant and recomputes them from the ledger. Returns the row count.
+    Blocks quant writers until the caller commits: a move flushed meanwhile would otherwise
+    be counted twice (in the ledger and by its own delta) or not at all.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE stock_quants IN SHARE ROW EXCLUSIVE MODE"))
+    db.execute(delete(StockQuant))
+    ledger = ledger_balances_query().subquery("ledger")
+    result = db.execute(
+        insert(StockQuant).from_select(
+            ["product_id", "location_id", "on_hand", "reserved"],
+            select(ledger.c.product_id, ledger.c.location_id, ledger.c.on_hand, ledger.c.reserved)
+            .where((ledger.c.on_hand != 0) | (ledger.c.reserved != 0)),
+        )
+    )
+    return result.rowcount
+
+
+def find_drift(db: Session) -> list:
+    """
+    Replays the ledger and returns every (product, location) where the stored quant disagrees:
+    rows of (product_id, location_id, quant_on_hand, ledger_on_hand, quant_reserved, ledger_reserved).
+    """
+    ledger = ledger_balances_query().subquery("ledger")
+    quants = StockQuant.__table__
+
+    joined = quants.join(
+        ledger,
+        (quants.c.product_id == ledger.c.product_id) & (quants.c.location_id == ledger.c.location_id),
+        full=True,
+    )
+    quant_on_hand = func.coalesce(quants.c.on_hand, 0)
+    ledger_on_hand = func.coalesce(ledger.c.on_hand, 0)
+    quant_reserved = func.coalesce(quants.c.reserved, 0)
+    ledger_reserved = func.coalesce(ledger.c.reserved, 0)
+
+    stmt = select(
+        func.coalesce(quants.c.product_id, ledger.c.product_id).label("product_id"),
+        func.coalesce(quants.c.location_id, ledger.c.location_id).label("location_id"),
+        quant_on_hand.label("quant_on_hand"),
+        ledger_on_hand.label("ledger_on_hand"),
+        quant_reserved.label("quant_reserved"),
+        ledger_reserved.label("ledger_reserved"),
+    ).select_from(joined).where((quant_on_hand != ledger_on_hand) | (quant_reserved != ledger_reserved))
+
+    return db.execute(stmt.order_by("product_id", "location_id")).all()
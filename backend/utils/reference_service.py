@@ -0,0 +1,95 @@
+# backend/utils/reference_service.py
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from sqlalchemy import inspect as sa_inspect
+
+from typing import Any, Iterable, Optional, Tuple
+
+from database.upsert import insert_for
+from models.all_models import MoveReference, ReferenceSequence, StockMove, LocationType, OperationType
+
+
+def reserve_numbers(db: Session, warehouse_code: str, op_code: str, count: int = 1) -> int:
+    """
+    Atomically takes `count` numbers from the (warehouse_code, op_code) sequence and
+    returns the FIRST one. One upsert, no ledger scan; the row lock is held until the
+    caller's transaction ends, so two requests can never get the same number.
+    """
+    table = ReferenceSequence.__table__
+    stmt = insert_for(db.get_bind())(table).values(
+        warehouse_code=warehouse_code, op_code=op_code, last_value=count
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["warehouse_code", "op_code"],
+        set_={"last_value": table.c.last_value + stmt.excluded.last_value},
+    ).returning(table.c.last_value)
+
+    last_value = db.execute(stmt).scalar_one()
+    return last_value - count + 1
+
+
+def format_reference(warehouse_code: str, op_code: str, number: int) -> str:
+    return f"{warehouse_code}/{op_code}/{number:04d}"
+
+
+def next_reference(db: Session, warehouse_code: str, op_code: str) -> str:
+    return format_reference(warehouse_code, op_code, reserve_numbers(db, warehouse_code, op_code))
+
+
+def classify_move(source_type, dest_type, source_warehouse: Any = None, dest_warehouse: Any = None) -> Tuple[OperationType, Any]:
+    """
+    (operation type, owning warehouse) of a move; the warehouses can be ids or short codes.
+    - opening balances (utils/archive_service.py) and moves to / from Inventory Loss: an ADJUSTMENT
+    - Vendor -> anything: a RECEIPT of the destination warehouse
+    - anything -> Customer: a DELIVERY of the source warehouse
+    - everything else: INTERNAL.
+    Adjustments and internal moves belong to the source warehouse when stock leaves an
+    internal location, else to the destination's.
+    """
+    owner = source_warehouse if source_type == LocationType.INTERNAL else dest_warehouse
+    if source_type == LocationType.OPENING:
+        return OperationType.ADJUSTMENT, owner
+    if source_type == LocationType.VENDOR:
+        return OperationType.RECEIPT, dest_warehouse
+    if dest_type == LocationType.CUSTOMER:
+        return OperationType.DELIVERY, source_warehouse
+    if LocationType.INVENTORY_LOSS in (source_type, dest_type):
+        return OperationType.ADJUSTMENT, owner
+    return OperationType.INTERNAL, owner
+
+
+def reference_prefix(source_type, dest_type, source_warehouse: Optional[str], dest_warehouse: Optional[str]) -> Tuple[str, str]:
+    """
+    (warehouse_code, op_code) for a move, e.g. ("WH1", "IN").
+    Receipts are numbered under their warehouse's IN sequence, deliveries under OUT;
+    internal moves and adjustments share "GEN/INT".
+    """
+    op_type, warehouse = classify_move(source_type, dest_type, source_warehouse, dest_warehouse)
+    if op_type == OperationType.RECEIPT:
+        return warehouse or "GEN", "IN"
+    if op_type == OperationType.DELIVERY:
+        return warehouse or "GEN", "OUT"
+    return "GEN", "INT"
+
+
+# ===========================
+#     REFERENCE REGISTRY
+# ===========================
+# stock_moves is partitioned, so it cannot carry UNIQUE(reference) itself: every reference
+# also goes into move_references, in the same transaction. A duplicate raises IntegrityError
+# and rolls the move back with it.
+
+def register_references(conn, references: Iterable[Optional[str]]) -> None:
+    """Claims the references (None skipped) with one multi-row INSERT. Core writers call it themselves."""
+    rows = [{"reference": reference} for reference in references if reference is not None]
+    if rows:
+        conn.execute(insert(MoveReference.__table__).values(rows))
+
+
+@event.listens_for(Session, "after_flush")
+def _register_new_references(session: Session, flush_context) -> None:
+    references = [obj.reference for obj in session.new if isinstance(obj, StockMove)]
+    for obj in session.dirty:
+        if isinstance(obj, StockMove) and sa_inspect(obj).attrs.reference.history.added:
+            references.append(obj.reference)
+    register_references(session.connection(), references)
@@ -0,0 +1,204 @@
+# backend/utils/response_cache.py
+"""
+Conditional GET + in-process TTL cache of JSON list responses (warehouses, locations), and
+conditional GET alone for the product routes.
+
+- Every collection has a version number. A commit that writes one of its rows bumps it, which
+  orphans every cached body of that collection.
+- Bodies are cached per (collection, version, path + query string) for RESPONSE_CACHE_TTL_SECONDS.
+  The ETag is a hash of the body, so it is the same in every worker process.
+- A client whose If-None-Match matches the cached entry gets a 304 without any query
+  (sessions only connect on their first statement).
+
+Versions are per process: with several workers (uvicorn --workers N), a write handled by
+another worker (or manual SQL) is only seen here once the TTL expires. Hence the short
+default: 5 s still absorbs the bursts of screen-load polling, and a longer TTL is only safe
+with a single worker. That is fine for master data, not for products: their on_hand / free_to_use change with every stock move, in any
+worker. `etag_json` renders them on every request instead; the ETag still turns an
+unchanged body into a 304 (the transfer is saved, the queries are not).
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database.postgresConn import DATABASE_READ_URL, READ_PIN_SECONDS
+from models.all_models import Location, Warehouse
+from utils.fast_json import dumps
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "5"))
+# A replica may still return the old rows right after a write: don't cache them under the new version
+SETTLE_SECONDS = READ_PIN_SECONDS if DATABASE_READ_URL else 0
+
+# Rows of these models belong to these collections
+COLLECTIONS = {
+    Warehouse: ("warehouses",),
+    Location: ("locations",),
+}
+
+
+class ResponseCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._versions: dict = {}
+        self._bumped_at: dict = {}
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.not_modified = self.evictions = 0
+
+    def version(self, collection: str) -> int:
+        return self._versions.get(collection, 0)
+
+    def bump(self, *collections: str) -> None:
+        with self._lock:
+            for collection in collections:
+                self._versions[collection] = self._versions.get(collection, 0) + 1
+                self._bumped_at[collection] = time.monotonic()
+            # Drop the orphaned entries now rather than waiting for the LRU
+            for key in [k for k in self._entries if k[0] in collections]:
+                del self._entries[key]
+
+    def get(self, key: tuple) -> Optional[tuple]:
+        """Returns (etag, body) for a (collection, version, url) key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: tuple, etag: str, body: bytes) -> None:
+        collection, version = key[0], key[1]
+        with self._lock:
+            # Rendered from a version that has been bumped since (or a replica that may lag): not cached
+            if version != self._versions.get(collection, 0) or self.maxsize <= 0:
+                return
+            if time.monotonic() - self._bumped_at.get(collection, float("-inf")) < SETTLE_SECONDS:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def count_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "versions": dict(self._versions),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+            }
+
+
+response_cache = ResponseCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL_SECONDS)
+
+
+# ===========================
+#        RESPONSES
+# ===========================
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def _conditional_response(request: Request, etag: str, body: bytes) -> Response:
+    # no-cache: browsers may keep the body but must revalidate it (cheap, thanks to the ETag)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        response_cache.count_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _render(payload, adapter: Optional[TypeAdapter]) -> bytes:
+    # With an adapter: validated and serialized like a `response_model`; else plain rows (utils/fast_json.py)
+    return adapter.dump_json(adapter.validate_python(payload, from_attributes=True)) if adapter else dumps(payload)
+
+
+async def cached_json(request: Request, collection: str, load: Callable[[], Awaitable[object]],
+                      adapter: Optional[TypeAdapter] = None) -> Response:
+    """
+    Serves `await load()` through the cache: 304 when the client already has it, the cached
+    body otherwise, and `load()` (the database) only on a miss. `collection` must be one
+    of COLLECTIONS, so that writes invalidate it.
+    """
+    # The version is read BEFORE loading: a write committed meanwhile orphans what we render
+    key = (collection, response_cache.version(collection), request.url.path, request.url.query)
+    cached = response_cache.get(key)
+    if cached is None:
+        body = _render(await load(), adapter)
+        cached = (etag_for(body), body)
+        response_cache.put(key, *cached)
+    return _conditional_response(request, *cached)
+
+
+async def etag_json(request: Request, load: Callable[[], Awaitable[object]],
+                    adapter: Optional[TypeAdapter] = None) -> Response:
+    """`cached_json` without the body cache: always loads, 304 when the body did not change."""
+    body = _render(await load(), adapter)
+    return _conditional_response(request, etag_for(body), body)
+
+
+# ===========================
+#       INVALIDATION
+# ===========================
+
+def mark_stale(db, *collections: str) -> None:
+    """For writes the ORM does not see (Core INSERT/UPDATE, COPY): bump these collections on commit."""
+    db.info.setdefault("stale_collections", set()).update(collections)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_collections(session: Session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        collections = COLLECTIONS.get(type(obj))
+        if collections and (obj not in session.dirty or session.is_modified(obj, include_collections=False)):
+            mark_stale(session, *collections)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_stale_collections(session: Session) -> None:
+    # Only after COMMIT, so a concurrent request can't cache the old rows under the new version
+    stale = session.info.pop("stale_collections", None)
+    if stale:
+        response_cache.bump(*stale)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_collections(session: Session) -> None:
+    session.info.pop("stale_collections", None)
@@ -0,0 +1,112 @@
+# backend/utils/search_service.py
+"""
+Substring search for products, locations and moves.
+
+All filters are `ILIKE '%term%'` on columns that carry a pg_trgm GIN index
+(see migration 8f1d3c5a2e94), so Postgres answers them from the index instead of
+scanning the table. Cross-table conditions are resolved to id lists first, so the
+ledger is only ever filtered on its own columns.
+
+A trigram index can only be used for terms of at least 3 characters; shorter ones
+would scan the tables, so the typeahead refuses them (TYPEAHEAD_MIN_LENGTH).
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, select, desc
+
+from models.all_models import Product, Location, StockMove
+from utils.pagination import MOVE_LOAD_OPTIONS
+from utils.stock_service import attach_stock
+
+TYPEAHEAD_MIN_LENGTH = 3
+# The move branch only looks at recent moves (the monthly partitions outside are pruned)
+TYPEAHEAD_MOVE_DAYS = int(os.getenv("TYPEAHEAD_MOVE_DAYS", "90"))
+
+
+def like_pattern(term: str) -> str:
+    """'%term%' with LIKE wildcards in the user's input escaped."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _ilike(column, term: str):
+    return column.ilike(like_pattern(term), escape="\\")
+
+
+# ===========================
+#        PRODUCTS
+# ===========================
+
+def product_filter(term: str):
+    return or_(_ilike(Product.name, term), _ilike(Product.sku, term), _ilike(Product.category, term))
+
+
+def product_rank(term: str):
+    """Best trigram similarity over name / SKU / category (1.0 = exact)."""
+    return func.greatest(
+        func.similarity(Product.name, term),
+        func.similarity(Product.sku, term),
+        func.coalesce(func.similarity(Product.category, term), 0),
+    )
+
+
+# ===========================
+#        LOCATIONS
+# ===========================
+
+def location_filter(term: str):
+    return _ilike(Location.name, term)
+
+
+def location_rank(term: str):
+    return func.similarity(Location.name, term)
+
+
+def matching_location_ids(term: str):
+    return select(Location.id).where(location_filter(term))
+
+
+# ===========================
+#          MOVES
+# ===========================
+
+def move_filter(term: str, source: bool = True, dest: bool = True, product: bool = True):
+    """
+    Reference OR product name/SKU OR location name.
+    Names are looked up in their own (small, indexed) tables and turned into id sub-selects.
+    """
+    conditions = [_ilike(StockMove.reference, term)]
+    if product:
+        conditions.append(StockMove.product_id.in_(select(Product.id).where(product_filter(term))))
+    if source:
+        conditions.append(StockMove.source_location_id.in_(matching_location_ids(term)))
+    if dest:
+        conditions.append(StockMove.destination_location_id.in_(matching_location_ids(term)))
+    return or_(*conditions)
+
+
+# ===========================
+#        TYPEAHEAD
+# ===========================
+
+def typeahead(db, term: str, limit: int = 10) -> dict:
+    """
+    Top matches per kind. Products and locations are ranked by similarity;
+    moves (millions of rows) by recency, which is what people look for in a ledger,
+    within the last TYPEAHEAD_MOVE_DAYS days: a common term ("WH1/OUT") matches a good
+    part of the ledger, and every match would be fetched before the sort. Older moves
+    are found through the move list's search.
+    """
+    products = db.query(Product).filter(product_filter(term))\
+        .order_by(desc(product_rank(term)), Product.name).limit(limit).all()
+
+    locations = db.query(Location).filter(location_filter(term))\
+        .order_by(desc(location_rank(term)), Location.name).limit(limit).all()
+
+    since = datetime.now(timezone.utc) - timedelta(days=TYPEAHEAD_MOVE_DAYS)
+    moves = db.query(StockMove).options(*MOVE_LOAD_OPTIONS)\
+        .filter(_ilike(StockMove.reference, term), StockMove.created_at >= since)\
+        .order_by(desc(StockMove.created_at), desc(StockMove.id)).limit(limit).all()
+
+    return {"products": attach_stock(db, products), "locations": locations, "moves": moves}
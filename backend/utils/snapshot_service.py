@@ -0,0 +1,147 @@
+# backend/utils/snapshot_service.py
+"""
+Point-in-time stock ("on hand as of the end of last month").
+
+`stock_snapshots` freezes the Product x Location balances at chosen instants. A question
+for any `as_of` is answered from the nearest snapshot at or before it, plus a replay of
+only the moves created between that snapshot and `as_of` (ix_stock_moves_created_at_id
+finds them). Without any snapshot it falls back to replaying the ledger up to `as_of`.
+
+Conventions:
+- `as_of` is exclusive: balances include moves created strictly before it, so the
+  September month-end is `as_of=2026-10-01T00:00:00Z`. Naive datetimes are read as UTC.
+- A move counts at its created_at with its CURRENT status. A snapshot keeps the statuses
+  it saw when it was built (what the books said at close). Rebuild it with `--replace`
+  to pick up later corrections.
+- Replays read the original moves: live ones plus those archived by a period close, never
+  the opening-balance rows that replaced them (see utils/archive_service.py).
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from models.all_models import StockMove, StockMoveArchive, StockSnapshot, StockSnapshotLine, Location, LocationType
+from utils.quant_service import ledger_balances_query
+
+
+def as_utc(moment: datetime) -> datetime:
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+def nearest_snapshot(db: Session, as_of: datetime, inclusive: bool = True) -> Optional[StockSnapshot]:
+    """Latest snapshot taken at (or before) `as_of`."""
+    condition = StockSnapshot.as_of <= as_of if inclusive else StockSnapshot.as_of < as_of
+    return db.scalars(
+        select(StockSnapshot).where(condition).order_by(StockSnapshot.as_of.desc()).limit(1)
+    ).first()
+
+
+def moves_between(start: Optional[datetime], end: Optional[datetime]):
+    """
+    The original moves created in [start, end) (open-ended when start / end is None):
+    live + archived, without the opening-balance rows.
+    """
+    opening = select(Location.id).where(Location.type == LocationType.OPENING)
+    parts = []
+    for moves in (StockMove.__table__, StockMoveArchive.__table__):
+        stmt = select(
+            moves.c.product_id, moves.c.source_location_id, moves.c.destination_location_id,
+            moves.c.quantity, moves.c.status,
+        ).where(moves.c.source_location_id.not_in(opening))
+        if start is not None:
+            stmt = stmt.where(moves.c.created_at >= start)
+        if end is not None:
+            stmt = stmt.where(moves.c.created_at < end)
+        parts.append(stmt)
+    return union_all(*parts).subquery("moves")
+
+
+def balances_as_of_query(snapshot: Optional[StockSnapshot], as_of: datetime) -> Select:
+    """(product_id, location_id, on_hand, reserved) as of `as_of`: snapshot lines + moves since."""
+    replay = ledger_balances_query(moves_between(snapshot.as_of if snapshot else None, as_of))
+    if snapshot is None:
+        return replay
+
+    lines = StockSnapshotLine.__table__
+    frozen = select(lines.c.product_id, lines.c.location_id, lines.c.on_hand, lines.c.reserved)\
+        .where(lines.c.snapshot_id == snapshot.id)
+    parts = union_all(frozen, replay).subquery("parts")
+    return select(
+        parts.c.product_id,
+        parts.c.location_id,
+        func.sum(parts.c.on_hand).label("on_hand"),
+        func.sum(parts.c.reserved).label("reserved"),
+    ).group_by(parts.c.product_id, parts.c.location_id)
+
+
+def stock_levels_as_of_query(db: Session, as_of: datetime, product_ids=None) -> Select:
+    """Same shape as stock_service.stock_levels_query (product_id, on_hand, reserved), at `as_of`."""
+    as_of = as_utc(as_of)
+    balances = balances_as_of_query(nearest_snapshot(db, as_of), as_of).subquery("balances")
+    stmt = (
+        select(
+            balances.c.product_id,
+            func.sum(balances.c.on_hand).label("on_hand"),
+            func.sum(balances.c.reserved).label("reserved"),
+        )
+        .join(Location, balances.c.location_id == Location.id)
+        .where(Location.type == LocationType.INTERNAL)
+        .group_by(balances.c.product_id)
+    )
+    if product_ids is not None:
+        stmt = stmt.where(balances.c.product_id.in_(product_ids))
+    return stmt
+
+
+# ===========================
+#         BUILDING
+# ===========================
+
+def build_snapshot(db: Session, as_of: datetime, replace: bool = False) -> StockSnapshot:
+    """
+    Freezes the balances as of `as_of` in ONE INSERT ... SELECT, starting from the previous
+    snapshot (so monthly snapshots only replay one month of moves each). The caller commits.
+    """
+    as_of = as_utc(as_of)
+    existing = db.scalars(select(StockSnapshot).where(StockSnapshot.as_of == as_of)).first()
+    if existing is not None:
+        if not replace:
+            raise ValueError(f"A snapshot as of {as_of.isoformat()} already exists (use replace)")
+        db.execute(delete(StockSnapshotLine).where(StockSnapshotLine.snapshot_id == existing.id))
+        db.delete(existing)
+        db.flush()
+
+    balances = balances_as_of_query(nearest_snapshot(db, as_of, inclusive=False), as_of).subquery("balances")
+    snapshot = StockSnapshot(as_of=as_of)
+    db.add(snapshot)
+    db.flush()
+
+    result = db.execute(
+        insert(StockSnapshotLine).from_select(
+            ["snapshot_id", "product_id", "location_id", "on_hand", "reserved"],
+            select(literal(snapshot.id), balances.c.product_id, balances.c.location_id,
+                   balances.c.on_hand, balances.c.reserved)
+            .where((balances.c.on_hand != 0) | (balances.c.reserved != 0)),
+        )
+    )
+    snapshot.line_count = result.rowcount
+    db.flush()
+    return snapshot
+
+
+def month_starts(since: datetime, until: datetime) -> list:
+    """First instant of every month in (since, until]: the as_of of each month-end snapshot."""
+    since, until = as_utc(since), as_utc(until)
+    year, month = since.year, since.month
+    starts = []
+    while True:
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+        start = datetime(year, month, 1, tzinfo=timezone.utc)
+        if start > until:
+            return starts
+        starts.append(start)
@@ -0,0 +1,87 @@
+# backend/utils/stock_service.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Union
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from models.all_models import StockQuant, Location, LocationType
+from utils.snapshot_service import stock_levels_as_of_query
+
+
+@dataclass
+class StockLevel:
+    """Stock figures for one product across all INTERNAL locations."""
+    on_hand: int = 0
+    reserved: int = 0
+
+    @property
+    def free_to_use(self) -> int:
+        return self.on_hand - self.reserved
+
+
+ProductIds = Union[Iterable[int], Select, None]
+
+
+def stock_levels_query(product_ids: ProductIds = None) -> Select:
+    """
+    Builds ONE grouped query that returns (product_id, on_hand, reserved).
+    Reads the pre-aggregated StockQuant rows of INTERNAL locations, so the cost
+    depends on the products returned and not on the size of the ledger.
+    `product_ids` can be a list of ids, a SELECT of ids, or None for every product.
+    """
+    stmt = (
+        select(
+            StockQuant.product_id,
+            func.sum(StockQuant.on_hand).label("on_hand"),
+            func.sum(StockQuant.reserved).label("reserved"),
+        )
+        .join(Location, StockQuant.location_id == Location.id)
+        .where(Location.type == LocationType.INTERNAL)
+        .group_by(StockQuant.product_id)
+    )
+
+    if product_ids is not None:
+        if not isinstance(product_ids, Select):
+            product_ids = list(product_ids)
+        stmt = stmt.where(StockQuant.product_id.in_(product_ids))
+
+    return stmt
+
+
+def get_stock_levels(db: Session, product_ids: ProductIds = None, as_of: Optional[datetime] = None) -> Dict[int, StockLevel]:
+    """
+    Returns {product_id: StockLevel}. Products without moves are simply absent.
+    With `as_of`, the figures are historical (nearest snapshot + replay, see snapshot_service).
+    """
+    if product_ids is not None and not isinstance(product_ids, Select):
+        product_ids = list(product_ids)
+        if not product_ids:
+            return {}
+
+    if as_of is not None:
+        stmt = stock_levels_as_of_query(db, as_of, product_ids)
+    else:
+        stmt = stock_levels_query(product_ids)
+    rows = db.execute(stmt).all()
+    return {
+        row.product_id: StockLevel(on_hand=int(row.on_hand or 0), reserved=int(row.reserved or 0))
+        for row in rows
+    }
+
+
+def attach_stock(db: Session, products: list, product_ids: Optional[Select] = None, as_of: Optional[datetime] = None) -> list:
+    """
+    Sets `on_hand` and `free_to_use` on each Product (Pydantic reads these attributes).
+    Pass `product_ids` (the SELECT the products came from) to avoid a huge IN (...) list.
+    """
+    levels = get_stock_levels(db, product_ids if product_ids is not None else [p.id for p in products], as_of)
+
+    for p in products:
+        level = levels.get(p.id, StockLevel())
+        p.on_hand = level.on_hand
+        p.free_to_use = level.free_to_use
+
+    return products